@@ -22,7 +22,12 @@ import logging
 import json
 import time
 from datetime import datetime
+from itertools import islice, chain
 from autoenum.framework.core import AutoEnumFramework
+from autoenum.framework.targets import iter_targets
+from autoenum.framework.sinks import SINKS, RecordBuffer, TeeSink, build_results, create_sink, load_results
+from autoenum.framework.journal import ScanJournal
+from autoenum.framework.store import DEFAULT_STORE_FILE, ScanStore
 
 # Configurar logging
 logging.basicConfig(
@@ -36,7 +41,8 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description="AutoEnum - Framework de Escaneo y Enumeración")
     
     # Argumentos básicos
-    parser.add_argument("-t", "--target", help="Objetivo a escanear (IP o dominio)")
+    parser.add_argument("-t", "--target", help="Objetivo(s) a escanear (IP, dominio, CIDR, rango 10.0.0.1-50, @fichero; separados por comas)")
+    parser.add_argument("-iL", "--target-file", help="Fichero con un objetivo por línea")
     parser.add_argument("-p", "--ports", help="Puertos a escanear (ej: 80,443,22 o 1-1000)")
     parser.add_argument("-s", "--service-detection", action="store_true", help="Activar detección de servicios")
     parser.add_argument("-o", "--os-detection", action="store_true", help="Activar detección de sistema operativo")
@@ -45,9 +51,30 @@ def parse_arguments():
     # Argumentos avanzados
     parser.add_argument("--threads", type=int, default=10, help="Número de hilos (default: 10)")
     parser.add_argument("--timeout", type=int, default=5, help="Timeout en segundos (default: 5)")
+    parser.add_argument("--no-adaptive-timeout", action="store_true", help="Usar siempre --timeout en lugar del timeout adaptativo por RTT")
+    parser.add_argument("--engine", choices=["thread", "async"], default="thread", help="Motor de escaneo de puertos y fuerza bruta web (default: thread)")
+    parser.add_argument("--concurrency", type=int, default=5000, help="Conexiones simultáneas del motor async (default: 5000)")
+    parser.add_argument("--http-concurrency", type=int, default=200, help="Peticiones HTTP simultáneas del motor async (default: 200)")
+    parser.add_argument("--service-concurrency", type=int, default=100, help="Servicios identificados simultáneamente con -s (default: 100)")
+    parser.add_argument("--service-probes", help="Base de sondas de servicios en formato nmap-service-probes (default: la incluida)")
+    parser.add_argument("--service-intensity", type=int, default=7, choices=range(10), metavar="0-9", help="Rareza máxima de las sondas probadas en puertos no declarados (default: 7)")
+    parser.add_argument("--max-workers", type=int, help="Límite global de tareas simultáneas en escaneos multi-objetivo (default: --threads)")
+    parser.add_argument("--max-hosts", type=int, default=4, help="Objetivos escaneados en paralelo (default: 4)")
     parser.add_argument("--wordlist", help="Ruta a wordlist para fuerza bruta")
+    parser.add_argument("--probe", choices=["get", "head", "range"], default="get", help="Modo de sondeo en fuerza bruta web: GET completo, HEAD o GET parcial (default: get)")
+    parser.add_argument("--probe-bytes", type=int, default=16384, help="Bytes leídos como máximo en los modos head/range (default: 16384)")
+    parser.add_argument("--no-wildcard-filter", action="store_true", help="No descartar las respuestas que coinciden con la respuesta comodín (soft-404)")
+    parser.add_argument("--title-fallback", action="store_true", help="Usar BeautifulSoup si el extractor rápido no encuentra el título")
+    parser.add_argument("--wordlist-mmap", action="store_true", help="Leer la wordlist mapeada en memoria")
     parser.add_argument("--output", help="Archivo de salida para resultados")
     parser.add_argument("--format", choices=["json", "txt", "html", "md"], default="json", help="Formato de salida")
+    parser.add_argument("--sink", choices=sorted(SINKS), help="Escribir hallazgos en streaming (ndjson, binary o sqlite)")
+    parser.add_argument("--sink-file", help="Archivo destino de los hallazgos en streaming")
+    parser.add_argument("--journal", help="Diario de reanudación: registra hallazgos y trabajo completado")
+    parser.add_argument("--resume", help="Reanudar un escaneo a partir de su diario (omite el trabajo completado)")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_FILE, help="Registrar los resultados en el almacén de escaneos SQLite (default: results/scans.db en el directorio actual)")
+    parser.add_argument("--history", nargs="?", const="", help="Listar los escaneos del almacén (opcionalmente de un objetivo)")
+    parser.add_argument("--limit", type=int, default=20, help="Escaneos listados con --history (default: 20)")
     
     # Argumentos de evasión
     parser.add_argument("--evasion", action="store_true", help="Activar técnicas de evasión")
@@ -61,6 +88,9 @@ def parse_arguments():
     # Argumentos de visualización
     parser.add_argument("--web-interface", action="store_true", help="Iniciar interfaz web")
     parser.add_argument("--web-port", type=int, default=5000, help="Puerto para interfaz web")
+    parser.add_argument("--web-server", choices=["auto", "waitress", "werkzeug"], default="auto", help="Servidor WSGI de la interfaz web (default: waitress si está instalado; es opcional: pip install waitress)")
+    parser.add_argument("--web-threads", type=int, default=16, help="Hilos del servidor waitress; 2 quedan reservados para peticiones que no son flujos de eventos (default: 16)")
+    parser.add_argument("--web-jobs", type=int, default=2, help="Escaneos simultáneos lanzados desde la interfaz web (default: 2)")
     
     # Argumentos de depuración
     parser.add_argument("--debug", action="store_true", help="Activar modo debug")
@@ -86,12 +116,15 @@ def main():
         try:
             from autoenum.framework.web_interface import WebInterface
             
-            interface = WebInterface(port=args.web_port, debug=args.debug)
-            interface.start()
-            return
+            interface = WebInterface(port=args.web_port, debug=args.debug, framework=AutoEnumFramework(), max_jobs=args.web_jobs)
         except ImportError:
             logger.error("No se pudo importar el módulo de interfaz web")
             return
+        
+        # Servir hasta Ctrl+C o SIGTERM (parada ordenada)
+        interface.start(server=args.web_server, threads=args.web_threads)
+        interface.wait()
+        return
     
     # Generar informe a partir de archivo
     if args.report_from:
@@ -100,8 +133,12 @@ def main():
             return
         
         try:
-            with open(args.report_from, "r") as f:
-                results = json.load(f)
+            if args.report_from.endswith(".json"):
+                with open(args.report_from, "r") as f:
+                    results = json.load(f)
+            else:
+                # Fichero de hallazgos en streaming (NDJSON, binario o SQLite)
+                results = load_results(args.report_from)
             
             framework = AutoEnumFramework()
             report = framework.generate_report(results)
@@ -117,9 +154,20 @@ def main():
             logger.error(f"Error al generar informe: {e}")
             return
     
+    # Listar escaneos anteriores desde el almacén
+    if args.history is not None:
+        store = ScanStore(args.store or DEFAULT_STORE_FILE)
+        
+        try:
+            for scan in store.recent_scans(args.limit, args.history or None):
+                print(f"{scan['timestamp']}  {scan['target']:<20} {scan['open_ports']:>5} puertos {scan['web_hits']:>5} web  {scan['os']:<15} {scan['id']}")
+        finally:
+            store.close()
+        return
+    
     # Verificar argumentos requeridos
-    if not args.target:
-        logger.error("Se requiere un objetivo (-t/--target)")
+    if not args.target and not args.target_file:
+        logger.error("Se requiere un objetivo (-t/--target o -iL/--target-file)")
         return
     
     # Inicializar framework
@@ -133,7 +181,21 @@ def main():
         "web_scan": args.web_scan,
         "threads": args.threads,
         "timeout": args.timeout,
+        "adaptive_timeout": not args.no_adaptive_timeout,
+        "engine": args.engine,
+        "concurrency": args.concurrency,
+        "http_concurrency": args.http_concurrency,
+        "service_concurrency": args.service_concurrency,
+        "service_probes": args.service_probes,
+        "service_intensity": args.service_intensity,
+        "max_workers": args.max_workers,
+        "max_hosts": args.max_hosts,
         "wordlist": args.wordlist,
+        "wordlist_mmap": args.wordlist_mmap,
+        "probe": args.probe,
+        "probe_bytes": args.probe_bytes,
+        "wildcard_filter": not args.no_wildcard_filter,
+        "title_fallback": args.title_fallback,
         "evasion": {
             "enabled": args.evasion,
             "delay": args.delay,
@@ -141,24 +203,105 @@ def main():
         }
     }
     
-    # Ejecutar escaneo
-    logger.info(f"Iniciando escaneo en {args.target}")
-    start_time = time.time()
+    # Objetivos (generador perezoso: un /16 no se expande en memoria)
+    targets = iter_targets(args.target, args.target_file)
+    first_targets = list(islice(targets, 2))
     
-    results = framework.scan(args.target, options)
+    if not first_targets:
+        logger.error("No se encontraron objetivos válidos")
+        return
     
-    elapsed_time = time.time() - start_time
-    logger.info(f"Escaneo completado en {elapsed_time:.2f} segundos")
+    # Destino de hallazgos en streaming: los módulos escriben según encuentran
+    sink = None
+    if args.sink:
+        sink_file = args.sink_file
+        extension = SINKS[args.sink].extension
+        
+        if not sink_file and len(first_targets) == 1:
+            sink_file = default_output_file("results", first_targets[0], extension)
+        elif not sink_file:
+            sink_file = default_output_file(args.output or "results", "findings", extension)
+        
+        sink = create_sink(args.sink, sink_file)
+        options["sink"] = sink
+        options["retain"] = False
+        
+        logger.info(f"Hallazgos en streaming hacia {sink_file}")
     
-    # Guardar resultados
-    if args.output:
-        output_file = args.output
-    else:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"results/{args.target}_{timestamp}.{args.format}"
+    # Diario de reanudación: recibe todos los hallazgos junto al destino de streaming
+    journal = None
+    if args.resume or args.journal:
+        journal_file = args.resume or args.journal
+        
+        if args.resume and not os.path.exists(journal_file):
+            logger.error(f"Diario no encontrado: {journal_file}")
+            return
+        
+        journal = ScanJournal(journal_file)
+        options["journal"] = journal
+        options["sink"] = TeeSink([sink, journal]) if sink else journal
+        
+        logger.info(f"{'Reanudando desde' if args.resume else 'Registrando'} el diario {journal_file}")
     
+    # Con streaming los hallazgos no quedan en memoria: los registros de cada objetivo se conservan hasta que termina
+    records = None
+    if sink and (args.report or args.store):
+        records = RecordBuffer()
+        options["sink"] = TeeSink([options["sink"], records])
+    
+    # Almacén de escaneos
+    store = ScanStore(args.store) if args.store else None
+    
+    try:
+        run_scan(framework, options, first_targets, targets, args, store, records)
+    finally:
+        if sink:
+            sink.close()
+        
+        if store:
+            store.close()
+        
+        if journal:
+            journal.close()
+
+def run_scan(framework, options, first_targets, targets, args, store=None, records=None):
+    """Ejecuta el escaneo de uno o varios objetivos y guarda los resultados"""
+    start_time = time.time()
+    
+    if len(first_targets) == 1:
+        # Ejecutar escaneo
+        target = first_targets[0]
+        logger.info(f"Iniciando escaneo en {target}")
+        
+        results = framework.scan(target, options)
+        
+        elapsed_time = time.time() - start_time
+        logger.info(f"Escaneo completado en {elapsed_time:.2f} segundos")
+        
+        save_results(framework, results, args.output or default_output_file("results", target, args.format), args, store, records)
+    else:
+        # Escaneo multi-objetivo: los resultados se guardan según termina cada host
+        output_dir = args.output or "results"
+        logger.info(f"Iniciando escaneo multi-objetivo (resultados en {output_dir})")
+        
+        hosts = 0
+        for results in framework.scan_targets(chain(first_targets, targets), options):
+            hosts += 1
+            save_results(framework, results, default_output_file(output_dir, results["target"], args.format), args, store, records)
+        
+        elapsed_time = time.time() - start_time
+        logger.info(f"Escaneo de {hosts} objetivos completado en {elapsed_time:.2f} segundos")
+
+def default_output_file(output_dir, target, format_type):
+    """Construye la ruta de salida por defecto para un objetivo"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(output_dir, f"{target}_{timestamp}.{format_type}")
+
+def save_results(framework, results, output_file, args, store=None, records=None):
+    """Guarda los resultados de un objetivo y genera su informe si se solicitó"""
     # Crear directorio si no existe
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    if os.path.dirname(output_file):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
     
     with open(output_file, "w") as f:
         if args.format == "json":
@@ -169,6 +312,14 @@ def main():
     
     logger.info(f"Resultados guardados en {output_file}")
     
+    # Con streaming, los hallazgos completos se reconstruyen con los registros del objetivo (sin releer el destino)
+    if records is not None:
+        results = build_results(records.pop(results["target"]), results["target"]) or results
+    
+    # Registrar en el almacén de escaneos
+    if store:
+        store.save_scan(os.path.splitext(os.path.basename(output_file))[0], results, file=os.path.abspath(output_file))
+    
     # Generar informe
     if args.report:
         report = framework.generate_report(results)
@@ -7,8 +7,12 @@ import os
 import sys
 import logging
 import importlib
+import importlib.util
 import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from autoenum.framework.events import SCAN_START, EventBus, ProgressReporter
+from autoenum.framework.scheduler import ModuleGraph, ModuleScheduler
 
 logger = logging.getLogger("AutoEnum.Core")
 
@@ -78,6 +82,13 @@ class AutoEnumFramework:
         
         logger.info(f"Se cargaron {len(self.modules)} módulos")
     
+    def get_module_info(self, module_name):
+        """Devuelve MODULE_INFO de un módulo cargado (vacío si no existe)"""
+        if module_name not in self.modules:
+            return {}
+        
+        return self.modules[module_name]["info"]
+    
     def scan(self, target, options=None):
         """Ejecuta un escaneo completo"""
         if options is None:
@@ -85,6 +96,17 @@ class AutoEnumFramework:
         
         logger.info(f"Iniciando escaneo en {target}")
         
+        # Destino de hallazgos en streaming (opcional)
+        sink = options.get("sink")
+        retain = options.get("retain", True)
+        
+        # Diario de reanudación: los objetivos ya completados no se vuelven a escanear
+        journal = options.get("journal")
+        
+        if journal and journal.is_completed(target):
+            logger.info(f"Objetivo completado en una ejecución anterior según el diario: {target}")
+            return journal.previous_results(target)
+        
         # Resultados
         results = {
             "target": target,
@@ -96,62 +118,196 @@ class AutoEnumFramework:
         # Tiempo de inicio
         start_time = datetime.now()
         
-        # Ejecutar módulos según opciones
+        # Puertos abiertos para los módulos posteriores cuando no se conservan en memoria
+        open_ports = []
+        
+        def track_port(record_type, data):
+            if record_type == "port" and data.get("state") == "open":
+                open_ports.append(data)
+        
+        # Bus de eventos del escaneo: los módulos publican hallazgos y los suscriptores arrancan al recibirlos
+        bus = options.get("bus") or EventBus()
+        
+        # Cancelación cooperativa (threading.Event): los módulos dejan de lanzar trabajo nuevo
+        cancel = options.get("cancel")
+        
+        def upstream_ports(upstream):
+            """Puertos del escaneo de puertos ya completado"""
+            if "port_scanner" not in upstream:
+                return []
+            
+            return upstream["port_scanner"].get("ports") or open_ports
+        
+        # Módulos seleccionados: cada uno construye sus opciones con los resultados de sus dependencias
+        plan = {}
+        
         if options.get("ports") is not None:
-            results["modules"]["port_scanner"] = self._run_module("port_scanner", target, {
+            plan["port_scanner"] = lambda upstream: {
                 "ports": options.get("ports"),
                 "threads": options.get("threads", 10),
                 "timeout": options.get("timeout", 5),
-                "evasion": options.get("evasion", {})
-            })
+                "adaptive_timeout": options.get("adaptive_timeout", True),
+                "engine": options.get("engine", "thread"),
+                "concurrency": options.get("concurrency", 5000),
+                "executor": options.get("executor"),
+                "evasion": options.get("evasion", {}),
+                "bus": bus
+            }
         
         if options.get("service_detection", False):
-            # Usar resultados del escaneo de puertos
-            ports = []
-            if "port_scanner" in results["modules"]:
-                ports = results["modules"]["port_scanner"].get("ports", [])
-            
-            results["modules"]["service_detection"] = self._run_module("service_detection", target, {
-                "ports": ports,
+            plan["service_detection"] = lambda upstream: {
+                "ports": upstream_ports(upstream),
                 "threads": options.get("threads", 10),
-                "timeout": options.get("timeout", 5)
-            })
+                "timeout": options.get("timeout", 5),
+                "concurrency": options.get("service_concurrency", 100),
+                "probes_file": options.get("service_probes"),
+                "intensity": options.get("service_intensity", 7)
+            }
         
         if options.get("os_detection", False):
-            results["modules"]["os_detection"] = self._run_module("os_detection", target, {
-                "timeout": options.get("timeout", 5)
-            })
+            plan["os_detection"] = lambda upstream: {
+                "timeout": options.get("timeout", 5),
+                "ports": upstream_ports(upstream)
+            }
         
         if options.get("web_scan", False):
-            # Verificar si hay puertos web (80, 443, etc.)
-            web_ports = []
-            if "port_scanner" in results["modules"]:
-                for port_info in results["modules"]["port_scanner"].get("ports", []):
-                    port = port_info.get("port", 0)
-                    if port in [80, 443, 8080, 8443]:
-                        web_ports.append(port)
-            
-            results["modules"]["web_scanner"] = self._run_module("web_scanner", target, {
-                "ports": web_ports,
+            # Puertos abiertos si el módulo no los recibe en streaming (el módulo decide cuáles son web)
+            plan["web_scanner"] = lambda upstream: {
+                "open_ports": [p for p in upstream_ports(upstream) if p.get("state") == "open"],
                 "threads": options.get("threads", 10),
                 "timeout": options.get("timeout", 5),
                 "wordlist": options.get("wordlist"),
+                "wordlist_mmap": options.get("wordlist_mmap", False),
+                "engine": options.get("engine", "thread"),
+                "http_concurrency": options.get("http_concurrency", 200),
+                "probe": options.get("probe", "get"),
+                "probe_bytes": options.get("probe_bytes", 16384),
+                "wildcard_filter": options.get("wildcard_filter", True),
+                "title_fallback": options.get("title_fallback", False),
+                "executor": options.get("executor"),
                 "user_agent": options.get("evasion", {}).get("random_agent", False)
-            })
+            }
+        
+        def run_module(module_name, upstream, feed):
+            """Ejecuta un módulo del grafo con las opciones construidas a partir de sus dependencias"""
+            if cancel and cancel.is_set():
+                logger.info(f"Escaneo cancelado: se omite el módulo {module_name}")
+                return {"error": "Escaneo cancelado"}
+            
+            module_options = plan[module_name](upstream)
+            module_options["cancel"] = cancel
+            
+            if feed is not None:
+                module_options["feed"] = feed
+            
+            # Progreso del módulo publicado en el bus (0-100 %)
+            module_options["progress"] = ProgressReporter(bus, target, module_name)
+            
+            # Reanudación: los módulos con unidades de trabajo saltan las completadas; el resto se restaura si terminó
+            if journal:
+                if self.get_module_info(module_name).get("resumable"):
+                    module_options["checkpoint"] = journal.checkpoint(target, module_name)
+                elif journal.is_module_completed(target, module_name):
+                    logger.info(f"Módulo {module_name} completado en una ejecución anterior según el diario")
+                    return journal.previous_module(target, module_name)
+            
+            def tap(record_type, data):
+                """Cada hallazgo emitido se publica también en el bus con su tipo como tema"""
+                if not retain:
+                    track_port(record_type, data)
+                
+                bus.publish(record_type, data)
+            
+            return self._run_module(module_name, target, module_options, sink, retain, tap)
+        
+        # Ejecutar los módulos como un DAG: los independientes en paralelo y los suscriptores por evento
+        graph = ModuleGraph({name: self.get_module_info(name) for name in plan})
+        bus.publish(SCAN_START, {"target": target, "modules": list(graph.order)})
+        
+        module_results = ModuleScheduler(graph, run_module, bus).run()
+        
+        for module_name in plan:
+            results["modules"][module_name] = module_results[module_name]
         
         # Calcular duración
         duration = (datetime.now() - start_time).total_seconds()
         results["duration"] = duration
         
+        if sink:
+            sink.bind(target, None)("scan", {
+                "scan_time": results["scan_time"],
+                "duration": duration
+            })
+        
         logger.info(f"Escaneo completado en {duration:.2f} segundos")
         
         return results
     
-    def _run_module(self, module_name, target, options=None):
+    def scan_targets(self, targets, options=None):
+        """Escanea múltiples objetivos y devuelve los resultados de cada host al terminar"""
+        if options is None:
+            options = {}
+        
+        # Límite global de trabajo (host, puerto) compartido por todos los hosts
+        max_workers = options.get("max_workers") or options.get("threads", 10)
+        max_hosts = options.get("max_hosts", 4)
+        
+        targets = iter(targets)
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AutoEnumWork") as work_pool, \
+             ThreadPoolExecutor(max_workers=max_hosts, thread_name_prefix="AutoEnumHost") as host_pool:
+            
+            host_options = dict(options)
+            host_options["executor"] = work_pool
+            
+            pending = {}
+            
+            while True:
+                # Mantener como máximo max_hosts objetivos en curso (lectura perezosa)
+                for target in targets:
+                    future = host_pool.submit(self.scan, target, host_options)
+                    pending[future] = target
+                    
+                    if len(pending) >= max_hosts:
+                        break
+                
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    target = pending.pop(future)
+                    
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        logger.error(f"Error al escanear {target}: {e}")
+                        yield {"target": target, "error": str(e), "modules": {}}
+    
+    def _run_module(self, module_name, target, options=None, sink=None, retain=True, tap=None):
         """Ejecuta un módulo específico"""
         if options is None:
             options = {}
         
+        # Los módulos publican cada hallazgo en el destino según aparece
+        emit = sink.bind(target, module_name) if sink else None
+        
+        # Los hallazgos también se reenvían a los módulos que dependen de este
+        if tap:
+            def emit_and_tap(record_type, data, emit=emit):
+                tap(record_type, data)
+                
+                if emit:
+                    emit(record_type, data)
+            
+            options["emit"] = emit_and_tap
+        elif emit:
+            options["emit"] = emit
+        
+        if sink:
+            options["retain"] = retain
+        
         if module_name not in self.modules:
             logger.warning(f"Módulo no encontrado: {module_name}")
             return {"error": "Módulo no encontrado"}
@@ -165,6 +321,9 @@ class AutoEnumFramework:
             # Ejecutar función scan
             result = module.scan(target, options)
             
+            if emit:
+                emit("module", result)
+            
             logger.info(f"Módulo {module_name} completado")
             
             return result
@@ -228,6 +387,25 @@ class AutoEnumFramework:
                     
                     report.append(f"| {port} | {state} | {service} |")
         
+        # Servicios identificados por banner o sonda
+        if "modules" in results and "service_detection" in results["modules"]:
+            service_module = results["modules"]["service_detection"]
+            
+            report.append("\n### Versiones de Servicios")
+            
+            if service_module.get("services"):
+                report.append("\n| Puerto | Servicio | Producto | Versión | Sonda |")
+                report.append("| ------ | -------- | -------- | ------- | ----- |")
+                
+                for service_info in service_module["services"]:
+                    port = service_info.get("port", "")
+                    service = service_info.get("service", "")
+                    product = service_info.get("product", "")
+                    version = service_info.get("version", "")
+                    probe = service_info.get("probe", "")
+                    
+                    report.append(f"| {port} | {service} | {product} | {version} | {probe} |")
+        
         # Sistema operativo
         if "modules" in results and "os_detection" in results["modules"]:
             os_module = results["modules"]["os_detection"]
@@ -243,6 +421,13 @@ class AutoEnumFramework:
                     confidence = os_info.get("confidence", "")
                     method = os_info.get("method", "")
                     
+                    # Confianza numérica (base de huellas) o texto con porcentaje (resultados anteriores)
+                    if isinstance(confidence, (int, float)):
+                        confidence = f"{confidence}%"
+                    
+                    if os_info.get("signature"):
+                        method = f"{method} ({os_info['signature']})"
+                    
                     report.append(f"| {name} | {confidence} | {method} |")
         
         # Servicios web
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Bus de eventos publicación/suscripción en proceso para AutoEnum
+"""
+
+import queue
+import logging
+import threading
+
+logger = logging.getLogger("AutoEnum.Events")
+
+# Eventos del framework
+PORT_OPEN = "port_open"
+SCAN_START = "scan_start"
+PROGRESS = "progress"
+MODULE_DONE = "module_done"
+
+class EventBus:
+    """Bus de eventos: los módulos publican hallazgos y los suscriptores reaccionan al instante"""
+    
+    def __init__(self):
+        """Inicializa el bus"""
+        self._subscribers = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, topic, callback):
+        """Suscribe callback(tema, datos) a un tema ("*" recibe todos)"""
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+    
+    def unsubscribe(self, topic, callback):
+        """Cancela una suscripción"""
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            
+            if callback in callbacks:
+                callbacks.remove(callback)
+    
+    def publish(self, topic, data=None):
+        """Entrega un evento a los suscriptores del tema (en el hilo que publica)"""
+        with self._lock:
+            callbacks = self._subscribers.get(topic, []) + self._subscribers.get("*", [])
+        
+        for callback in callbacks:
+            try:
+                callback(topic, data)
+            except Exception as e:
+                logger.error(f"Error en suscriptor de {topic}: {e}")
+    
+    def subscription(self, topics, producers=()):
+        """Suscripción iterable a varios temas que termina cuando todos los productores han finalizado"""
+        return Subscription(self, topics, producers)
+
+class Subscription:
+    """Cola de eventos de una suscripción, consumible como iterador (tema, datos)"""
+    
+    def __init__(self, bus, topics, producers=()):
+        """Se suscribe a los temas y al fin de cada productor"""
+        self.bus = bus
+        self.topics = list(topics)
+        self._queue = queue.Queue()
+        self._open = set(producers)
+        
+        for topic in self.topics + [MODULE_DONE]:
+            bus.subscribe(topic, self._put)
+    
+    def _put(self, topic, data):
+        self._queue.put((topic, data))
+    
+    def close(self):
+        """Cancela la suscripción"""
+        for topic in self.topics + [MODULE_DONE]:
+            self.bus.unsubscribe(topic, self._put)
+    
+    def __iter__(self):
+        try:
+            while self._open:
+                topic, data = self._queue.get()
+                
+                if topic == MODULE_DONE:
+                    self._open.discard(data)
+                    
+                    if MODULE_DONE not in self.topics:
+                        continue
+                
+                yield topic, data
+        finally:
+            self.close()
+
+class ProgressReporter:
+    """Publica el progreso de un módulo en el bus solo cuando cambia su porcentaje entero"""
+    
+    def __init__(self, bus, target, module):
+        """Inicializa el informador"""
+        self.bus = bus
+        self.target = target
+        self.module = module
+        self._percent = None
+        self._lock = threading.Lock()
+    
+    def __call__(self, done, total):
+        """Notifica done de total elementos de trabajo completados"""
+        percent = min(100, int(done * 100 / total)) if total else 100
+        
+        with self._lock:
+            if percent == self._percent:
+                return
+            
+            self._percent = percent
+        
+        self.bus.publish(PROGRESS, {
+            "target": self.target,
+            "module": self.module,
+            "percent": percent,
+            "done": done,
+            "total": total
+        })
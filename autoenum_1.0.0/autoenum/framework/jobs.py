@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Cola de trabajos de escaneo con un pool acotado de workers, prioridades y límites por usuario
+"""
+
+import time
+import bisect
+import logging
+import threading
+from itertools import count
+
+logger = logging.getLogger("AutoEnum.Jobs")
+
+class Job:
+    """Trabajo de escaneo: queued -> running -> completed / cancelled / error"""
+    
+    def __init__(self, job_id, target, options, user=None, priority=0):
+        """Inicializa el trabajo"""
+        self.id = job_id
+        self.target = target
+        self.options = options
+        self.user = user
+        self.priority = priority
+        self.status = "queued"
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+    
+    @property
+    def cancelled(self):
+        """Indica si se ha solicitado la cancelación"""
+        return self.cancel_event.is_set()
+    
+    def to_dict(self):
+        """Estado del trabajo"""
+        return {
+            "id": self.id,
+            "target": self.target,
+            "user": self.user,
+            "priority": self.priority,
+            "status": self.status,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished
+        }
+
+class JobScheduler:
+    """Planificador de trabajos: workers fijos que toman de una cola por prioridad (FIFO a igual prioridad)"""
+    
+    def __init__(self, runner, workers=2, per_user=1, max_queue=100, on_change=None):
+        """runner(trabajo) ejecuta un trabajo; on_change(trabajo) se llama en cada cambio de estado"""
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.per_user = per_user
+        self.max_queue = max_queue
+        self.on_change = on_change
+        self._queue = []
+        self._jobs = {}
+        self._running = {}
+        self._sequence = count()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"AutoEnumJob-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, job_id, target, options, user=None, priority=0):
+        """Encola un trabajo (mayor prioridad, antes); devuelve None si la cola está llena"""
+        with self._condition:
+            if self._stopping or len(self._queue) >= self.max_queue:
+                return None
+            
+            job = Job(job_id, target, options, user, priority)
+            self._jobs[job_id] = job
+            bisect.insort(self._queue, ((-priority, next(self._sequence)), job_id))
+            self._condition.notify()
+        
+        logger.info(f"Trabajo {job_id} encolado ({target}, prioridad {priority})")
+        self._notify(job)
+        
+        return job
+    
+    def cancel(self, job_id):
+        """Cancela un trabajo: los encolados salen de la cola y los activos se detienen en el siguiente punto de control"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            
+            if job is None or job.status not in ("queued", "running"):
+                return False
+            
+            job.cancel_event.set()
+            
+            if job.status == "queued":
+                self._queue = [item for item in self._queue if item[1] != job_id]
+                self._finish(job, "cancelled")
+        
+        logger.info(f"Cancelación solicitada para el trabajo {job_id}")
+        
+        if job.status == "cancelled":
+            self._notify(job)
+        
+        return True
+    
+    def get(self, job_id):
+        """Trabajo pendiente o en ejecución (None si ya terminó o no existe)"""
+        with self._condition:
+            return self._jobs.get(job_id)
+    
+    def position(self, job_id):
+        """Posición en la cola (1 = siguiente) de un trabajo encolado; None si no está en cola"""
+        with self._condition:
+            for index, (_, queued_id) in enumerate(self._queue):
+                if queued_id == job_id:
+                    return index + 1
+        
+        return None
+    
+    def queued(self):
+        """Identificadores de los trabajos en cola, en orden de ejecución"""
+        with self._condition:
+            return [job_id for _, job_id in self._queue]
+    
+    def shutdown(self, wait=True, cancel=False):
+        """Detiene los workers (cancela lo pendiente si cancel=True)"""
+        with self._condition:
+            self._stopping = True
+            
+            if cancel:
+                for job in self._jobs.values():
+                    job.cancel_event.set()
+                
+                for _, job_id in self._queue:
+                    self._finish(self._jobs[job_id], "cancelled")
+                
+                self._queue = []
+            
+            self._condition.notify_all()
+        
+        if wait:
+            for thread in self._threads:
+                thread.join()
+    
+    def _take(self):
+        # Primer trabajo en orden de prioridad cuyo usuario no haya alcanzado su límite
+        for index, (_, job_id) in enumerate(self._queue):
+            job = self._jobs[job_id]
+            
+            if not self.per_user or self._running.get(job.user, 0) < self.per_user:
+                del self._queue[index]
+                return job
+        
+        return None
+    
+    def _worker(self):
+        while True:
+            with self._condition:
+                job = self._take()
+                
+                while job is None:
+                    if self._stopping:
+                        return
+                    
+                    self._condition.wait()
+                    job = self._take()
+                
+                self._running[job.user] = self._running.get(job.user, 0) + 1
+                job.status = "running"
+                job.started = time.time()
+            
+            self._notify(job)
+            
+            try:
+                self.runner(job)
+                status = "cancelled" if job.cancelled else "completed"
+            except Exception as e:
+                logger.error(f"Error en el trabajo {job.id}: {e}")
+                job.error = str(e)
+                status = "error"
+            
+            with self._condition:
+                self._running[job.user] -= 1
+                self._finish(job, status)
+                
+                # Un hueco libre puede desbloquear trabajos de este usuario
+                self._condition.notify_all()
+            
+            self._notify(job)
+    
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        self._jobs.pop(job.id, None)
+    
+    def _notify(self, job):
+        if self.on_change:
+            try:
+                self.on_change(job)
+            except Exception as e:
+                logger.error(f"Error al notificar el trabajo {job.id}: {e}")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Diario de reanudación de escaneos: registro append-only de hallazgos y unidades de trabajo completadas
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+from autoenum.framework.sinks import NDJSONSink, build_results
+
+logger = logging.getLogger("AutoEnum.Journal")
+
+class ScanJournal(NDJSONSink):
+    """Destino NDJSON con volcado a disco garantizado y marcas de unidades de trabajo completadas"""
+    
+    extension = "journal"
+    
+    def __init__(self, path, **kwargs):
+        """Abre (o crea) el diario e indexa lo registrado en ejecuciones anteriores"""
+        self._offsets = {}
+        self._units = {}
+        self._modules = set()
+        self._completed = set()
+        
+        if os.path.exists(path):
+            self._index(path)
+        
+        super().__init__(path, **kwargs)
+    
+    def _index(self, path):
+        # Posición de cada registro por objetivo: las lecturas posteriores solo leen lo necesario
+        offset = 0
+        valid = 0
+        
+        with open(path, "rb") as f:
+            for line in f:
+                start = offset
+                offset += len(line)
+                
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Registro truncado (p. ej. proceso terminado a mitad de escritura)
+                    continue
+                
+                valid = offset
+                target = record.get("target")
+                key = (target, record.get("module"))
+                record_type = record.get("type")
+                
+                self._offsets.setdefault(target, []).append(start)
+                
+                if record_type == "unit":
+                    self._units.setdefault(key, set()).add(record["data"])
+                elif record_type == "module":
+                    self._modules.add(key)
+                elif record_type == "scan":
+                    self._completed.add(target)
+        
+        # Descartar una última línea incompleta antes de seguir escribiendo
+        if valid < offset:
+            logger.warning(f"Se descarta un registro incompleto al final de {path}")
+            
+            with open(path, "r+b") as f:
+                f.truncate(valid)
+        
+        logger.info(f"Diario {path}: {len(self._completed)} objetivos completados, {sum(len(u) for u in self._units.values())} unidades de trabajo")
+    
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        super()._flush()
+    
+    def records(self, target):
+        """Registros de un objetivo escritos en ejecuciones anteriores"""
+        offsets = self._offsets.get(target)
+        
+        if not offsets:
+            return
+        
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+    
+    def is_completed(self, target):
+        """Indica si el escaneo de un objetivo terminó en una ejecución anterior"""
+        return target in self._completed
+    
+    def is_module_completed(self, target, module):
+        """Indica si un módulo terminó para un objetivo en una ejecución anterior"""
+        return (target, module) in self._modules
+    
+    def previous_results(self, target):
+        """Resultados de un objetivo reconstruidos a partir del diario"""
+        return build_results(self.records(target), target)
+    
+    def previous_module(self, target, module):
+        """Resultado de un módulo completado en una ejecución anterior"""
+        results = self.previous_results(target) or {}
+        
+        return results.get("modules", {}).get(module)
+    
+    def checkpoint(self, target, module):
+        """Punto de control de un módulo para un objetivo"""
+        return Checkpoint(self, target, module)
+    
+    def is_done(self, target, module, unit):
+        """Indica si una unidad de trabajo está completada"""
+        return unit in self._units.get((target, module), ())
+    
+    def mark_done(self, target, module, unit):
+        """Registra una unidad de trabajo completada y vuelca el diario a disco"""
+        self._units.setdefault((target, module), set()).add(unit)
+        
+        self.emit({
+            "time": time.time(),
+            "target": target,
+            "module": module,
+            "type": "unit",
+            "data": unit
+        })
+        self.flush()
+
+class Checkpoint:
+    """Vista del diario para un módulo y un objetivo"""
+    
+    def __init__(self, journal, target, module):
+        """Inicializa el punto de control"""
+        self.journal = journal
+        self.target = target
+        self.module = module
+    
+    def is_done(self, unit):
+        """Indica si una unidad de trabajo ya se completó"""
+        return self.journal.is_done(self.target, self.module, unit)
+    
+    def mark_done(self, unit):
+        """Registra una unidad de trabajo completada"""
+        self.journal.mark_done(self.target, self.module, unit)
+    
+    def tracker(self, prefix, size, label=None):
+        """Agrupador de trabajo en unidades de este punto de control"""
+        return UnitTracker(self, prefix, size, label)
+    
+    def restored(self, record_type):
+        """Hallazgos de un tipo registrados por el módulo en ejecuciones anteriores"""
+        return [
+            record["data"] for record in self.journal.records(self.target)
+            if record.get("module") == self.module and record.get("type") == record_type
+        ]
+
+class UnitTracker:
+    """Agrupa el trabajo en unidades de tamaño fijo y marca cada una al completarse todo su trabajo"""
+    
+    def __init__(self, checkpoint, prefix, size, label=None):
+        """label(inicio, fin) da nombre a una unidad a partir de sus índices (por defecto, desplazamientos)"""
+        self.checkpoint = checkpoint
+        self.prefix = prefix
+        self.size = size
+        self.label = label or (lambda start, end: f"{start}-{end}")
+        self._submitted = {}
+        self._completed = {}
+        self._sealed = set()
+        self._lock = threading.Lock()
+    
+    def unit(self, index):
+        """Nombre de la unidad que contiene un índice"""
+        start = index // self.size * self.size
+        
+        return f"{self.prefix}:{self.label(start, start + self.size - 1)}"
+    
+    def is_done(self, index):
+        """Indica si la unidad que contiene un índice ya se completó"""
+        return self.checkpoint.is_done(self.unit(index))
+    
+    def submit(self, index):
+        """Registra un elemento de trabajo enviado; las unidades anteriores quedan cerradas"""
+        chunk = index // self.size
+        
+        with self._lock:
+            self._submitted[chunk] = self._submitted.get(chunk, 0) + 1
+            
+            for previous in [c for c in self._submitted if c < chunk and c not in self._sealed]:
+                self._seal(previous)
+    
+    def complete(self, index):
+        """Registra un elemento de trabajo terminado"""
+        chunk = index // self.size
+        
+        with self._lock:
+            self._completed[chunk] = self._completed.get(chunk, 0) + 1
+            self._check(chunk)
+    
+    def close(self):
+        """Cierra todas las unidades (no se enviará más trabajo)"""
+        with self._lock:
+            for chunk in list(self._submitted):
+                if chunk not in self._sealed:
+                    self._seal(chunk)
+    
+    def _seal(self, chunk):
+        self._sealed.add(chunk)
+        self._check(chunk)
+    
+    def _check(self, chunk):
+        if chunk in self._sealed and self._completed.get(chunk, 0) >= self._submitted.get(chunk, 0):
+            self.checkpoint.mark_done(self.unit(chunk * self.size))
+            self._sealed.discard(chunk)
+            self._submitted.pop(chunk, None)
+            self._completed.pop(chunk, None)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Registro en memoria de escaneos activos con instantáneas atómicas en disco
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from datetime import datetime
+
+from autoenum.framework.events import SCAN_START, PROGRESS, MODULE_DONE
+
+logger = logging.getLogger("AutoEnum.Registry")
+
+class ScanRegistry:
+    """Estado de los escaneos protegido por un cerrojo; el disco solo recibe instantáneas periódicas"""
+    
+    def __init__(self, snapshot_path=None, interval=5.0, retention=3600):
+        """Inicializa el registro y recupera la última instantánea si existe"""
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.retention = retention
+        self._scans = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+        
+        if snapshot_path and os.path.exists(snapshot_path):
+            self._load()
+    
+    def _load(self):
+        try:
+            with open(self.snapshot_path, "r") as f:
+                scans = json.load(f)
+        except Exception as e:
+            logger.error(f"Error al cargar la instantánea de escaneos {self.snapshot_path}: {e}")
+            return
+        
+        # Los escaneos en curso o en cola al caer el proceso no continuarán
+        for scan in scans:
+            scan.setdefault("modules", {})
+            
+            if scan.get("status") in ("queued", "running"):
+                scan["status"] = "interrupted"
+                scan["end_time"] = datetime.now().isoformat()
+            
+            self._scans[scan["id"]] = scan
+        
+        self._dirty = True
+        logger.info(f"{len(scans)} escaneos recuperados de {self.snapshot_path}")
+    
+    def register(self, scan_id, target, status="running"):
+        """Registra un escaneo (en ejecución o en cola)"""
+        with self._lock:
+            self._scans[scan_id] = {
+                "id": scan_id,
+                "target": target,
+                "start_time": datetime.now().isoformat(),
+                "status": status,
+                "progress": 0,
+                "modules": {}
+            }
+            self._dirty = True
+    
+    def set_status(self, scan_id, status):
+        """Cambia el estado de un escaneo sin terminarlo (p. ej. de la cola a ejecución)"""
+        with self._lock:
+            scan = self._scans.get(scan_id)
+            
+            if scan is None:
+                return
+            
+            scan["status"] = status
+            
+            if status == "running":
+                scan["start_time"] = datetime.now().isoformat()
+            
+            self._dirty = True
+    
+    def update_module(self, scan_id, module, percent):
+        """Actualiza el porcentaje de un módulo y el progreso global del escaneo"""
+        with self._lock:
+            scan = self._scans.get(scan_id)
+            
+            if scan is None:
+                return
+            
+            scan["modules"][module] = percent
+            scan["progress"] = int(sum(scan["modules"].values()) / len(scan["modules"]))
+            self._dirty = True
+    
+    def finish(self, scan_id, status="completed"):
+        """Marca un escaneo como terminado (completado o con error)"""
+        with self._lock:
+            scan = self._scans.get(scan_id)
+            
+            if scan is None:
+                return
+            
+            scan["status"] = status
+            scan["end_time"] = datetime.now().isoformat()
+            
+            if status == "completed":
+                scan["progress"] = 100
+                scan["modules"] = {module: 100 for module in scan["modules"]}
+            
+            self._dirty = True
+    
+    def listener(self, scan_id):
+        """Suscriptor del bus de un escaneo que traduce sus eventos en progreso por módulo"""
+        def on_event(topic, data):
+            if topic == SCAN_START:
+                for module in data.get("modules", []):
+                    self.update_module(scan_id, module, 0)
+            elif topic == PROGRESS:
+                self.update_module(scan_id, data["module"], data["percent"])
+            elif topic == MODULE_DONE:
+                self.update_module(scan_id, data, 100)
+        
+        return on_event
+    
+    def get(self, scan_id):
+        """Copia del estado de un escaneo (None si no existe)"""
+        with self._lock:
+            scan = self._scans.get(scan_id)
+            return _copy(scan) if scan else None
+    
+    def scans(self):
+        """Copia del estado de todos los escaneos registrados"""
+        with self._lock:
+            self._prune()
+            return [_copy(scan) for scan in self._scans.values()]
+    
+    def active(self):
+        """Copia del estado de los escaneos en cola o en ejecución"""
+        return [scan for scan in self.scans() if scan["status"] in ("queued", "running")]
+    
+    def _prune(self):
+        # Descartar escaneos terminados hace más de `retention` segundos
+        now = datetime.now()
+        
+        for scan_id, scan in list(self._scans.items()):
+            if scan["status"] not in ("queued", "running") and "end_time" in scan and (now - datetime.fromisoformat(scan["end_time"])).total_seconds() >= self.retention:
+                del self._scans[scan_id]
+                self._dirty = True
+    
+    def snapshot(self):
+        """Escribe el estado en disco de forma atómica si ha cambiado"""
+        if not self.snapshot_path:
+            return
+        
+        with self._lock:
+            if not self._dirty:
+                return
+            
+            self._prune()
+            scans = [_copy(scan) for scan in self._scans.values()]
+            self._dirty = False
+        
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        os.makedirs(directory, exist_ok=True)
+        
+        # Fichero temporal en el mismo directorio y renombrado: nunca queda una instantánea a medias
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".scans-", suffix=".tmp")
+        
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(scans, f, indent=2)
+            
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.error(f"Error al guardar la instantánea de escaneos: {e}")
+            os.unlink(tmp_path)
+            
+            with self._lock:
+                self._dirty = True
+    
+    def start(self):
+        """Inicia las instantáneas periódicas en segundo plano"""
+        if not self.snapshot_path or (self._thread and self._thread.is_alive()):
+            return
+        
+        def run():
+            while not self._stop.wait(self.interval):
+                self.snapshot()
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="AutoEnumRegistry", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Detiene las instantáneas periódicas y guarda la última"""
+        self._stop.set()
+        
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        
+        self.snapshot()
+
+def _copy(scan):
+    return dict(scan, modules=dict(scan["modules"]))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Planificación de módulos de AutoEnum como grafo de dependencias (DAG) según MODULE_INFO
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from autoenum.framework.events import MODULE_DONE
+
+logger = logging.getLogger("AutoEnum.Scheduler")
+
+class ModuleGraph:
+    """Dependencias entre módulos: A depende de B si A se suscribe a algún evento que publica B"""
+    
+    def __init__(self, infos):
+        """Construye el grafo a partir de {módulo: MODULE_INFO} (en el orden de ejecución preferido)"""
+        self.infos = infos
+        self.dependencies = {name: set() for name in infos}
+        
+        producers = {}
+        for name, info in infos.items():
+            for output in info.get("outputs", []):
+                producers.setdefault(output, []).append(name)
+        
+        previous = []
+        for name, info in infos.items():
+            if "inputs" not in info:
+                # Módulo sin declaración: se ejecuta tras los anteriores (comportamiento secuencial)
+                self.dependencies[name].update(previous)
+            else:
+                for input_type in info["inputs"]:
+                    self.dependencies[name].update(p for p in producers.get(input_type, []) if p != name)
+            
+            previous.append(name)
+        
+        self.order = self._topological_order()
+    
+    def consumers(self, name):
+        """Módulos que dependen directamente de un módulo"""
+        return [other for other in self.order if name in self.dependencies[other]]
+    
+    def is_streaming(self, name):
+        """Indica si el módulo consume los hallazgos previos según aparecen"""
+        return bool(self.infos[name].get("streaming")) and bool(self.dependencies[name])
+    
+    def _topological_order(self):
+        order = []
+        remaining = dict((name, set(deps)) for name, deps in self.dependencies.items())
+        
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps & set(remaining)]
+            
+            if not ready:
+                # Ciclo: se rompe ejecutando el resto en el orden declarado
+                logger.warning(f"Dependencia circular entre módulos: {', '.join(remaining)}")
+                
+                for name in remaining:
+                    self.dependencies[name] -= set(remaining)
+                
+                ready = list(remaining)
+            
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        
+        return order
+
+class ModuleScheduler:
+    """Ejecuta los módulos de un grafo en paralelo respetando sus dependencias"""
+    
+    def __init__(self, graph, runner, bus):
+        """runner(módulo, resultados_previos, feed) ejecuta un módulo y devuelve su resultado"""
+        self.graph = graph
+        self.runner = runner
+        self.bus = bus
+    
+    def run(self):
+        """Ejecuta todos los módulos y devuelve {módulo: resultado}"""
+        results = {}
+        started = set()
+        pending = {}
+        
+        # Suscripciones de los módulos en streaming, creadas antes de lanzar ningún productor
+        feeds = {
+            name: self.bus.subscription(self.graph.infos[name].get("inputs", []), self.graph.dependencies[name])
+            for name in self.graph.order if self.graph.is_streaming(name)
+        }
+        
+        with ThreadPoolExecutor(max_workers=max(len(self.graph.order), 1), thread_name_prefix="AutoEnumModule") as pool:
+            while True:
+                # Lanzar los módulos listos: sin dependencias pendientes o alimentados en streaming
+                for name in self.graph.order:
+                    if name in started:
+                        continue
+                    
+                    if name in feeds or self.graph.dependencies[name] <= set(results):
+                        started.add(name)
+                        pending[pool.submit(self._execute, name, dict(results), feeds)] = name
+                
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name = pending.pop(future)
+                    
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error al ejecutar módulo {name}: {e}")
+                        results[name] = {"error": str(e)}
+        
+        return results
+    
+    def _execute(self, name, upstream, feeds):
+        try:
+            return self.runner(name, upstream, feeds.get(name))
+        finally:
+            # Fin del productor: las suscripciones que dependen de él terminan al vaciarse
+            self.bus.publish(MODULE_DONE, name)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Destinos de resultados en streaming para AutoEnum (NDJSON, binario compacto y SQLite)
+"""
+
+import os
+import json
+import time
+import struct
+import sqlite3
+import logging
+import threading
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger("AutoEnum.Sinks")
+
+# Cabecera del formato binario: magia + códec de cada registro
+BINARY_MAGIC = b"AEB1"
+CODEC_MSGPACK = b"m"
+CODEC_JSON = b"j"
+
+# Lista de resultados de cada módulo en la que se acumula cada tipo de hallazgo
+RECORD_LISTS = {
+    "port": "ports",
+    "url": "directories",
+    "technology": "technologies",
+    "os": "os"
+}
+
+class ResultSink:
+    """Interfaz base de un destino de hallazgos"""
+    
+    extension = ""
+    
+    def __init__(self, path, flush_every=100, flush_interval=1.0):
+        """Inicializa el destino"""
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._pending = 0
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+        
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    def bind(self, target, module):
+        """Devuelve una función emit(tipo, datos) asociada a un objetivo y módulo"""
+        def emit(record_type, data):
+            self.emit({
+                "time": time.time(),
+                "target": target,
+                "module": module,
+                "type": record_type,
+                "data": data
+            })
+        
+        return emit
+    
+    def emit(self, record):
+        """Escribe un registro y vuelca a disco de forma incremental"""
+        with self._lock:
+            self._write(record)
+            self.count += 1
+            self._pending += 1
+            
+            if self._pending >= self.flush_every or time.time() - self._last_flush >= self.flush_interval:
+                self._flush()
+    
+    def flush(self):
+        """Fuerza el volcado de los registros pendientes"""
+        with self._lock:
+            self._flush()
+    
+    def close(self):
+        """Vuelca y cierra el destino"""
+        with self._lock:
+            self._flush()
+            self._close()
+        
+        logger.info(f"{self.count} registros escritos en {self.path}")
+    
+    def _flush(self):
+        self._pending = 0
+        self._last_flush = time.time()
+    
+    def _write(self, record):
+        raise NotImplementedError
+    
+    def _close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class NDJSONSink(ResultSink):
+    """Destino en formato JSON delimitado por líneas"""
+    
+    extension = "ndjson"
+    
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._file = open(path, "a", encoding="utf-8")
+    
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+    
+    def _flush(self):
+        self._file.flush()
+        super()._flush()
+    
+    def _close(self):
+        self._file.close()
+
+class BinarySink(ResultSink):
+    """Destino binario compacto: registros con prefijo de longitud (msgpack si está disponible)"""
+    
+    extension = "aeb"
+    
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "ab")
+        
+        if exists:
+            with open(path, "rb") as f:
+                header = f.read(len(BINARY_MAGIC) + 1)
+            
+            if not header.startswith(BINARY_MAGIC):
+                raise ValueError(f"Fichero binario no válido: {path}")
+            
+            self._codec = header[len(BINARY_MAGIC):]
+        else:
+            self._codec = CODEC_MSGPACK if msgpack else CODEC_JSON
+            self._file.write(BINARY_MAGIC + self._codec)
+    
+    def _write(self, record):
+        payload = _encode(record, self._codec)
+        self._file.write(struct.pack(">I", len(payload)) + payload)
+    
+    def _flush(self):
+        self._file.flush()
+        super()._flush()
+    
+    def _close(self):
+        self._file.close()
+
+class SQLiteSink(ResultSink):
+    """Destino SQLite con inserciones por lotes"""
+    
+    extension = "db"
+    
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._rows = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS findings (
+                id INTEGER PRIMARY KEY,
+                time REAL,
+                target TEXT,
+                module TEXT,
+                type TEXT,
+                data TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_findings_target ON findings (target, module)")
+        self._conn.commit()
+    
+    def _write(self, record):
+        self._rows.append((
+            record["time"],
+            record["target"],
+            record["module"],
+            record["type"],
+            json.dumps(record["data"], separators=(",", ":"), default=str)
+        ))
+    
+    def _flush(self):
+        if self._rows:
+            self._conn.executemany(
+                "INSERT INTO findings (time, target, module, type, data) VALUES (?, ?, ?, ?, ?)",
+                self._rows
+            )
+            self._conn.commit()
+            self._rows = []
+        
+        super()._flush()
+    
+    def _close(self):
+        self._conn.close()
+
+class TeeSink(ResultSink):
+    """Reenvía cada registro a varios destinos (p. ej. destino de hallazgos y diario de reanudación)"""
+    
+    def __init__(self, sinks):
+        """Inicializa con los destinos; path es el del primero"""
+        self.sinks = list(sinks)
+        self.path = self.sinks[0].path
+    
+    @property
+    def count(self):
+        return self.sinks[0].count
+    
+    def emit(self, record):
+        for sink in self.sinks:
+            sink.emit(record)
+    
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+    
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+class RecordBuffer(ResultSink):
+    """Conserva en memoria los registros de cada objetivo hasta que se retiran al terminar su escaneo"""
+    
+    def __init__(self):
+        """Inicializa el búfer (sin fichero asociado)"""
+        self.path = None
+        self.count = 0
+        self._records = {}
+        self._lock = threading.Lock()
+    
+    def emit(self, record):
+        with self._lock:
+            self._records.setdefault(record["target"], []).append(record)
+            self.count += 1
+    
+    def pop(self, target):
+        """Retira y devuelve los registros de un objetivo"""
+        with self._lock:
+            return self._records.pop(target, [])
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        with self._lock:
+            self._records.clear()
+
+# Formatos disponibles
+SINKS = {
+    "ndjson": NDJSONSink,
+    "binary": BinarySink,
+    "sqlite": SQLiteSink
+}
+
+def create_sink(format_type, path, **kwargs):
+    """Crea un destino por nombre de formato"""
+    if format_type not in SINKS:
+        raise ValueError(f"Formato de destino desconocido: {format_type}")
+    
+    return SINKS[format_type](path, **kwargs)
+
+def _encode(record, codec):
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(record, default=str, use_bin_type=True)
+    
+    return json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+
+def _decode(payload, codec):
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ImportError("Se requiere msgpack para leer este fichero")
+        
+        return msgpack.unpackb(payload, raw=False)
+    
+    return json.loads(payload.decode("utf-8"))
+
+def read_records(path):
+    """Lee de forma perezosa los registros de un fichero generado por un destino"""
+    with open(path, "rb") as f:
+        header = f.read(16)
+    
+    if header.startswith(BINARY_MAGIC):
+        with open(path, "rb") as f:
+            codec = f.read(len(BINARY_MAGIC) + 1)[len(BINARY_MAGIC):]
+            
+            while True:
+                size = f.read(4)
+                
+                # Un registro truncado (p. ej. tras un fallo) marca el final
+                if len(size) < 4:
+                    break
+                
+                length = struct.unpack(">I", size)[0]
+                payload = f.read(length)
+                
+                if len(payload) < length:
+                    break
+                
+                yield _decode(payload, codec)
+    
+    elif header.startswith(b"SQLite format 3"):
+        conn = sqlite3.connect(path)
+        
+        try:
+            for row in conn.execute("SELECT time, target, module, type, data FROM findings ORDER BY id"):
+                yield {
+                    "time": row[0],
+                    "target": row[1],
+                    "module": row[2],
+                    "type": row[3],
+                    "data": json.loads(row[4])
+                }
+        finally:
+            conn.close()
+    
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                
+                if not line:
+                    continue
+                
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Línea incompleta (p. ej. tras un fallo)
+                    logger.warning(f"Registro inválido ignorado en {path}")
+
+def load_results(path, target=None):
+    """Reconstruye el diccionario de resultados de un objetivo a partir de sus registros"""
+    return build_results(read_records(path), target)
+
+def build_results(records, target=None):
+    """Reconstruye el diccionario de resultados de un objetivo a partir de un iterable de registros"""
+    results = None
+    findings = {}
+    
+    for record in records:
+        if target is None:
+            target = record["target"]
+        
+        if record["target"] != target:
+            continue
+        
+        if results is None:
+            results = {"target": target, "modules": {}, "duration": 0}
+        
+        module = record["module"]
+        record_type = record["type"]
+        
+        if record_type == "scan":
+            results.update(record["data"])
+        elif record_type == "module":
+            results["modules"][module] = record["data"]
+        elif record_type in RECORD_LISTS:
+            findings.setdefault(module, {}).setdefault(RECORD_LISTS[record_type], []).append(record["data"])
+    
+    if results is None:
+        return None
+    
+    # Añadir los hallazgos que el módulo no conservó en memoria
+    for module, lists in findings.items():
+        module_results = results["modules"].setdefault(module, {})
+        
+        for key, items in lists.items():
+            if not module_results.get(key):
+                module_results[key] = items
+    
+    return results
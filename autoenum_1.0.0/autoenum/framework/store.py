@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Almacén persistente de escaneos de AutoEnum (SQLite con consultas indexadas)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger("AutoEnum.Store")
+
+# Base de datos por defecto (en el directorio de resultados del directorio actual, como los resultados del CLI)
+DEFAULT_STORE_FILE = os.path.join("results", "scans.db")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scans (
+        id TEXT PRIMARY KEY,
+        target TEXT,
+        time REAL,
+        duration REAL,
+        open_ports INTEGER,
+        web_hits INTEGER,
+        os TEXT,
+        file TEXT,
+        results TEXT,
+        seq INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS hosts (
+        scan_id TEXT,
+        target TEXT,
+        ip TEXT
+    );
+    CREATE TABLE IF NOT EXISTS ports (
+        scan_id TEXT,
+        target TEXT,
+        port INTEGER,
+        state TEXT,
+        service TEXT
+    );
+    CREATE TABLE IF NOT EXISTS urls (
+        scan_id TEXT,
+        url TEXT,
+        status INTEGER,
+        size INTEGER,
+        title TEXT
+    );
+    CREATE TABLE IF NOT EXISTS os_guesses (
+        scan_id TEXT,
+        name TEXT,
+        confidence INTEGER,
+        method TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_scans_time ON scans (time);
+    CREATE INDEX IF NOT EXISTS idx_scans_target ON scans (target, time);
+    CREATE INDEX IF NOT EXISTS idx_scans_seq ON scans (seq);
+    CREATE INDEX IF NOT EXISTS idx_hosts_target ON hosts (target);
+    CREATE INDEX IF NOT EXISTS idx_hosts_scan ON hosts (scan_id);
+    CREATE INDEX IF NOT EXISTS idx_ports_scan ON ports (scan_id);
+    CREATE INDEX IF NOT EXISTS idx_ports_port ON ports (port, state);
+    CREATE INDEX IF NOT EXISTS idx_urls_scan ON urls (scan_id);
+    CREATE INDEX IF NOT EXISTS idx_os_scan ON os_guesses (scan_id);
+"""
+
+# Tablas con una fila por hallazgo de un escaneo
+CHILD_TABLES = ["hosts", "ports", "urls", "os_guesses"]
+
+# Columnas del resumen de un escaneo (sin los resultados completos)
+SUMMARY_COLUMNS = "id, target, time, open_ports, web_hits, os"
+
+class ScanStore:
+    """Almacén SQLite de escaneos: resumen indexado por objetivo y fecha, y tablas de hallazgos"""
+    
+    def __init__(self, path=None):
+        """Abre (o crea) la base de datos"""
+        self.path = path or DEFAULT_STORE_FILE
+        self._lock = threading.Lock()
+        
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+    
+        # Ficheros JSON que no se pudieron importar, con su fecha de modificación (no se vuelven a leer hasta que cambien)
+        self._failed_imports = {}
+    
+    def _migrate(self):
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(scans)")}
+        
+        # Almacén nuevo: lo crea el esquema
+        if not columns:
+            return
+        
+        # Almacenes creados antes del recuento de hallazgos web: se añade la columna y se calcula desde urls
+        if "web_hits" not in columns:
+            self._conn.execute("ALTER TABLE scans ADD COLUMN web_hits INTEGER")
+            self._conn.execute("UPDATE scans SET web_hits = (SELECT COUNT(*) FROM urls WHERE urls.scan_id = scans.id)")
+        
+        # Almacenes creados antes del orden de escritura: se numeran en el orden de inserción
+        if "seq" not in columns:
+            self._conn.execute("ALTER TABLE scans ADD COLUMN seq INTEGER")
+            self._conn.execute("UPDATE scans SET seq = rowid")
+    
+    def save_scan(self, scan_id, results, file=None, timestamp=None):
+        """Guarda (o reemplaza) un escaneo y sus hallazgos en una sola transacción"""
+        modules = results.get("modules", {})
+        target = results.get("target")
+        port_data = modules.get("port_scanner") or {}
+        web_data = modules.get("web_scanner") or {}
+        os_data = modules.get("os_detection") or {}
+        
+        ports = [p for p in port_data.get("ports", []) if isinstance(p, dict)]
+        open_ports = len([p for p in ports if p.get("state") == "open"])
+        directories = [d for d in web_data.get("directories", []) if isinstance(d, dict)]
+        
+        if timestamp is None:
+            timestamp = _parse_scan_time(results.get("scan_time"))
+        
+        with self._lock, self._conn:
+            for table in CHILD_TABLES:
+                self._conn.execute(f"DELETE FROM {table} WHERE scan_id = ?", (scan_id,))
+            
+            self._conn.execute(
+                # seq crece con cada escritura (también al reemplazar): permite consultar solo lo nuevo
+                "INSERT OR REPLACE INTO scans (id, target, time, duration, open_ports, web_hits, os, file, results, seq) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM scans))",
+                (
+                    scan_id,
+                    target,
+                    timestamp,
+                    results.get("duration", 0),
+                    open_ports,
+                    len(directories),
+                    os_data.get("most_likely_os"),
+                    file,
+                    json.dumps(results, separators=(",", ":"), default=str)
+                )
+            )
+            self._conn.execute(
+                "INSERT INTO hosts (scan_id, target, ip) VALUES (?, ?, ?)",
+                (scan_id, target, port_data.get("ip") or target)
+            )
+            self._conn.executemany(
+                "INSERT INTO ports (scan_id, target, port, state, service) VALUES (?, ?, ?, ?, ?)",
+                [(scan_id, target, p.get("port"), p.get("state"), p.get("service")) for p in ports]
+            )
+            self._conn.executemany(
+                "INSERT INTO urls (scan_id, url, status, size, title) VALUES (?, ?, ?, ?, ?)",
+                [(scan_id, d.get("url"), d.get("status"), d.get("size"), d.get("title")) for d in directories]
+            )
+            self._conn.executemany(
+                "INSERT INTO os_guesses (scan_id, name, confidence, method) VALUES (?, ?, ?, ?)",
+                [
+                    (scan_id, guess.get("name"), _confidence(guess.get("confidence")), guess.get("method"))
+                    for guess in os_data.get("os", []) if isinstance(guess, dict)
+                ]
+            )
+        
+        return scan_id
+    
+    def recent_scans(self, limit=10, target=None):
+        """Resumen de los escaneos más recientes (opcionalmente de un objetivo)"""
+        query = f"SELECT {SUMMARY_COLUMNS} FROM scans"
+        params = []
+        
+        if target:
+            query += " WHERE target = ?"
+            params.append(target)
+        
+        query += " ORDER BY time DESC LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        
+        return [_summary(row) for row in rows]
+    
+    def summaries(self):
+        """Resumen de todos los escaneos, del más reciente al más antiguo"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {SUMMARY_COLUMNS} FROM scans ORDER BY time DESC").fetchall()
+        
+        return [_summary(row) for row in rows]
+    
+    def summaries_since(self, seq=0):
+        """Resúmenes escritos o reemplazados después de `seq`, y el último número de escritura"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {SUMMARY_COLUMNS}, seq FROM scans WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+        
+        if rows:
+            seq = rows[-1]["seq"]
+        
+        return [_summary(row) for row in rows], seq
+    
+    def summary(self, scan_id):
+        """Resumen de un escaneo (None si no existe)"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {SUMMARY_COLUMNS} FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        
+        return _summary(row) if row else None
+    
+    def get_scan(self, scan_id):
+        """Resultados completos de un escaneo (None si no existe)"""
+        with self._lock:
+            row = self._conn.execute("SELECT results FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        
+        return json.loads(row["results"]) if row else None
+    
+    def has_scan(self, scan_id):
+        """Indica si un escaneo está en el almacén"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM scans WHERE id = ?", (scan_id,)).fetchone() is not None
+    
+    def find_ports(self, port=None, service=None, state="open"):
+        """Puertos registrados que cumplen los filtros, del escaneo más reciente al más antiguo"""
+        query = "SELECT ports.scan_id, ports.target, ports.port, ports.state, ports.service FROM ports JOIN scans ON scans.id = ports.scan_id WHERE 1 = 1"
+        params = []
+        
+        if port is not None:
+            query += " AND ports.port = ?"
+            params.append(port)
+        
+        if state:
+            query += " AND ports.state = ?"
+            params.append(state)
+        
+        if service:
+            query += " AND ports.service LIKE ?"
+            params.append(f"%{service}%")
+        
+        query += " ORDER BY scans.time DESC"
+        
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params)]
+    
+    def import_directory(self, directory):
+        """Importa los ficheros de resultados JSON de un directorio que aún no estén en el almacén"""
+        if not os.path.isdir(directory):
+            return 0
+        
+        with self._lock:
+            known = {row["id"] for row in self._conn.execute("SELECT id FROM scans")}
+        
+        imported = 0
+        for name in os.listdir(directory):
+            scan_id, extension = os.path.splitext(name)
+            
+            if extension != ".json" or name == "active_scans.json" or scan_id in known:
+                continue
+            
+            path = os.path.join(directory, name)
+            
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            
+            # Fichero que ya falló y no ha cambiado desde entonces
+            if self._failed_imports.get(path) == mtime:
+                continue
+            
+            try:
+                with open(path, "r") as f:
+                    results = json.load(f)
+                
+                self.save_scan(scan_id, results, file=path, timestamp=mtime)
+                self._failed_imports.pop(path, None)
+                imported += 1
+            except Exception as e:
+                logger.error(f"Error al importar resultados de {name}: {e}")
+                self._failed_imports[path] = mtime
+        
+        if imported:
+            logger.info(f"{imported} escaneos importados desde {directory}")
+        
+        return imported
+    
+    def close(self):
+        """Cierra la base de datos"""
+        with self._lock:
+            self._conn.close()
+
+def _summary(row):
+    return {
+        "id": row["id"],
+        "target": row["target"] or "Desconocido",
+        "time": row["time"],
+        "timestamp": datetime.fromtimestamp(row["time"]).strftime("%Y-%m-%d %H:%M:%S"),
+        "open_ports": row["open_ports"],
+        "web_hits": row["web_hits"] or 0,
+        "os": row["os"] or "Desconocido"
+    }
+
+def _parse_scan_time(scan_time):
+    try:
+        return datetime.strptime(scan_time, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+def _confidence(value):
+    try:
+        return int(str(value).rstrip("%"))
+    except ValueError:
+        return None
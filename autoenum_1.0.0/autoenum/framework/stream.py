@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Difusión de eventos de escaneo a los navegadores conectados (Server-Sent Events)
+"""
+
+import json
+import queue
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger("AutoEnum.Stream")
+
+# Comentario SSE enviado a los clientes inactivos para mantener viva la conexión
+KEEPALIVE = ": keepalive\n\n"
+
+# Primera trama de cada cliente: intervalo de reconexión (y envío inmediato de las cabeceras)
+RETRY = "retry: 3000\n\n"
+
+class EventStream:
+    """Difusor SSE: cada evento se serializa una sola vez y se encola para todos los clientes"""
+    
+    def __init__(self, backlog=256, client_queue=1000, keepalive=15.0, max_clients=None):
+        """Inicializa el difusor (backlog: eventos recientes reenviados al reconectar; max_clients: None sin límite)"""
+        self.keepalive = keepalive
+        self.client_queue = client_queue
+        self.max_clients = max_clients
+        self._clients = set()
+        self._closed = False
+        self._backlog = deque(maxlen=backlog)
+        self._next_id = 1
+        self._lock = threading.Lock()
+    
+    def publish(self, event, data, scan_id=None):
+        """Difunde un evento a todos los clientes conectados"""
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            
+            frame = f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+            item = (event_id, scan_id, frame)
+            self._backlog.append(item)
+            clients = list(self._clients)
+        
+        for client in clients:
+            try:
+                client.put_nowait(item)
+            except queue.Full:
+                # Cliente demasiado lento: se desconecta y recuperará lo perdido al reconectar
+                logger.debug("Cliente de eventos desconectado por cola llena")
+                client.closed = True
+                
+                with self._lock:
+                    self._clients.discard(client)
+    
+    def close(self):
+        """Desconecta a todos los clientes y rechaza los nuevos (p. ej. al detener el servidor)"""
+        with self._lock:
+            self._closed = True
+            clients = list(self._clients)
+            self._clients.clear()
+        
+        for client in clients:
+            client.closed = True
+            
+            try:
+                client.put_nowait(None)
+            except queue.Full:
+                pass
+    
+    def open(self):
+        """Vuelve a aceptar clientes tras close() (p. ej. al reiniciar el servidor)"""
+        with self._lock:
+            self._closed = False
+    
+    @property
+    def clients(self):
+        """Número de clientes conectados"""
+        return len(self._clients)
+    
+    def listen(self, scan_id=None, last_event_id=None, initial=()):
+        """Registra un cliente y devuelve sus tramas SSE (None si el difusor está cerrado o lleno)"""
+        client = queue.Queue(maxsize=self.client_queue)
+        client.closed = False
+        
+        with self._lock:
+            if self._closed or (self.max_clients is not None and len(self._clients) >= self.max_clients):
+                return None
+            
+            # Eventos perdidos desde la última conexión (cabecera Last-Event-ID)
+            missed = [item for item in self._backlog if last_event_id is not None and item[0] > last_event_id]
+            self._clients.add(client)
+        
+        return Subscription(self, client, scan_id, missed, initial)
+    
+    def _discard(self, client):
+        """Elimina un cliente de la lista de difusión"""
+        with self._lock:
+            self._clients.discard(client)
+
+class Subscription:
+    """Tramas SSE de un cliente registrado; close() lo da de baja aunque no se haya llegado a iterar"""
+    
+    def __init__(self, stream, client, scan_id, missed, initial):
+        """Inicializa la suscripción (missed: eventos del backlog pendientes de reenviar)"""
+        self.stream = stream
+        self.client = client
+        self.scan_id = scan_id
+        self.missed = missed
+        self.initial = initial
+    
+    def __iter__(self):
+        client = self.client
+        
+        try:
+            yield RETRY
+            
+            # Estado inicial del cliente (p. ej. escaneos en curso) y eventos perdidos
+            for frame in self.initial:
+                yield frame
+            
+            for item in self.missed:
+                if self.scan_id is None or item[1] == self.scan_id:
+                    yield item[2]
+            
+            while not client.closed:
+                try:
+                    item = client.get(timeout=self.stream.keepalive)
+                except queue.Empty:
+                    yield KEEPALIVE
+                    continue
+                
+                if item is None:
+                    break
+                
+                if self.scan_id is None or item[1] == self.scan_id:
+                    yield item[2]
+        finally:
+            self.close()
+    
+    def close(self):
+        """Da de baja al cliente (lo llama el servidor WSGI al terminar la respuesta)"""
+        self.client.closed = True
+        self.stream._discard(self.client)
+
+def format_event(event, data):
+    """Trama SSE de un evento sin identificador (estado inicial de un cliente)"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Índice en memoria de los resúmenes de escaneos para el panel de la interfaz web
+"""
+
+import os
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger("AutoEnum.Summary")
+
+class SummaryIndex:
+    """Resúmenes ordenados del más reciente al más antiguo; si cambia el almacén o el directorio de resultados solo se consulta lo nuevo"""
+    
+    def __init__(self, store, directory=None):
+        """Inicializa el índice sobre un almacén (y opcionalmente el directorio de resultados JSON)"""
+        self.store = store
+        self.directory = directory
+        self._entries = []
+        self._keys = []
+        self._times = {}
+        self._seq = 0
+        self._signature = None
+        self._lock = threading.Lock()
+    
+    def recent(self, limit=10):
+        """Resumen de los `limit` escaneos más recientes"""
+        with self._lock:
+            self._refresh()
+            return [dict(entry) for entry in self._entries[:limit]]
+    
+    def add(self, scan_id):
+        """Incorpora un escaneo recién guardado (y cualquier otra escritura nueva) sin recargar el índice completo"""
+        with self._lock:
+            if self._signature is None:
+                return
+            
+            # La firma no se actualiza: la próxima consulta comprueba si otro proceso ha escrito entretanto
+            self._update()
+    
+    def invalidate(self):
+        """Fuerza la recarga completa en la próxima consulta"""
+        with self._lock:
+            self._entries = []
+            self._keys = []
+            self._times = {}
+            self._seq = 0
+            self._signature = None
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _refresh(self):
+        # Sin cambios en disco desde la última carga: el índice sigue siendo válido
+        signature = self._current()
+        
+        if signature == self._signature:
+            return
+        
+        # Directorio de resultados modificado (p. ej. JSON guardado por la línea de comandos): importar antes de consultar
+        if self.directory and (self._signature is None or signature[0] != self._signature[0]):
+            self.store.import_directory(self.directory)
+            signature = (signature[0],) + self._current()[1:]
+        
+        # La firma se toma antes de consultar: una escritura posterior provocará otra consulta
+        self._update()
+        self._signature = signature
+    
+    def _update(self):
+        # Solo los escaneos escritos o reemplazados desde la última consulta
+        summaries, self._seq = self.store.summaries_since(self._seq)
+        changed = len(summaries)
+        
+        # Carga inicial: se ordena de una vez
+        if not self._entries:
+            self._entries = sorted(summaries, key=lambda entry: (-entry["time"], entry["id"]))
+            self._keys = [(-entry["time"], entry["id"]) for entry in self._entries]
+            self._times = {entry["id"]: entry["time"] for entry in self._entries}
+            summaries = []
+        
+        for summary in summaries:
+            self._remove(summary["id"])
+            
+            key = (-summary["time"], summary["id"])
+            index = bisect.bisect(self._keys, key)
+            self._keys.insert(index, key)
+            self._entries.insert(index, summary)
+            self._times[summary["id"]] = summary["time"]
+        
+        if changed:
+            logger.debug(f"Índice de escaneos actualizado ({changed} nuevos, {len(self._entries)} en total)")
+    
+    def _remove(self, scan_id):
+        time = self._times.pop(scan_id, None)
+        
+        if time is None:
+            return
+        
+        index = bisect.bisect_left(self._keys, (-time, scan_id))
+        del self._entries[index]
+        del self._keys[index]
+    
+    def _current(self):
+        # Fechas de modificación del directorio, la base de datos y su registro WAL (donde van las escrituras)
+        paths = [self.directory, self.store.path, self.store.path + "-wal"]
+        return tuple(_mtime(path) for path in paths)
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Expansión de objetivos para AutoEnum (IPs, dominios, CIDR, rangos y ficheros)
+"""
+
+import os
+import ipaddress
+import logging
+
+logger = logging.getLogger("AutoEnum.Targets")
+
+def expand_range(spec):
+    """Expande un rango con guion (ej: 10.0.0.1-10.0.0.50 o 10.0.0.1-50) de forma perezosa"""
+    start_str, end_str = spec.split("-", 1)
+    start = ipaddress.ip_address(start_str.strip())
+    end_str = end_str.strip()
+    
+    if end_str.isdigit() and start.version == 4:
+        # Forma corta: solo cambia el último octeto
+        end = ipaddress.ip_address(start_str.strip().rsplit(".", 1)[0] + "." + end_str)
+    else:
+        end = ipaddress.ip_address(end_str)
+    
+    current = int(start)
+    while current <= int(end):
+        yield str(ipaddress.ip_address(current))
+        current += 1
+
+def expand_target(spec):
+    """Expande una especificación de objetivo individual de forma perezosa"""
+    spec = spec.strip()
+    
+    if not spec or spec.startswith("#"):
+        return
+    
+    # Red CIDR: hosts() es un generador, no se crea la lista completa
+    if "/" in spec and not spec.startswith(("http://", "https://")):
+        try:
+            network = ipaddress.ip_network(spec, strict=False)
+            
+            if network.num_addresses == 1:
+                yield str(network.network_address)
+            else:
+                yield from (str(host) for host in network.hosts())
+            return
+        except ValueError:
+            pass
+    
+    # Rango con guion
+    if "-" in spec:
+        try:
+            yield from expand_range(spec)
+            return
+        except ValueError:
+            # Dominio con guion (ej: mi-servidor.com)
+            pass
+    
+    yield spec
+
+def iter_targets_file(path):
+    """Lee objetivos de un fichero línea a línea"""
+    with open(path, "r") as f:
+        for line in f:
+            yield from expand_target(line)
+
+def iter_targets(spec=None, target_file=None):
+    """Genera los objetivos de una especificación (separada por comas) y/o un fichero"""
+    if spec:
+        for part in spec.split(","):
+            part = part.strip()
+            
+            # @ruta indica un fichero de objetivos
+            if part.startswith("@"):
+                yield from iter_targets_file(part[1:])
+            else:
+                yield from expand_target(part)
+    
+    if target_file:
+        if not os.path.exists(target_file):
+            logger.error(f"Fichero de objetivos no encontrado: {target_file}")
+            return
+        
+        yield from iter_targets_file(target_file)
@@ -7,22 +7,47 @@ import time
 import sys
 import os
 import json
+import signal
 import logging
 import threading
 import webbrowser
-from core import AutoEnumFramework
+from autoenum.framework.core import AutoEnumFramework
+from autoenum.framework.store import ScanStore
+from autoenum.framework.summary import SummaryIndex
+from autoenum.framework.events import SCAN_START, PROGRESS, MODULE_DONE, EventBus
+from autoenum.framework.registry import ScanRegistry
+from autoenum.framework.stream import EventStream, format_event
+from autoenum.framework.jobs import JobScheduler
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, redirect, url_for
+from jinja2 import TemplateNotFound
+from werkzeug.serving import make_server
 from werkzeug.utils import secure_filename
 
+# Dependencia opcional (pip install waitress): sin ella se usa el servidor de werkzeug
+try:
+    from waitress import create_server as create_waitress_server
+except ImportError:
+    create_waitress_server = None
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 logger = logging.getLogger("AutoEnum.WebInterface")
 
+# Hallazgos reenviados a los navegadores según aparecen
+STREAM_FINDINGS = ("port", "url", "technology", "os")
+
+# Prioridades que puede pedir un cliente al encolar un escaneo
+MIN_PRIORITY = -10
+MAX_PRIORITY = 10
+
+# Hilos de waitress que nunca ocupan los flujos de eventos (quedan para el resto de peticiones)
+RESERVED_THREADS = 2
+
 class WebInterface:
     """Interfaz web para AutoEnum Framework"""
     
-    def __init__(self, port=5000, debug=False, framework=None):
+    def __init__(self, port=5000, debug=False, framework=None, max_jobs=2, per_user_jobs=1, max_queue=100):
         """Inicializa la interfaz web"""
         self.port = port
         self.debug = debug
@@ -31,17 +56,36 @@ class WebInterface:
                          template_folder=self._get_template_path(),
                          static_folder=self._get_static_path())
         self.server_thread = None
+        self.server = None
+        self.server_type = None
+        
+        # Almacén de escaneos (importa una vez los resultados JSON anteriores)
+        self.store = ScanStore(os.path.join(self._get_results_dir(), "scans.db"))
+        
+        # Resúmenes del panel en memoria (la primera consulta importa los resultados JSON anteriores)
+        self.summaries = SummaryIndex(self.store, self._get_results_dir())
+        
+        # Escaneos activos en memoria (instantáneas periódicas para recuperación tras una caída);
+        # en un subdirectorio para no alterar la fecha del directorio de resultados que vigila el índice
+        self.registry = ScanRegistry(os.path.join(self._get_results_dir(), "state", "active_scans.json"))
+        
+        # Flujo de eventos compartido por todos los navegadores conectados
+        self.stream = EventStream()
+        
+        # Cola de escaneos: pool acotado de workers y límite de escaneos simultáneos por usuario
+        self.jobs = JobScheduler(self._run_job, workers=max_jobs, per_user=per_user_jobs, max_queue=max_queue, on_change=self._on_job_change)
+        self._id_lock = threading.Lock()
+        
         self.configure_routes()
         
         logger.info(f"Interfaz web inicializada en puerto {port}")
     
     def _get_template_path(self):
         """Obtiene la ruta a los templates"""
-        # Buscar en diferentes ubicaciones posibles
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+        
+        # Buscar templates propios en otras ubicaciones posibles
         possible_paths = [
-            os.path.join(os.path.dirname(__file__), "templates"),
-            os.path.join(os.path.dirname(__file__), "..", "templates"),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"),
             os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
         ]
         
@@ -49,25 +93,17 @@ class WebInterface:
             if os.path.exists(path):
                 return path
         
-        # Si no se encuentra, crear directorio de templates
-        default_path = os.path.join(os.path.dirname(__file__), "templates")
-        os.makedirs(default_path, exist_ok=True)
-        
-        # Crear template básico si no existe
-        index_template = os.path.join(default_path, "index.html")
-        if not os.path.exists(index_template):
-            with open(index_template, "w") as f:
-                f.write(self._get_default_template())
+        # Templates generados: se reescriben si no coinciden con los de esta versión
+        self._write_generated(os.path.join(default_path, "index.html"), self._get_default_template())
         
         return default_path
     
     def _get_static_path(self):
         """Obtiene la ruta a los archivos estáticos"""
-        # Buscar en diferentes ubicaciones posibles
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+        
+        # Buscar estáticos propios en otras ubicaciones posibles
         possible_paths = [
-            os.path.join(os.path.dirname(__file__), "static"),
-            os.path.join(os.path.dirname(__file__), "..", "static"),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"),
             os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
         ]
         
@@ -75,30 +111,25 @@ class WebInterface:
             if os.path.exists(path):
                 return path
         
-        # Si no se encuentra, crear directorio de estáticos
-        default_path = os.path.join(os.path.dirname(__file__), "static")
-        os.makedirs(default_path, exist_ok=True)
-        
-        # Crear CSS básico si no existe
-        css_path = os.path.join(default_path, "css")
-        os.makedirs(css_path, exist_ok=True)
-        
-        style_css = os.path.join(css_path, "style.css")
-        if not os.path.exists(style_css):
-            with open(style_css, "w") as f:
-                f.write(self._get_default_css())
-        
-        # Crear JS básico si no existe
-        js_path = os.path.join(default_path, "js")
-        os.makedirs(js_path, exist_ok=True)
-        
-        main_js = os.path.join(js_path, "main.js")
-        if not os.path.exists(main_js):
-            with open(main_js, "w") as f:
-                f.write(self._get_default_js())
+        # Estáticos generados: se reescriben si no coinciden con los de esta versión
+        self._write_generated(os.path.join(default_path, "css", "style.css"), self._get_default_css())
+        self._write_generated(os.path.join(default_path, "js", "main.js"), self._get_default_js())
         
         return default_path
     
+    def _write_generated(self, path, content):
+        """Escribe un archivo generado si no existe o su contenido es de otra versión"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == content:
+                    return
+        except OSError:
+            pass
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+    
     def _get_default_template(self):
         """Obtiene una plantilla HTML por defecto"""
         return """<!DOCTYPE html>
@@ -197,6 +228,7 @@ class WebInterface:
                                 <div class="result-summary">
                                     <p>Puertos abiertos: {{ scan.open_ports }}</p>
                                     <p>Sistema Operativo: {{ scan.os }}</p>
+                                    <p>Hallazgos web: {{ scan.web_hits }}</p>
                                 </div>
                                 <div class="result-actions">
                                     <a href="/results/{{ scan.id }}" class="btn small">Ver detalles</a>
@@ -506,7 +538,55 @@ footer {
         });
     }
     
-    // Actualización en tiempo real (si hay resultados en curso)
+    // Escaneos en curso por identificador
+    const activeScans = {};
+    
+    // Actualización en tiempo real: flujo de eventos del servidor (consulta periódica si no está disponible)
+    function watchScans() {
+        if (!document.getElementById('results-list')) {
+            return;
+        }
+        
+        if (!window.EventSource) {
+            checkScanStatus();
+            return;
+        }
+        
+        const source = new EventSource('/api/events');
+        
+        // Flujo rechazado (servidor ocupado o detenido): consulta periódica
+        source.addEventListener('error', () => {
+            if (source.readyState === EventSource.CLOSED) {
+                checkScanStatus();
+            }
+        });
+        
+        source.addEventListener('status', event => {
+            const scan = JSON.parse(event.data);
+            
+            if (scan.status === 'running' || scan.status === 'queued') {
+                activeScans[scan.id] = Object.assign(activeScans[scan.id] || {}, scan);
+            } else {
+                delete activeScans[scan.id];
+            }
+            
+            updateActiveScansList(Object.values(activeScans));
+        });
+        
+        ['port', 'url'].forEach(type => {
+            source.addEventListener(type, event => {
+                const finding = JSON.parse(event.data);
+                const scan = activeScans[finding.scan_id];
+                
+                if (scan) {
+                    scan.last_finding = type === 'port' ? `Puerto ${finding.data.port} (${finding.data.state})` : finding.data.url;
+                    updateActiveScansList(Object.values(activeScans));
+                }
+            });
+        });
+    }
+    
+    // Consulta periódica del estado (navegadores sin EventSource)
     function checkScanStatus() {
         const resultsList = document.getElementById('results-list');
         if (resultsList) {
@@ -548,14 +628,19 @@ footer {
                 <div class="scan-progress">
                     <div class="progress-bar" style="width: ${scan.progress}%"></div>
                 </div>
-                <div class="scan-status">${scan.status}</div>
+                <div class="scan-status">${scan.status === 'queued' ? `En cola (posición ${scan.position})` : `${scan.status} (${scan.progress}%)`}</div>
+                <div class="scan-finding">${scan.last_finding || ''}</div>
+                <button type="button" class="btn secondary scan-cancel">Cancelar</button>
             `;
+            scanItem.querySelector('.scan-cancel').addEventListener('click', () => {
+                fetch(`/api/scans/${encodeURIComponent(scan.id)}/cancel`, {method: 'POST'});
+            });
             activeScansListContainer.appendChild(scanItem);
         });
     }
     
-    // Iniciar verificación de estado
-    checkScanStatus();
+    // Iniciar seguimiento de escaneos
+    watchScans();
 });
 """
     
@@ -609,13 +694,22 @@ footer {
                 }
             }
             
-            # Iniciar escaneo en un hilo separado
-            scan_thread = threading.Thread(
-                target=self._run_scan,
-                args=(target, options)
-            )
-            scan_thread.daemon = True
-            scan_thread.start()
+            # Prioridad en la cola, limitada al rango permitido
+            try:
+                priority = int(request.form.get('priority', 0))
+            except ValueError:
+                return jsonify({"error": "La prioridad debe ser un número entero"}), 400
+            priority = max(MIN_PRIORITY, min(MAX_PRIORITY, priority))
+            
+            # Encolar el escaneo (el usuario se identifica por su dirección)
+            
+            with self._id_lock:
+                scan_id = self._generate_scan_id(target)
+                self.registry.register(scan_id, target, status="queued")
+            
+            if self.jobs.submit(scan_id, target, options, user=request.remote_addr, priority=priority) is None:
+                self.registry.finish(scan_id, "error: cola de escaneos llena")
+                return jsonify({"error": "Cola de escaneos llena, inténtalo más tarde"}), 503
             
             # Redirigir a la página de estado
             return redirect(url_for('scan_status', target=target))
@@ -634,7 +728,11 @@ footer {
             if not results:
                 return jsonify({"error": "Resultados no encontrados"}), 404
             
-            return render_template('results.html', results=results)
+            try:
+                return render_template('results.html', results=results)
+            except TemplateNotFound:
+                # Sin plantilla de resultados: se devuelven en JSON
+                return jsonify(results)
         
         @app.route('/results/<scan_id>/download')
         def download_results(scan_id):
@@ -660,92 +758,113 @@ footer {
             # Obtener escaneos activos
             active_scans = self.get_active_scans()
             return jsonify({"active_scans": active_scans})
-    
-    def _run_scan(self, target, options):
-        """Ejecuta un escaneo en segundo plano"""
-        try:
-            # Registrar inicio de escaneo
-            scan_id = self._generate_scan_id(target)
-            self._register_active_scan(scan_id, target)
+        
+        @app.route('/api/scans/<scan_id>/cancel', methods=['POST'])
+        def api_cancel_scan(scan_id):
+            """Cancela un escaneo en cola o en ejecución"""
+            if not self.jobs.cancel(scan_id):
+                return jsonify({"error": "Escaneo no encontrado o ya terminado"}), 404
             
-            # Ejecutar escaneo
-            results = self.framework.scan(target, options)
+            return jsonify(self._scan_state(scan_id))
+        
+        @app.route('/api/events')
+        def api_events():
+            """Flujo SSE con el progreso y los hallazgos de los escaneos (?scan=<id> para uno solo)"""
+            scan_id = request.args.get('scan')
+            last_event_id = request.headers.get('Last-Event-ID', type=int)
             
-            # Guardar resultados
-            self._save_scan_results(scan_id, results)
+            # Estado actual de los escaneos en curso para sincronizar al cliente al conectar
+            initial = [
+                format_event("status", scan) for scan in self.get_active_scans()
+                if not scan_id or scan["id"] == scan_id
+            ]
             
-            # Actualizar estado
-            self._update_scan_status(scan_id, "completed")
+            # Servidor detenido o sin hilos libres para otro flujo: el cliente pasa a consultar /api/scan-status
+            frames = self.stream.listen(scan_id, last_event_id, initial)
+            if frames is None:
+                return jsonify({"error": "Flujo de eventos no disponible"}), 503
             
-            logger.info(f"Escaneo completado para {target}")
+            return Response(
+                frames,
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+    
+    def _run_job(self, job):
+        """Ejecuta un trabajo de la cola de escaneos"""
+        if not self.framework:
+            raise RuntimeError("Framework no inicializado")
         
-        except Exception as e:
-            logger.error(f"Error en escaneo de {target}: {e}")
-            self._update_scan_status(scan_id, f"error: {str(e)}")
+        self._run_scan(job.id, job.target, dict(job.options, cancel=job.cancel_event))
+    
+    def _run_scan(self, scan_id, target, options):
+        """Ejecuta un escaneo en segundo plano"""
+        # Bus del escaneo: el registro recibe el progreso de cada módulo
+        bus = EventBus()
+        bus.subscribe("*", self.registry.listener(scan_id))
+        bus.subscribe("*", self._stream_listener(scan_id, target))
+        
+        # Ejecutar escaneo
+        results = self.framework.scan(target, dict(options, bus=bus))
+        
+        # Un escaneo cancelado no deja resultados
+        if options["cancel"].is_set():
+            logger.info(f"Escaneo cancelado para {target}")
+            return
+        
+        # Guardar resultados
+        self._save_scan_results(scan_id, results)
+        
+        logger.info(f"Escaneo completado para {target}")
+    
+    def _on_job_change(self, job):
+        """Refleja el estado de un trabajo en el registro y en el flujo de eventos"""
+        if job.status == "running":
+            self.registry.set_status(job.id, "running")
+        elif job.status == "error":
+            self.registry.finish(job.id, f"error: {job.error}")
+        elif job.status != "queued":
+            self.registry.finish(job.id, job.status)
+        
+        self.stream.publish("status", self._scan_state(job.id), job.id)
+        
+        # Al salir un trabajo de la cola cambian las posiciones del resto
+        if job.status != "queued":
+            for scan_id in self.jobs.queued():
+                self.stream.publish("status", self._scan_state(scan_id), scan_id)
+    
+    def _scan_state(self, scan_id):
+        """Estado de un escaneo con su posición en la cola si está esperando"""
+        scan = self.registry.get(scan_id)
+        
+        if scan and scan["status"] == "queued":
+            scan["position"] = self.jobs.position(scan_id)
+        
+        return scan
+    
+    def _stream_listener(self, scan_id, target):
+        """Suscriptor del bus de un escaneo que reenvía su progreso y hallazgos al flujo SSE"""
+        def on_event(topic, data):
+            if topic in (SCAN_START, PROGRESS, MODULE_DONE):
+                self.stream.publish("status", self._scan_state(scan_id), scan_id)
+            elif topic in STREAM_FINDINGS:
+                self.stream.publish(topic, {"scan_id": scan_id, "target": target, "data": data}, scan_id)
+        
+        return on_event
     
     def _generate_scan_id(self, target):
         """Genera un ID único para un escaneo"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"{target.replace('.', '_')}_{timestamp}"
-    
-    def _register_active_scan(self, scan_id, target):
-        """Registra un escaneo activo"""
-        # Aquí se implementaría el registro de escaneos activos
-        # Por ejemplo, en una base de datos o archivo
-        active_scans_file = os.path.join(self._get_results_dir(), "active_scans.json")
+        scan_id = f"{target.replace('.', '_')}_{timestamp}"
         
-        active_scans = []
-        if os.path.exists(active_scans_file):
-            try:
-                with open(active_scans_file, "r") as f:
-                    active_scans = json.load(f)
-            except:
-                active_scans = []
-        
-        active_scans.append({
-            "id": scan_id,
-            "target": target,
-            "start_time": datetime.now().isoformat(),
-            "status": "running",
-            "progress": 0
-        })
-        
-        with open(active_scans_file, "w") as f:
-            json.dump(active_scans, f, indent=2)
-    
-    def _update_scan_status(self, scan_id, status, progress=100):
-        """Actualiza el estado de un escaneo"""
-        active_scans_file = os.path.join(self._get_results_dir(), "active_scans.json")
-        
-        if not os.path.exists(active_scans_file):
-            return
+        # Varios escaneos del mismo objetivo en el mismo segundo (cola de trabajos)
+        candidate = scan_id
+        suffix = 1
+        while self.registry.get(candidate) or self.store.has_scan(candidate):
+            candidate = f"{scan_id}_{suffix}"
+            suffix += 1
         
-        try:
-            with open(active_scans_file, "r") as f:
-                active_scans = json.load(f)
-            
-            # Actualizar estado
-            for scan in active_scans:
-                if scan["id"] == scan_id:
-                    scan["status"] = status
-                    scan["progress"] = progress
-                    if status == "completed" or status.startswith("error"):
-                        scan["end_time"] = datetime.now().isoformat()
-            
-            # Filtrar escaneos completados o con error hace más de 1 hora
-            current_time = datetime.now()
-            active_scans = [
-                scan for scan in active_scans
-                if scan["status"] == "running" or
-                ("end_time" in scan and 
-                 (current_time - datetime.fromisoformat(scan["end_time"])).total_seconds() < 3600)
-            ]
-            
-            with open(active_scans_file, "w") as f:
-                json.dump(active_scans, f, indent=2)
-        
-        except Exception as e:
-            logger.error(f"Error al actualizar estado de escaneo: {e}")
+        return candidate
     
     def _save_scan_results(self, scan_id, results):
         """Guarda los resultados de un escaneo"""
@@ -763,6 +882,10 @@ footer {
             md_file = os.path.join(results_dir, f"{scan_id}.md")
             with open(md_file, "w") as f:
                 f.write(report)
+        
+        # Registrar en el almacén para las consultas de la interfaz y actualizar el índice del panel
+        self.store.save_scan(scan_id, results, file=json_file)
+        self.summaries.add(scan_id)
     
     def _get_results_dir(self):
         """Obtiene el directorio de resultados"""
@@ -777,68 +900,25 @@ footer {
             if os.path.exists(path):
                 return path
         
-        # Si no se encuentra, crear directorio
-        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "results")
+        # Si no se encuentra, crear directorio en el directorio actual (fuera del paquete instalado)
+        default_path = os.path.abspath("results")
         os.makedirs(default_path, exist_ok=True)
         return default_path
     
     def get_recent_scans(self, limit=10):
         """Obtiene los escaneos recientes"""
-        results_dir = self._get_results_dir()
-        scans = []
-        
-        if not os.path.exists(results_dir):
-            return scans
-        
-        # Buscar archivos JSON de resultados
-        json_files = [f for f in os.listdir(results_dir) if f.endswith(".json") and f != "active_scans.json"]
-        
-        # Ordenar por fecha de modificación (más recientes primero)
-        json_files.sort(key=lambda x: os.path.getmtime(os.path.join(results_dir, x)), reverse=True)
-        
-        # Limitar cantidad
-        json_files = json_files[:limit]
-        
-        # Cargar información básica
-        for json_file in json_files:
-            try:
-                with open(os.path.join(results_dir, json_file), "r") as f:
-                    data = json.load(f)
-                
-                # Extraer información básica
-                scan_id = json_file.replace(".json", "")
-                target = data.get("target", "Desconocido")
-                timestamp = datetime.fromtimestamp(os.path.getmtime(os.path.join(results_dir, json_file))).strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Contar puertos abiertos
-                open_ports = 0
-                if "modules" in data and "port_scanner" in data["modules"]:
-                    port_data = data["modules"]["port_scanner"]
-                    if "ports" in port_data:
-                        open_ports = len([p for p in port_data["ports"] if p.get("state") == "open"])
-                
-                # Obtener sistema operativo detectado
-                os_detected = "Desconocido"
-                if "modules" in data and "os_detection" in data["modules"]:
-                    os_data = data["modules"]["os_detection"]
-                    if "most_likely_os" in os_data:
-                        os_detected = os_data["most_likely_os"]
-                
-                scans.append({
-                    "id": scan_id,
-                    "target": target,
-                    "timestamp": timestamp,
-                    "open_ports": open_ports,
-                    "os": os_detected
-                })
-            
-            except Exception as e:
-                logger.error(f"Error al cargar resultados de {json_file}: {e}")
-        
-        return scans
+        try:
+            return self.summaries.recent(limit)
+        except Exception as e:
+            logger.error(f"Error al consultar escaneos recientes: {e}")
+            return []
     
     def get_scan_results(self, scan_id):
         """Obtiene los resultados de un escaneo específico"""
+        results = self.store.get_scan(scan_id)
+        if results is not None:
+            return results
+        
         results_dir = self._get_results_dir()
         json_file = os.path.join(results_dir, f"{scan_id}.json")
         
@@ -869,50 +949,106 @@ footer {
         return None
     
     def get_active_scans(self):
-        """Obtiene los escaneos activos"""
-        active_scans_file = os.path.join(self._get_results_dir(), "active_scans.json")
-        
-        if not os.path.exists(active_scans_file):
-            return []
-        
-        try:
-            with open(active_scans_file, "r") as f:
-                active_scans = json.load(f)
-            
-            # Filtrar solo los escaneos en ejecución
-            return [scan for scan in active_scans if scan["status"] == "running"]
-        
-        except Exception as e:
-            logger.error(f"Error al cargar escaneos activos: {e}")
-            return []
+        """Obtiene los escaneos activos (en cola, con su posición, o en ejecución)"""
+        return [self._scan_state(scan["id"]) or scan for scan in self.registry.active()]
     
-    def start(self):
-        """Inicia el servidor web"""
+    def start(self, server="auto", threads=16, host="0.0.0.0", open_browser=True):
+        """Inicia el servidor web (waitress si está instalado; servidor WSGI multihilo de werkzeug si no)"""
         if self.server_thread and self.server_thread.is_alive():
             logger.warning("El servidor web ya está en ejecución")
             return
         
-        def run_server():
-            self.app.run(host="0.0.0.0", port=self.port, debug=self.debug, use_reloader=False)
+        if server == "auto":
+            server = "waitress" if create_waitress_server and not self.debug else "werkzeug"
+        
+        if server == "waitress" and create_waitress_server is None:
+            logger.warning("waitress no está instalado (pip install waitress), se usa el servidor de werkzeug")
+            server = "werkzeug"
+        
+        if server == "waitress":
+            # Pool de `threads` hilos; cada navegador conectado al flujo de eventos ocupa uno,
+            # así que se limitan los flujos para que siempre queden hilos para el resto de peticiones
+            self.stream.max_clients = max(0, threads - RESERVED_THREADS)
+            self.server = create_waitress_server(self.app, host=host, port=self.port, threads=threads)
+            serve = self.server.run
+        else:
+            # Un hilo por conexión
+            self.stream.max_clients = None
+            self.app.debug = self.debug
+            self.server = make_server(host, self.port, self.app, threaded=True)
+            serve = self.server.serve_forever
         
-        self.server_thread = threading.Thread(target=run_server)
+        self.stream.open()
+        self.server_type = server
+        self.server_thread = threading.Thread(target=serve, name="AutoEnumWeb")
         self.server_thread.daemon = True
         self.server_thread.start()
         
-        logger.info(f"Servidor web iniciado en http://localhost:{self.port}")
+        self.registry.start()
+        
+        logger.info(f"Servidor web ({server}) iniciado en http://localhost:{self.port}")
         
         # Abrir navegador automáticamente
-        webbrowser.open(f"http://localhost:{self.port}")
+        if open_browser:
+            webbrowser.open(f"http://localhost:{self.port}")
     
-    def stop(self):
-        """Detiene el servidor web"""
-        if self.server_thread and self.server_thread.is_alive():
-            # No hay una forma limpia de detener un servidor Flask en un hilo
-            # Esta es una solución temporal
-            logger.info("Deteniendo servidor web...")
-            self.server_thread = None
-        else:
+    def wait(self):
+        """Bloquea hasta Ctrl+C o SIGTERM y detiene el servidor de forma ordenada"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self._stop_requested())
+        
+        try:
+            # Espera con sleep: interrumpir Thread.join() deja el hilo como no vivo
+            while self.server_thread and self.server_thread.is_alive():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+    
+    def _close_waitress(self, server):
+        """Cierra el servidor waitress y sus conexiones inactivas para que termine su bucle"""
+        server.close()
+        
+        # Las conexiones keep-alive mantendrían vivo el bucle hasta su timeout
+        for channel in list(server.active_channels.values()):
+            channel.close()
+    
+    def _stop_requested(self):
+        raise KeyboardInterrupt
+    
+    def stop(self, timeout=10):
+        """Detiene el servidor web: deja de aceptar conexiones y espera a las peticiones en curso"""
+        if not (self.server_thread and self.server_thread.is_alive()):
             logger.warning("El servidor web no está en ejecución")
+            return
+        
+        logger.info("Deteniendo servidor web...")
+        
+        # Cerrar los flujos de eventos para que sus conexiones terminen
+        self.stream.close()
+        
+        if self.server_type == "waitress":
+            # Esperar a las peticiones en curso antes de cerrar: al terminar notifican al bucle por su trigger
+            self.server.task_dispatcher.shutdown(cancel_pending=False, timeout=timeout)
+            
+            # El cierre se ejecuta en el bucle de waitress (cerrar sus sockets desde otro hilo rompe su select)
+            server = self.server
+            server.trigger.pull_trigger(lambda: self._close_waitress(server))
+            self.server_thread.join(timeout)
+        else:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server_thread.join(timeout)
+        
+        self.server_thread = None
+        self.server = None
+        
+        # Cancelar los escaneos en curso y guardar el estado final
+        self.jobs.shutdown(wait=False, cancel=True)
+        self.registry.stop()
+        
+        logger.info("Servidor web detenido")
 
 if __name__ == "__main__":
     # Configuración para pruebas
@@ -921,12 +1057,6 @@ if __name__ == "__main__":
     # Crear interfaz web
     interface = WebInterface(port=5000, debug=True)
     
-    # Iniciar servidor
+    # Iniciar servidor y mantener el script en ejecución hasta Ctrl+C
     interface.start()
-    
-    # Mantener el script en ejecución
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("Deteniendo servidor...")
+    interface.wait()
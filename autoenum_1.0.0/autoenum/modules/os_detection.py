@@ -3,13 +3,18 @@
 Módulo de detección de sistema operativo para AutoEnum
 """
 
+import os
 import socket
-import struct
 import logging
 import subprocess
 import platform
 import re
 import random
+from collections import Counter
+
+from autoenum.utils.ttl_probe import prober, probe_ttl
+from autoenum.utils.tcp_info import read_tcp_info
+from autoenum.utils.os_fingerprints import get_fingerprint_db
 
 logger = logging.getLogger("AutoEnum.OSDetection")
 
@@ -19,157 +24,128 @@ MODULE_INFO = {
     "description": "Detector de sistema operativo",
     "author": "AutoEnum Team",
     "version": "1.0.0",
-    "category": "reconnaissance"
+    "category": "reconnaissance",
+    "inputs": ["port_open"],
+    "outputs": ["os"],
+    "streaming": True
 }
 
-def detect_os_by_ttl(target, timeout=5):
-    """Detecta el sistema operativo basado en el valor TTL"""
+# Rasgos de TCP_INFO usados en la huella del host
+TCP_FEATURES = ("window", "mss", "wscale", "sack", "timestamps")
+
+# Bytes de la opción de marcas de tiempo descontados del MSS efectivo que muestra TCP_INFO
+TIMESTAMP_OPTION_BYTES = 12
+
+def ping_ttl(target, timeout=5):
+    """TTL de la respuesta de un proceso ping (solo si no hay socket ICMP ni TCP crudo disponible)"""
+    # Determinar comando ping según plataforma
+    if platform.system().lower() == "windows":
+        ping_cmd = ["ping", "-n", "1", "-w", str(timeout * 1000), target]
+    else:
+        ping_cmd = ["ping", "-c", "1", "-W", str(timeout), target]
+    
+    # Salida en inglés para que el formato "ttl=" no dependa del idioma del sistema
+    result = subprocess.run(ping_cmd, capture_output=True, text=True, env=dict(os.environ, LC_ALL="C"))
+    
+    # Buscar valor TTL
+    ttl_match = re.search(r"TTL=(\d+)", result.stdout, re.IGNORECASE)
+    
+    return int(ttl_match.group(1)) if ttl_match else None
+
+def probe_ttls(targets, timeout=5, ports=None, icmp=True):
+    """TTL observado de varios objetivos a la vez (eco ICMP por lotes y SYN/ACK a `ports`)"""
+    targets = list(targets)
+    
     try:
-        # Determinar comando ping según plataforma
-        if platform.system().lower() == "windows":
-            ping_cmd = ["ping", "-n", "1", "-w", str(timeout * 1000), target]
-        else:
-            ping_cmd = ["ping", "-c", "1", "-W", str(timeout), target]
-        
-        # Ejecutar ping
-        result = subprocess.run(ping_cmd, capture_output=True, text=True)
-        
-        # Buscar valor TTL
-        ttl_match = re.search(r"TTL=(\d+)", result.stdout, re.IGNORECASE)
+        if prober.available or ports:
+            return probe_ttl(targets, timeout, ports, icmp)
         
-        if ttl_match:
-            ttl = int(ttl_match.group(1))
-            
-            # Determinar OS basado en TTL
-            if ttl <= 64:
-                return {
-                    "name": "Linux/Unix",
-                    "confidence": "70%",
-                    "method": "TTL"
-                }
-            elif ttl <= 128:
-                return {
-                    "name": "Windows",
-                    "confidence": "70%",
-                    "method": "TTL"
-                }
-            elif ttl <= 255:
-                return {
-                    "name": "Cisco/Network Device",
-                    "confidence": "60%",
-                    "method": "TTL"
-                }
-            else:
-                return {
-                    "name": "Unknown",
-                    "confidence": "0%",
-                    "method": "TTL"
-                }
-        else:
-            logger.warning(f"No se pudo determinar TTL para {target}")
-            return None
-    
+        # Sin sockets crudos ni ICMP sin privilegios: un proceso ping por objetivo
+        return {target: ttl for target in targets if (ttl := ping_ttl(target, timeout)) is not None}
     except Exception as e:
         logger.error(f"Error al detectar OS por TTL: {e}")
+        return {}
+
+def classify_hosts(observations, top=3):
+    """Familias de OS más probables de muchos hosts en una sola pasada sobre la base de huellas"""
+    return get_fingerprint_db().classify_many(observations, top)
+
+def detect_os_by_ttl_batch(targets, timeout=5, ports=None, icmp=True):
+    """Detecta el sistema operativo de varios objetivos a la vez por TTL"""
+    ttls = probe_ttls(targets, timeout, ports, icmp)
+    candidates = classify_hosts([{"ttl": ttl} for ttl in ttls.values()], top=1)
+    
+    return {target: found[0] for target, found in zip(ttls, candidates) if found}
+
+def detect_os_by_ttl(target, timeout=5, ports=None, icmp=True):
+    """Detecta el sistema operativo basado en el valor TTL"""
+    result = detect_os_by_ttl_batch([target], timeout, ports, icmp).get(target)
+    
+    if result is None:
+        logger.warning(f"No se pudo determinar TTL para {target}")
+    
+    return result
+
+def tcp_observation(features):
+    """Rasgos de TCP_INFO normalizados para la base de huellas (MSS anunciado por el host)"""
+    observation = {key: features.get(key) for key in TCP_FEATURES if key in features}
+    
+    if observation.get("mss") and observation.get("timestamps"):
+        observation["mss"] += TIMESTAMP_OPTION_BYTES
+    
+    # Sin ventana (núcleos antiguos) el rasgo no se compara
+    if observation.get("window") is None:
+        observation.pop("window", None)
+    
+    return observation
+
+def detect_os_by_tcp_info(features):
+    """Detecta el sistema operativo con los rasgos del SYN/ACK (TCP_INFO)"""
+    if not features:
         return None
+    
+    candidates = get_fingerprint_db().classify(tcp_observation(features), top=1)
+    
+    return candidates[0] if candidates else None
 
-def detect_os_by_tcp_window(target, port=80, timeout=5):
-    """Detecta el sistema operativo basado en el tamaño de ventana TCP"""
+def probe_tcp_info(target, port=80, timeout=5):
+    """TCP_INFO de una conexión propia (solo si el escaneo de puertos no lo aportó)"""
     try:
-        # Crear socket
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(timeout)
-        
-        # Conectar al objetivo
-        s.connect((target, port))
-        
-        # Obtener información del socket
-        sock_info = s.getsockopt(socket.SOL_TCP, socket.TCP_INFO, 92)
-        
-        # Cerrar socket
-        s.close()
-        
-        # Extraer tamaño de ventana
-        # Nota: Esto puede variar según la plataforma
-        if len(sock_info) >= 16:
-            window_size = struct.unpack("I", sock_info[12:16])[0]
-            
-            # Determinar OS basado en tamaño de ventana
-            if window_size == 5840:
-                return {
-                    "name": "Linux",
-                    "confidence": "60%",
-                    "method": "TCP Window"
-                }
-            elif window_size == 16384:
-                return {
-                    "name": "Windows",
-                    "confidence": "60%",
-                    "method": "TCP Window"
-                }
-            elif window_size == 65535:
-                return {
-                    "name": "FreeBSD/OpenBSD",
-                    "confidence": "60%",
-                    "method": "TCP Window"
-                }
-            else:
-                return {
-                    "name": "Unknown",
-                    "confidence": "0%",
-                    "method": "TCP Window"
-                }
-        else:
-            logger.warning(f"No se pudo determinar tamaño de ventana TCP para {target}")
-            return None
+        with socket.create_connection((target, port), timeout) as s:
+            features = read_tcp_info(s)
+    except OSError as e:
+        logger.error(f"Error al leer TCP_INFO de {target}:{port}: {e}")
+        return None
     
-    except Exception as e:
-        logger.error(f"Error al detectar OS por TCP Window: {e}")
+    if not features:
+        logger.warning(f"No se pudo leer TCP_INFO para {target}")
+    
+    return features
+
+def detect_os_by_tcp_window(target, port=80, timeout=5):
+    """Detecta el sistema operativo con los rasgos TCP de una conexión propia"""
+    return detect_os_by_tcp_info(probe_tcp_info(target, port, timeout))
+
+def common_tcp_features(port_records):
+    """Rasgos TCP más repetidos entre los puertos abiertos (un puerto redirigido a otro equipo no decide)"""
+    fingerprints = Counter(
+        tuple(sorted((key, value) for key, value in p["tcp"].items() if key in TCP_FEATURES))
+        for p in port_records if p.get("tcp")
+    )
+    
+    if not fingerprints:
         return None
+    
+    return dict(fingerprints.most_common(1)[0][0])
 
 def detect_os_by_open_ports(ports):
     """Detecta el sistema operativo basado en puertos abiertos"""
     if not ports:
         return None
     
-    # Puertos comunes por sistema operativo
-    windows_ports = [135, 139, 445, 3389]
-    linux_ports = [22, 111, 2049]
-    network_device_ports = [23, 161, 162, 8291, 8728, 8729]
-    
-    # Contar coincidencias
-    windows_count = sum(1 for p in ports if p in windows_ports)
-    linux_count = sum(1 for p in ports if p in linux_ports)
-    network_count = sum(1 for p in ports if p in network_device_ports)
-    
-    # Determinar OS basado en coincidencias
-    if windows_count > linux_count and windows_count > network_count:
-        confidence = min(windows_count * 20, 80)
-        return {
-            "name": "Windows",
-            "confidence": f"{confidence}%",
-            "method": "Open Ports"
-        }
-    elif linux_count > windows_count and linux_count > network_count:
-        confidence = min(linux_count * 20, 80)
-        return {
-            "name": "Linux/Unix",
-            "confidence": f"{confidence}%",
-            "method": "Open Ports"
-        }
-    elif network_count > windows_count and network_count > linux_count:
-        confidence = min(network_count * 20, 80)
-        return {
-            "name": "Network Device",
-            "confidence": f"{confidence}%",
-            "method": "Open Ports"
-        }
-    else:
-        return {
-            "name": "Unknown",
-            "confidence": "0%",
-            "method": "Open Ports"
-        }
+    candidates = get_fingerprint_db().classify({"ports": ports}, top=1)
+    
+    return candidates[0] if candidates else None
 
 def scan(target, options=None):
     """Función principal de detección de sistema operativo"""
@@ -187,37 +163,59 @@ def scan(target, options=None):
         "os": []
     }
     
-    # Detectar por TTL
-    ttl_result = detect_os_by_ttl(target, timeout)
-    if ttl_result:
-        results["os"].append(ttl_result)
+    # Rasgos observados del host: TTL, SYN/ACK y puertos abiertos
+    observation = {}
     
-    # Detectar por TCP Window (solo si hay puertos abiertos)
-    if "ports" in options and options["ports"]:
-        # Seleccionar un puerto abierto aleatorio
-        open_ports = [p.get("port") for p in options["ports"] if p.get("state") == "open"]
-        
-        if open_ports:
-            port = random.choice(open_ports)
+    # TTL por eco ICMP
+    ttl = probe_ttls([target], timeout).get(target)
+    
+    # Puertos abiertos: eventos port_open del escaneo de puertos o resultados ya completados
+    feed = options.get("feed")
+    open_ports = []
+    
+    if feed is not None:
+        for topic, data in feed:
+            if topic != "port_open":
+                continue
             
-            tcp_result = detect_os_by_tcp_window(target, port, timeout)
-            if tcp_result:
-                results["os"].append(tcp_result)
+            open_ports.append(data)
+            
+            # Sin respuesta ICMP (filtrado): TTL del SYN/ACK del primer puerto abierto, sin esperar al barrido
+            if len(open_ports) == 1 and ttl is None:
+                ttl = probe_ttls([target], timeout, ports=[data.get("port")], icmp=False).get(target)
+    else:
+        open_ports = [p for p in options.get("ports") or [] if p.get("state") == "open"]
+        
+        # Sin respuesta ICMP (filtrado): TTL del SYN/ACK de un puerto abierto
+        if open_ports and ttl is None:
+            ttl = probe_ttls([target], timeout, ports=[random.choice(open_ports).get("port")], icmp=False).get(target)
+    
+    if ttl is not None:
+        observation["ttl"] = ttl
+    
+    if open_ports:
+        observation["ports"] = sorted(p.get("port") for p in open_ports)
         
-        # Detectar por puertos abiertos
-        ports_result = detect_os_by_open_ports(open_ports)
-        if ports_result:
-            results["os"].append(ports_result)
-    
-    # Determinar el OS más probable
-    if results["os"]:
-        # Ordenar por confianza (de mayor a menor)
-        results["os"].sort(key=lambda x: int(x.get("confidence", "0%").rstrip("%")), reverse=True)
+        # Rasgos que el escaneo de puertos leyó de sus propias conexiones; si no los hay, una conexión adicional
+        features = common_tcp_features(open_ports) or probe_tcp_info(target, random.choice(open_ports).get("port"), timeout)
         
-        # El OS más probable es el primero
-        results["most_likely_os"] = results["os"][0]["name"]
-    else:
-        results["most_likely_os"] = "Unknown"
+        if features:
+            observation.update(tcp_observation(features))
+    
+    # Familias más probables según la base de huellas (confianza numérica 0-100, de mayor a menor)
+    db = get_fingerprint_db()
+    results["os"] = db.classify(observation)
+    results["fingerprint"] = observation
+    results["fingerprint_db"] = db.version
+    
+    # Publicar las detecciones
+    emit = options.get("emit")
+    if emit:
+        for os_info in results["os"]:
+            emit("os", os_info)
+    
+    # El OS más probable es el de mayor confianza
+    results["most_likely_os"] = results["os"][0]["name"] if results["os"] else "Unknown"
     
     logger.info(f"Detección de sistema operativo completada. Resultado: {results['most_likely_os']}")
     
@@ -238,6 +236,6 @@ if __name__ == "__main__":
         
         print("\nDetecciones:")
         for os_info in results["os"]:
-            print(f"- {os_info['name']} ({os_info['confidence']} confianza, método: {os_info['method']})")
+            print(f"- {os_info['name']} ({os_info['confidence']}% confianza, firma: {os_info['signature']})")
     else:
         print("Uso: python os_detection.py <target>")
\ No newline at end of file
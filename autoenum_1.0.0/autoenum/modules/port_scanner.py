@@ -4,10 +4,21 @@ Módulo de escaneo de puertos para AutoEnum
 """
 
 import socket
+import errno
 import logging
 import time
 import random
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from autoenum.utils.tcp_info import read_tcp_info
+
+try:
+    import resource
+except ImportError:
+    # No disponible en Windows
+    resource = None
 
 logger = logging.getLogger("AutoEnum.PortScanner")
 
@@ -17,29 +28,97 @@ MODULE_INFO = {
     "description": "Escáner de puertos TCP",
     "author": "AutoEnum Team",
     "version": "1.0.0",
-    "category": "reconnaissance"
+    "category": "reconnaissance",
+    "resumable": True,
+    "inputs": [],
+    "outputs": ["port", "port_open"]
 }
 
-def scan_port(target, port, timeout=5):
+# Puertos por unidad de trabajo en el diario de reanudación
+PORT_CHUNK = 1024
+
+# Límites del timeout adaptativo (segundos); un puerto sin respuesta en ese plazo se vuelve a sondear con el timeout completo
+MIN_RTT_TIMEOUT = 0.5
+
+# Reintentos al crear un socket con los descriptores agotados (EMFILE/ENFILE) y espera inicial entre ellos
+SOCKET_RETRIES = 5
+SOCKET_BACKOFF = 0.05
+
+# Puertos en vuelo por hilo en el motor de hilos (el resto se envía según se liberan huecos)
+SUBMIT_WINDOW_FACTOR = 2
+
+class RTTEstimator:
+    """Estimador de RTT por host al estilo TCP (SRTT/RTTVAR, RFC 6298)"""
+    
+    def __init__(self, initial_timeout=5, min_timeout=MIN_RTT_TIMEOUT, max_timeout=None):
+        """Inicializa el estimador con el timeout configurado"""
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min(min_timeout, initial_timeout)
+        self.max_timeout = max_timeout or initial_timeout
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self._lock = threading.Lock()
+    
+    def update(self, rtt):
+        """Incorpora una medida de RTT (SYN -> SYN/ACK o RST)"""
+        with self._lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+                self.srtt = 0.875 * self.srtt + 0.125 * rtt
+            
+            self.samples += 1
+    
+    @property
+    def timeout(self):
+        """Timeout por sonda: SRTT + 4 * RTTVAR, acotado entre el mínimo y el configurado"""
+        if self.srtt is None:
+            return self.initial_timeout
+        
+        return max(self.min_timeout, min(self.max_timeout, self.srtt + 4 * self.rttvar))
+    
+    def to_dict(self):
+        """Resumen del RTT aprendido para los resultados"""
+        return {
+            "srtt_ms": round(self.srtt * 1000, 3) if self.srtt is not None else None,
+            "rttvar_ms": round(self.rttvar * 1000, 3) if self.rttvar is not None else None,
+            "timeout_ms": round(self.timeout * 1000, 3),
+            "samples": self.samples
+        }
+
+def scan_port(target, port, timeout=5, rtt=None):
     """Escanea un puerto específico"""
+    s = None
+    
     try:
         # Crear socket
+        probe_timeout = rtt.timeout if rtt else timeout
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(timeout)
+        s.settimeout(probe_timeout)
         
         # Intentar conectar
+        start = time.monotonic()
         result = s.connect_ex((target, port))
+        elapsed = time.monotonic() - start
         
-        # Cerrar socket
-        s.close()
+        # Sin respuesta dentro del timeout adaptativo: un pico de RTT no basta para darlo por cerrado
+        if rtt and result not in (0, errno.ECONNREFUSED) and probe_timeout < timeout and elapsed >= probe_timeout:
+            s.close()
+            return scan_port(target, port, timeout)
+        
+        # Rasgos del SYN/ACK para la detección de OS, leídos de la misma conexión antes de cerrarla
+        tcp = read_tcp_info(s) if result == 0 else None
+        
+        # Solo las respuestas (SYN/ACK o RST) sirven como muestra de RTT
+        if rtt and result in (0, errno.ECONNREFUSED):
+            rtt.update(elapsed)
         
         if result == 0:
             # Puerto abierto
-            return {
-                "port": port,
-                "state": "open",
-                "service": get_service_name(port)
-            }
+            return _open_result(port, tcp)
         else:
             # Puerto cerrado o filtrado
             return {
@@ -70,6 +149,169 @@ def scan_port(target, port, timeout=5):
             "state": "error",
             "service": ""
         }
+    
+    finally:
+        # Cerrar socket
+        if s is not None:
+            s.close()
+
+def _open_result(port, tcp=None):
+    result = {
+        "port": port,
+        "state": "open",
+        "service": get_service_name(port)
+    }
+    
+    if tcp:
+        result["tcp"] = tcp
+    
+    return result
+
+async def _async_socket():
+    """Socket TCP no bloqueante; con los descriptores agotados espera a que otras sondas liberen los suyos"""
+    for attempt in range(SOCKET_RETRIES):
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        except OSError as e:
+            if e.errno not in (errno.EMFILE, errno.ENFILE) or attempt == SOCKET_RETRIES - 1:
+                raise
+            
+            await asyncio.sleep(SOCKET_BACKOFF * 2 ** attempt)
+            continue
+        
+        s.setblocking(False)
+        return s
+
+async def async_scan_port(ip, port, timeout=5, rtt=None):
+    """Escanea un puerto específico con un connect no bloqueante"""
+    loop = asyncio.get_running_loop()
+    s = None
+    
+    try:
+        s = await _async_socket()
+        probe_timeout = rtt.timeout if rtt else timeout
+        start = time.monotonic()
+        
+        await asyncio.wait_for(loop.sock_connect(s, (ip, port)), probe_timeout)
+        
+        if rtt:
+            rtt.update(time.monotonic() - start)
+        
+        # Puerto abierto (con los rasgos del SYN/ACK para la detección de OS)
+        return _open_result(port, read_tcp_info(s))
+    
+    except ConnectionRefusedError:
+        # RST: puerto cerrado, pero la respuesta sirve como muestra de RTT
+        if rtt:
+            rtt.update(time.monotonic() - start)
+        
+        return {
+            "port": port,
+            "state": "closed",
+            "service": ""
+        }
+    
+    except asyncio.TimeoutError:
+        # Sin respuesta dentro del timeout adaptativo: una sonda más con el timeout completo antes de darlo por cerrado
+        if rtt and probe_timeout < timeout:
+            s.close()
+            s = None
+            return await async_scan_port(ip, port, timeout)
+        
+        return {
+            "port": port,
+            "state": "closed",
+            "service": ""
+        }
+    
+    except OSError as e:
+        # Sin socket (descriptores agotados tras los reintentos): el puerto no llegó a comprobarse
+        if s is None:
+            logger.error(f"Error al escanear puerto {port}: {e}")
+            return {
+                "port": port,
+                "state": "error",
+                "service": ""
+            }
+        
+        # Puerto cerrado o filtrado (mismo criterio que connect_ex)
+        return {
+            "port": port,
+            "state": "closed",
+            "service": ""
+        }
+    
+    except Exception as e:
+        logger.error(f"Error al escanear puerto {port}: {e}")
+        return {
+            "port": port,
+            "state": "error",
+            "service": ""
+        }
+    
+    finally:
+        if s is not None:
+            s.close()
+
+async def async_scan_ports(ip, ports, timeout=5, concurrency=5000, delay=0.0, on_result=None, rtt=None, cancel=None):
+    """Escanea una lista de puertos manteniendo hasta `concurrency` conexiones en vuelo"""
+    loop = asyncio.get_running_loop()
+    results = []
+    
+    # Sin callback se acumulan los resultados y se devuelven al final
+    if on_result is None:
+        on_result = results.append
+    
+    # Iterador compartido: cada worker toma el siguiente puerto pendiente
+    pending = iter(ports)
+    next_start = [loop.time()]
+    
+    async def worker():
+        for port in pending:
+            if cancel and cancel.is_set():
+                break
+            
+            # Espaciar el inicio de las sondas si hay retraso de evasión
+            if delay > 0:
+                now = loop.time()
+                wait = next_start[0] - now
+                next_start[0] = max(now, next_start[0]) + delay
+                
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            
+            on_result(await async_scan_port(ip, port, timeout, rtt))
+    
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(ports))))]
+    await asyncio.gather(*workers)
+    
+    return results
+
+def _raise_fd_limit(needed):
+    """Intenta elevar el límite de descriptores abiertos y devuelve la concurrencia posible"""
+    if resource is None:
+        return needed
+    
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        
+        # Reservar descriptores para el resto del proceso
+        wanted = needed + 256
+        
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            new_soft = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+            soft = new_soft
+        
+        if soft != resource.RLIM_INFINITY and soft - 256 < needed:
+            limit = max(1, soft - 256)
+            logger.warning(f"Límite de descriptores insuficiente, concurrencia reducida a {limit}")
+            return limit
+    
+    except (ValueError, OSError) as e:
+        logger.debug(f"No se pudo ajustar el límite de descriptores: {e}")
+    
+    return needed
 
 def get_service_name(port):
     """Obtiene el nombre del servicio para un puerto"""
@@ -123,10 +365,39 @@ def scan(target, options=None):
     threads = options.get("threads", 10)
     timeout = options.get("timeout", 5)
     evasion = options.get("evasion", {})
+    engine = options.get("engine", "thread")
+    concurrency = options.get("concurrency", 5000)
+    executor = options.get("executor")
+    emit = options.get("emit")
+    bus = options.get("bus")
+    retain = options.get("retain", True)
+    adaptive_timeout = options.get("adaptive_timeout", True)
+    checkpoint = options.get("checkpoint")
+    progress = options.get("progress")
+    cancel = options.get("cancel")
     
     # Parsear puertos
     ports = parse_ports(ports_str)
     
+    # Reanudación: unidades de PORT_CHUNK puertos consecutivos (en orden ascendente)
+    tracker = None
+    done = 0
+    if checkpoint:
+        ordered = sorted(set(ports))
+        position = {port: i for i, port in enumerate(ordered)}
+        tracker = checkpoint.tracker("ports", PORT_CHUNK, lambda start, end: f"{ordered[start]}-{ordered[min(end, len(ordered) - 1)]}")
+        
+        done = sum(1 for port in ordered if tracker.is_done(position[port]))
+        ports = [port for port in ports if not tracker.is_done(position[port])]
+        
+        if done:
+            logger.info(f"Reanudando escaneo de puertos: {done} puertos ya completados, {len(ports)} pendientes")
+        
+        for port in ports:
+            tracker.submit(position[port])
+        
+        tracker.close()
+    
     # Aplicar técnicas de evasión
     if evasion.get("enabled", False):
         # Aleatorizar orden de puertos
@@ -151,31 +422,109 @@ def scan(target, options=None):
         logger.error(f"No se pudo resolver el nombre: {target}")
         return results
     
-    # Escanear puertos
-    with ThreadPoolExecutor(max_workers=threads) as executor:
-        futures = []
+    # Timeout adaptativo aprendido de las primeras respuestas del host
+    rtt = RTTEstimator(timeout, options.get("min_timeout", MIN_RTT_TIMEOUT)) if adaptive_timeout else None
+    
+    found = 0
+    
+    # Progreso: puertos comprobados (incluidos los de unidades ya completadas) sobre el total
+    total = len(ports) + done
+    completed = done
+    
+    if progress:
+        progress(completed, total)
+    
+    def add_result(result, restored=False):
+        """Publica un puerto encontrado y lo conserva si procede"""
+        nonlocal found, completed
         
-        for port in ports:
-            # Aplicar retraso si está habilitado
-            if evasion.get("enabled", False) and evasion.get("delay", 0.0) > 0:
-                time.sleep(evasion.get("delay", 0.0))
+        # Solo añadir puertos abiertos o filtrados
+        if result["state"] in ["open", "filtered"]:
+            found += 1
+            
+            # Los hallazgos restaurados ya están en el diario
+            if emit and not restored:
+                emit("port", result)
             
-            futures.append(executor.submit(scan_port, target, port, timeout))
+            # Los suscriptores (escaneo web, detección de OS...) arrancan con cada puerto abierto
+            if bus and result["state"] == "open":
+                bus.publish("port_open", dict(result, target=target))
+            
+            if retain:
+                results["ports"].append(result)
+        
+        # La unidad se marca completada cuando terminan todos sus puertos
+        if tracker and not restored:
+            tracker.complete(position[result["port"]])
         
-        for future in futures:
-            try:
-                result = future.result()
+        if progress and not restored:
+            completed += 1
+            progress(completed, total)
+    
+    # Hallazgos de las unidades ya completadas en una ejecución anterior
+    if tracker:
+        for result in checkpoint.restored("port"):
+            if result.get("port") in position and tracker.is_done(position[result["port"]]):
+                add_result(result, restored=True)
+    
+    # Escanear puertos
+    if engine == "async":
+        concurrency = _raise_fd_limit(concurrency)
+        delay = evasion.get("delay", 0.0) if evasion.get("enabled", False) else 0.0
+        
+        logger.info(f"Usando motor asíncrono con {concurrency} conexiones simultáneas")
+        
+        asyncio.run(async_scan_ports(ip, ports, timeout, concurrency, delay, add_result, rtt, cancel))
+    else:
+        # Usar el pool global del framework si existe (escaneo multi-objetivo)
+        pool = nullcontext(executor) if executor else ThreadPoolExecutor(max_workers=threads)
+        
+        def collect(done):
+            for future in done:
+                try:
+                    add_result(future.result())
+                except Exception as e:
+                    logger.error(f"Error en escaneo de puertos: {e}")
+        
+        # Ventana de envío acotada: con el pool global cada objetivo solo ocupa su ventana, no toda su lista de puertos
+        window = max(threads, 1) * SUBMIT_WINDOW_FACTOR
+        
+        with pool as executor:
+            futures = set()
+            
+            for port in ports:
+                # Cancelación: no se envían más puertos y se descartan los que aún no han empezado
+                if cancel and cancel.is_set():
+                    break
                 
-                # Solo añadir puertos abiertos o filtrados
-                if result["state"] in ["open", "filtered"]:
-                    results["ports"].append(result)
-            except Exception as e:
-                logger.error(f"Error en escaneo de puertos: {e}")
+                # Aplicar retraso si está habilitado
+                if evasion.get("enabled", False) and evasion.get("delay", 0.0) > 0:
+                    time.sleep(evasion.get("delay", 0.0))
+                
+                futures.add(executor.submit(scan_port, target, port, timeout, rtt))
+                
+                if len(futures) >= window:
+                    done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+            
+            if cancel and cancel.is_set():
+                logger.info("Escaneo de puertos cancelado")
+                
+                for pending in futures:
+                    pending.cancel()
+                
+                futures = {future for future in futures if not future.cancelled()}
+            
+            collect(wait(futures)[0])
     
     # Ordenar puertos
     results["ports"].sort(key=lambda x: x["port"])
     
-    logger.info(f"Escaneo de puertos completado. Encontrados {len(results['ports'])} puertos abiertos/filtrados.")
+    # RTT aprendido
+    if rtt:
+        results["rtt"] = rtt.to_dict()
+    
+    logger.info(f"Escaneo de puertos completado. Encontrados {found} puertos abiertos/filtrados.")
     
     return results
 
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Módulo de detección de servicios para AutoEnum
+"""
+
+import ssl
+import socket
+import asyncio
+import logging
+from autoenum.utils.service_probes import get_service_db
+
+logger = logging.getLogger("AutoEnum.ServiceDetection")
+
+# Información del módulo
+MODULE_INFO = {
+    "name": "service_detection",
+    "description": "Detección de servicios por banner y sondas de protocolo",
+    "author": "AutoEnum Team",
+    "version": "1.0.0",
+    "category": "enumeration",
+    "inputs": ["port_open"],
+    "outputs": ["service"],
+    "streaming": True
+}
+
+# Servicios identificados simultáneamente
+SERVICE_CONCURRENCY = 100
+
+# Espera máxima de la respuesta a una sonda (segundos, acotada además por el timeout del escaneo)
+READ_TIMEOUT = 2.0
+
+# Espera de más datos tras el primer fragmento de una respuesta
+FOLLOWUP_WAIT = 0.2
+
+# Bytes leídos como máximo por sonda
+MAX_RESPONSE = 4096
+
+# Caracteres del banner conservados en los resultados
+MAX_BANNER_TEXT = 256
+
+# Intensidad por defecto (como nmap): las sondas con rarity mayor solo se prueban en los puertos que las declaran
+INTENSITY = 7
+
+def _ssl_context():
+    # Mismo criterio que verify=False en requests: solo interesa el servicio, no el certificado
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+_SSL_CONTEXT = _ssl_context()
+
+def format_banner(response):
+    """Banner imprimible (caracteres de control escapados) y truncado para los resultados"""
+    return response[:MAX_BANNER_TEXT].decode("latin-1").encode("unicode_escape").decode("ascii")
+
+async def read_response(reader, read_timeout, identify=None):
+    """Lee la respuesta hasta que se identifica, se cierra la conexión o deja de llegar en el plazo: (respuesta, identificación)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + read_timeout
+    response = b""
+    identified = None
+    wait = read_timeout
+    
+    while len(response) < MAX_RESPONSE and wait > 0:
+        try:
+            chunk = await asyncio.wait_for(reader.read(MAX_RESPONSE - len(response)), wait)
+        except asyncio.TimeoutError:
+            break
+        
+        if not chunk:
+            break
+        
+        response += chunk
+        
+        # Parar en cuanto una regla reconoce la respuesta (la cabecera basta en la mayoría de protocolos)
+        if identify:
+            identified = identify(response)
+            
+            if identified and not identified["soft"]:
+                break
+        
+        wait = min(FOLLOWUP_WAIT, deadline - loop.time())
+    
+    return response, identified
+
+async def send_probe(ip, port, probe, db, tls=False, timeout=5, read_timeout=READ_TIMEOUT):
+    """Envía una sonda en una conexión nueva: (respuesta, identificación) o None si no se pudo conectar"""
+    read_timeout = min(read_timeout, probe["totalwaitms"] / 1000)
+    
+    try:
+        if tls:
+            # Un servicio sin TLS no contesta al ClientHello: el saludo se acota como una lectura
+            connection = asyncio.open_connection(ip, port, ssl=_SSL_CONTEXT, ssl_handshake_timeout=read_timeout)
+            timeout += read_timeout
+        else:
+            connection = asyncio.open_connection(ip, port)
+        
+        reader, writer = await asyncio.wait_for(connection, timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    
+    try:
+        if probe["payload"]:
+            writer.write(probe["payload"])
+            await writer.drain()
+        
+        return await read_response(reader, read_timeout, lambda response: db.match(probe["name"], response))
+    
+    except (OSError, asyncio.TimeoutError):
+        return b"", None
+    
+    finally:
+        writer.close()
+        
+        try:
+            await writer.wait_closed()
+        except (OSError, asyncio.TimeoutError):
+            pass
+
+def _identified_result(result, probe, response, identified, tls):
+    # Servicio sobre TLS con la notación de nmap (ssl/http)
+    if tls:
+        identified["service"] = f"ssl/{identified['service']}"
+    
+    result.update((field, value) for field, value in identified.items() if value)
+    result["banner"] = format_banner(response)
+    result["probe"] = probe["name"]
+    result["method"] = "probe" if probe["payload"] else "banner"
+    
+    return result
+
+async def identify_service(ip, port, service="", timeout=5, budget=None, db=None, intensity=INTENSITY):
+    """Prueba las sondas del puerto por orden de probabilidad hasta la primera que lo identifica"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (budget or 3 * timeout)
+    read_timeout = min(READ_TIMEOUT, timeout)
+    db = db or get_service_db()
+    
+    result = {
+        "port": port,
+        "service": service,
+        "product": "",
+        "version": "",
+        "info": "",
+        "banner": "",
+        "probe": "",
+        "method": "port"
+    }
+    
+    tls = False
+    soft = None
+    probes = db.order_probes(port, tls, intensity)
+    
+    while probes:
+        probe = probes.pop(0)
+        remaining = deadline - loop.time()
+        
+        if remaining <= 0:
+            break
+        
+        # Tras una coincidencia parcial (softmatch) solo sirven las sondas con reglas de ese servicio
+        if soft and soft[2]["service"] not in probe["services"]:
+            continue
+        
+        outcome = await send_probe(ip, port, probe, db, tls, min(timeout, remaining), min(read_timeout, remaining))
+        
+        # Sin conexión TCP (o sin saludo TLS dentro del túnel) ninguna otra sonda responderá
+        if outcome is None:
+            break
+        
+        response, identified = outcome
+        
+        if not response:
+            continue
+        
+        # Primer banner recibido (aunque ninguna regla lo reconozca)
+        if not result["banner"]:
+            result["banner"] = format_banner(response)
+            result["probe"] = probe["name"]
+        
+        if identified is None:
+            continue
+        
+        # Servicio sobre TLS: se vuelve a sondear dentro del túnel, primero con las sondas que declaran el puerto en sslports
+        if identified["service"] == "ssl":
+            if not tls:
+                tls = True
+                probes = [p for p in db.order_probes(port, tls, intensity) if p is not probe]
+            continue
+        
+        if identified["soft"]:
+            soft = soft or (probe, response, identified)
+            continue
+        
+        return _identified_result(result, probe, response, identified, tls)
+    
+    if soft:
+        return _identified_result(result, *soft, tls)
+    
+    # Sin coincidencias: TLS aceptado o el nombre asociado al puerto
+    if tls:
+        result["service"] = "ssl"
+        result["method"] = "probe"
+    
+    return result
+
+async def async_identify_services(ip, ports, timeout=5, concurrency=SERVICE_CONCURRENCY, budget=None, on_result=None, cancel=None, db=None, intensity=INTENSITY):
+    """Identifica los servicios de los puertos (lista o iterador bloqueante) con hasta `concurrency` en paralelo"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=concurrency)
+    results = []
+    
+    # Sin callback se acumulan los resultados y se devuelven al final
+    if on_result is None:
+        on_result = results.append
+    
+    async def produce():
+        # El iterador puede bloquear (eventos del escaneo de puertos): se lee fuera del bucle de eventos
+        pending = iter(ports)
+        
+        try:
+            while not (cancel and cancel.is_set()):
+                record = await loop.run_in_executor(None, next, pending, None)
+                
+                if record is None:
+                    break
+                
+                await queue.put(record)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+    
+    async def worker():
+        while (record := await queue.get()) is not None:
+            if cancel and cancel.is_set():
+                continue
+            
+            on_result(await identify_service(ip, record.get("port"), record.get("service", ""), timeout, budget, db, intensity))
+    
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    await asyncio.gather(produce(), *workers)
+    
+    return results
+
+def scan(target, options=None):
+    """Función principal de detección de servicios"""
+    if options is None:
+        options = {}
+    
+    logger.info(f"Iniciando detección de servicios en {target}")
+    
+    # Opciones
+    timeout = options.get("timeout", 5)
+    concurrency = options.get("concurrency", SERVICE_CONCURRENCY)
+    budget = options.get("budget")
+    intensity = options.get("intensity", INTENSITY)
+    emit = options.get("emit")
+    retain = options.get("retain", True)
+    progress = options.get("progress")
+    cancel = options.get("cancel")
+    
+    # Resultados
+    results = {
+        "target": target,
+        "services": []
+    }
+    
+    # Resolver IP
+    try:
+        ip = socket.gethostbyname(target)
+    except socket.gaierror:
+        logger.error(f"No se pudo resolver el nombre: {target}")
+        return results
+    
+    # Base de sondas compilada una vez por proceso (la incluida o un nmap-service-probes)
+    try:
+        db = get_service_db(options.get("probes_file"))
+    except (OSError, ValueError) as e:
+        logger.error(f"No se pudo cargar la base de sondas de servicios: {e}")
+        return results
+    
+    # Puertos abiertos: eventos port_open del escaneo de puertos según aparecen o resultados ya completados
+    feed = options.get("feed")
+    
+    if feed is not None:
+        ports = (data for topic, data in feed if topic == "port_open")
+    else:
+        ports = [p for p in options.get("ports") or [] if p.get("state", "open") == "open"]
+    
+    # Progreso: servicios identificados sobre puertos recibidos hasta el momento
+    received = 0
+    completed = 0
+    
+    def count(records):
+        nonlocal received
+        
+        for record in records:
+            received += 1
+            yield record
+    
+    found = 0
+    
+    def add_service(result):
+        """Publica un servicio identificado y lo conserva si procede"""
+        nonlocal found, completed
+        
+        if result["method"] != "port":
+            found += 1
+        
+        if emit:
+            emit("service", result)
+        
+        if retain:
+            results["services"].append(result)
+        
+        if progress:
+            completed += 1
+            progress(completed, received)
+    
+    asyncio.run(async_identify_services(ip, count(ports), timeout, concurrency, budget, add_service, cancel, db, intensity))
+    
+    # Ordenar servicios
+    results["services"].sort(key=lambda x: x["port"])
+    
+    logger.info(f"Detección de servicios completada. Identificados {found} servicios.")
+    
+    return results
+
+if __name__ == "__main__":
+    # Configuración para pruebas
+    logging.basicConfig(level=logging.INFO)
+    
+    import sys
+    if len(sys.argv) > 2:
+        target = sys.argv[1]
+        ports = [{"port": int(port)} for port in sys.argv[2].split(",")]
+        
+        results = scan(target, {"ports": ports})
+        
+        print(f"Servicios en {target}:")
+        
+        for service in results["services"]:
+            version = " ".join(part for part in (service["product"], service["version"]) if part)
+            print(f"Puerto {service['port']}: {service['service'] or 'desconocido'} {version}".rstrip())
+            
+            if service["banner"]:
+                print(f"    {service['banner'][:80]}")
+    else:
+        print("Uso: python service_detection.py <target> <puerto1,puerto2,...>")
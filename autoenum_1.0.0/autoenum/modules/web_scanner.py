@@ -4,13 +4,22 @@ Módulo de escaneo web para AutoEnum
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import os
 import logging
 import time
 import random
-import re
+import mmap
+import uuid
+import hashlib
+import asyncio
 from urllib.parse import urljoin, urlparse
-from concurrent.futures import ThreadPoolExecutor
-from bs4 import BeautifulSoup
+from itertools import takewhile
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from autoenum.utils.async_http import AsyncHTTPClient
+from autoenum.utils.html_title import extract_title, extract_title_bs4, get_declared_charset
+from autoenum.utils.signatures import get_technology_matcher
 
 logger = logging.getLogger("AutoEnum.WebScanner")
 
@@ -20,7 +29,11 @@ MODULE_INFO = {
     "description": "Escáner web básico",
     "author": "AutoEnum Team",
     "version": "1.0.0",
-    "category": "reconnaissance"
+    "category": "reconnaissance",
+    "resumable": True,
+    "inputs": ["port_open", "service"],
+    "outputs": ["url", "technology"],
+    "streaming": True
 }
 
 # Lista de User-Agents
@@ -32,54 +45,263 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/91.0.864.59 Safari/537.36"
 ]
 
+# Wordlist mínima por defecto
+DEFAULT_WORDLIST = [
+    "admin", "login", "wp-admin", "administrator", "phpmyadmin",
+    "dashboard", "wp-login.php", "admin.php", "index.php",
+    "images", "img", "css", "js", "static", "assets",
+    "api", "v1", "v2", "docs", "documentation",
+    "backup", "bak", "old", "new", "test", "dev",
+    "robots.txt", "sitemap.xml", ".git", ".env"
+]
+
+# Puertos HTTP/HTTPS habituales (además de los que el escáner identifica como servicio http)
+WEB_PORTS = [80, 443, 8080, 8443]
+HTTPS_PORTS = [443, 8443]
+
+# Bytes leídos como máximo en los modos de sondeo HEAD/Range
+PROBE_BYTES = 16384
+
+# Peticiones en vuelo por hilo antes de leer más palabras de la wordlist
+SUBMIT_WINDOW_FACTOR = 4
+
+# Palabras por unidad de trabajo en el diario de reanudación
+WORD_CHUNK = 500
+
+# Rutas aleatorias sondeadas por URL base para detectar respuestas comodín (soft-404)
+WILDCARD_PROBES = ("{token}", "{token}/", "{token}.php")
+
+# Diferencia de tamaño (bytes) tolerada frente a la respuesta comodín
+WILDCARD_SIZE_TOLERANCE = 64
+
 def get_random_user_agent():
     """Obtiene un User-Agent aleatorio"""
     return random.choice(USER_AGENTS)
 
-def check_url(url, timeout=5, user_agent=None):
+def create_session(threads=10, user_agent=None):
+    """Crea una sesión HTTP con pool de conexiones keep-alive compartido entre hilos"""
+    session = requests.Session()
+    session.verify = False
+    
+    # Una conexión persistente por hilo: TCP y TLS se negocian una sola vez por conexión. Con un pool de hilos
+    # mayor (el compartido en escaneos multi-objetivo) las peticiones sobrantes esperan una conexión libre
+    # en lugar de abrir conexiones que se descartan al devolverlas
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(threads, 1), pool_block=True, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    if user_agent and user_agent != "random":
+        session.headers["User-Agent"] = user_agent
+    
+    return session
+
+def get_request_headers(user_agent=None):
+    """Cabeceras de la petición según la configuración de User-Agent"""
+    headers = {}
+    
+    if user_agent:
+        if user_agent == "random":
+            headers["User-Agent"] = get_random_user_agent()
+        else:
+            headers["User-Agent"] = user_agent
+    
+    return headers
+
+def fetch_url(url, timeout=5, user_agent=None, session=None):
+    """Realiza la petición GET de una URL (con la sesión si se proporciona)"""
+    headers = get_request_headers(user_agent)
+    
+    client = session or requests
+    return client.get(url, timeout=timeout, headers=headers, allow_redirects=True, verify=False)
+
+def build_url_result(url, response, title_fallback=False):
+    """Construye el resultado de una URL a partir de su respuesta"""
+    return {
+        "url": url,
+        "status": response.status_code,
+        "size": len(response.content),
+        "title": get_page_title(response.content, get_declared_charset(response.headers.get("Content-Type")), title_fallback) if response.status_code == 200 else "",
+        "server": response.headers.get("Server", ""),
+        "content_type": response.headers.get("Content-Type", "")
+    }
+
+def get_probe_size(status, content_range, content_length, data):
+    """Tamaño del recurso: Content-Range o Content-Length si existen, si no los bytes leídos"""
+    # 206: "bytes 0-N/TOTAL"
+    if status == 206 and content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1].strip()
+        if total.isdigit():
+            return int(total)
+    
+    if content_length and content_length.isdigit():
+        return int(content_length)
+    
+    return len(data) if data else 0
+
+def build_probe_result(url, status, headers, data, encoding=None, title_fallback=False):
+    """Construye el resultado de una URL sondeada con HEAD o GET parcial"""
+    size = get_probe_size(status, headers.get("Content-Range"), headers.get("Content-Length"), data)
+    
+    # Una respuesta parcial equivale a un 200 del recurso completo
+    if status == 206:
+        status = 200
+    
+    title = ""
+    if status == 200 and data:
+        title = get_page_title(data, encoding, title_fallback)
+    
+    return {
+        "url": url,
+        "status": status,
+        "size": size,
+        "title": title,
+        "server": headers.get("Server", ""),
+        "content_type": headers.get("Content-Type", "")
+    }
+
+def probe_url(url, timeout=5, user_agent=None, session=None, probe="range", max_bytes=PROBE_BYTES, title_fallback=False):
+    """Verifica una URL sin descargar el cuerpo completo (HEAD y/o GET con Range)"""
+    return _probe_url(url, timeout, user_agent, session, probe, max_bytes, title_fallback)[0]
+
+def _probe_url(url, timeout, user_agent, session, probe, max_bytes, title_fallback=False):
+    client = session or requests
+    
+    if probe == "head":
+        response = client.head(url, timeout=timeout, headers=get_request_headers(user_agent), allow_redirects=True, verify=False)
+        response.close()
+        
+        # Solo los aciertos necesitan el cuerpo (título); 405/501: HEAD no soportado
+        if response.status_code not in (200, 405, 501):
+            return build_probe_result(url, response.status_code, response.headers, None), b"", response.url
+    
+    # GET parcial: se leen como mucho max_bytes y se descarta el resto
+    headers = get_request_headers(user_agent)
+    headers["Range"] = f"bytes=0-{max_bytes - 1}"
+    
+    response = client.get(url, timeout=timeout, headers=headers, allow_redirects=True, verify=False, stream=True)
+    
+    try:
+        data = response.raw.read(max_bytes, decode_content=True)
+    finally:
+        response.close()
+    
+    return build_probe_result(url, response.status_code, response.headers, data, get_declared_charset(response.headers.get("Content-Type")), title_fallback), data, response.url
+
+def check_url(url, timeout=5, user_agent=None, session=None, probe="get", max_bytes=PROBE_BYTES, title_fallback=False):
     """Verifica una URL"""
+    return _check_url(url, timeout, user_agent, session, probe, max_bytes, title_fallback)[0]
+
+def _check_url(url, timeout, user_agent, session, probe, max_bytes, title_fallback=False):
+    # Devuelve (resultado, cuerpo leído, URL final) para poder calcular la huella
     try:
-        headers = {}
-        
-        if user_agent:
-            if user_agent == "random":
-                headers["User-Agent"] = get_random_user_agent()
-            else:
-                headers["User-Agent"] = user_agent
+        if probe in ("head", "range"):
+            return _probe_url(url, timeout, user_agent, session, probe, max_bytes, title_fallback)
         
-        response = requests.get(url, timeout=timeout, headers=headers, allow_redirects=True, verify=False)
+        response = fetch_url(url, timeout, user_agent, session)
         
-        return {
-            "url": url,
-            "status": response.status_code,
-            "size": len(response.content),
-            "title": get_page_title(response.text) if response.status_code == 200 else "",
-            "server": response.headers.get("Server", ""),
-            "content_type": response.headers.get("Content-Type", "")
-        }
+        return build_url_result(url, response, title_fallback), response.content, response.url
     
     except requests.exceptions.RequestException as e:
         logger.debug(f"Error al verificar URL {url}: {e}")
-        return {
-            "url": url,
-            "status": 0,
-            "size": 0,
-            "title": "",
-            "server": "",
-            "content_type": ""
-        }
-
-def get_page_title(html):
-    """Extrae el título de una página HTML"""
+        return empty_url_result(url), b"", url
+
+def empty_url_result(url):
+    """Resultado de una URL sin respuesta"""
+    return {
+        "url": url,
+        "status": 0,
+        "size": 0,
+        "title": "",
+        "server": "",
+        "content_type": ""
+    }
+
+def response_fingerprint(result, body, final_url, word):
+    """Huella de una respuesta: estado, tamaño, hash del cuerpo y destino de redirección"""
+    # La palabra solicitada suele reflejarse en el cuerpo y en la redirección
+    token = word.strip("/").encode("utf-8", errors="replace")
+    
+    body_hash = ""
+    if body:
+        body_hash = hashlib.md5(body.replace(token, b"") if token else body).hexdigest()
+    
+    redirect = ""
+    if final_url and final_url != result["url"]:
+        redirect = urlparse(final_url).path
+        
+        if token:
+            redirect = redirect.replace(word.strip("/"), "{word}")
+    
+    return {
+        "status": result["status"],
+        "size": result["size"],
+        "hash": body_hash,
+        "redirect": redirect
+    }
+
+def matches_wildcard(fingerprint, baseline):
+    """Indica si una huella coincide con alguna de las respuestas comodín"""
+    for reference in baseline:
+        if fingerprint["status"] != reference["status"] or fingerprint["redirect"] != reference["redirect"]:
+            continue
+        
+        # Con cuerpo en ambas respuestas decide el hash: un tamaño parecido no basta para descartar una página real
+        if fingerprint["hash"] and reference["hash"]:
+            if fingerprint["hash"] == reference["hash"]:
+                return True
+            continue
+        
+        # Sin cuerpo que comparar (vacío, HEAD o redirección): mismo tamaño aproximado
+        if abs(fingerprint["size"] - reference["size"]) <= WILDCARD_SIZE_TOLERANCE:
+            return True
+    
+    return False
+
+def wildcard_paths():
+    """Rutas aleatorias (palabra, ruta) que no deberían existir en el servidor"""
+    token = uuid.uuid4().hex[:12]
+    
+    return [(token, path.format(token=token)) for path in WILDCARD_PROBES]
+
+def build_wildcard_baseline(base_url, responses):
+    """Construye la huella comodín a partir de las respuestas a rutas aleatorias"""
+    baseline = []
+    
+    for word, (result, body, final_url) in responses:
+        # Sin respuesta no hay nada que comparar; un 404 limpio no es una respuesta comodín
+        if result["status"] in (0, 404):
+            continue
+        
+        baseline.append(response_fingerprint(result, body, final_url, word))
+    
+    if baseline:
+        logger.info(f"Respuesta comodín detectada en {base_url}: se descartarán las coincidencias")
+    
+    return baseline
+
+def get_wildcard_baseline(base_url, timeout=5, user_agent=None, session=None, probe="get", max_bytes=PROBE_BYTES):
+    """Obtiene la huella de las respuestas comodín de una URL base (una vez por fuerza bruta)"""
+    responses = [
+        (word, _check_url(urljoin(base_url, path), timeout, user_agent, session, probe, max_bytes))
+        for word, path in wildcard_paths()
+    ]
+    
+    return build_wildcard_baseline(base_url, responses)
+
+def get_page_title(html, encoding=None, title_fallback=False):
+    """Extrae el título de una página HTML (bytes o texto); con title_fallback recurre a BeautifulSoup si no lo encuentra"""
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        title = soup.title.string if soup.title else ""
-        return title.strip()
+        title = extract_title(html, encoding)
+        
+        if title is None and title_fallback:
+            title = extract_title_bs4(html, encoding)
+        
+        return title or ""
     except:
         return ""
 
 def detect_technologies(response):
-    """Detecta tecnologías web basadas en cabeceras y contenido"""
+    """Detecta tecnologías web basadas en cabeceras, cookies y contenido"""
     technologies = []
     
     # Verificar cabeceras
@@ -93,68 +315,285 @@ def detect_technologies(response):
         value = headers["Server"]
         technologies.append(value)
     
-    # Verificar cookies
-    cookies = response.cookies
+    # Firmas precompiladas (cargadas una sola vez): cabeceras, cookies, HTML, scripts y meta
+    charset = get_declared_charset(headers.get("Content-Type")) or "utf-8"
     
-    if "PHPSESSID" in cookies:
-        technologies.append("PHP")
-    
-    if "JSESSIONID" in cookies:
-        technologies.append("Java")
+    try:
+        content = response.content.decode(charset, errors="replace")
+    except LookupError:
+        content = response.content.decode("utf-8", errors="replace")
     
-    if "ASP.NET_SessionId" in cookies:
-        technologies.append("ASP.NET")
+    found = get_technology_matcher().detect(headers, response.cookies.get_dict(), content)
     
-    # Verificar contenido
-    content = response.text.lower()
+    for tech, version in found.items():
+        technologies.append(f"{tech} {version}" if version else tech)
     
-    patterns = {
-        "WordPress": [r"wp-content", r"wp-includes"],
-        "Joomla": [r"joomla", r"com_content"],
-        "Drupal": [r"drupal", r"sites/all"],
-        "jQuery": [r"jquery"],
-        "Bootstrap": [r"bootstrap"],
-        "React": [r"react", r"reactjs"],
-        "Angular": [r"angular", r"ng-"],
-        "Vue.js": [r"vue", r"vuejs"]
+    return list(set(technologies))
+
+def build_async_url_result(url, response, title_fallback=False):
+    """Construye el resultado de una URL a partir de una respuesta del cliente asíncrono"""
+    return {
+        "url": url,
+        "status": response.status,
+        "size": len(response.body),
+        "title": get_page_title(response.body, get_declared_charset(response.headers.get("content-type")), title_fallback) if response.status == 200 else "",
+        "server": response.headers.get("server", ""),
+        "content_type": response.headers.get("content-type", "")
+    }
+
+def build_async_probe_result(url, response, title_fallback=False):
+    """Construye el resultado de una URL sondeada con el cliente asíncrono"""
+    headers = {
+        "Content-Range": response.headers.get("content-range"),
+        "Content-Length": response.headers.get("content-length"),
+        "Server": response.headers.get("server", ""),
+        "Content-Type": response.headers.get("content-type", "")
     }
     
-    for tech, patterns_list in patterns.items():
-        for pattern in patterns_list:
-            if re.search(pattern, content):
-                technologies.append(tech)
-                break
+    return build_probe_result(url, response.status, headers, response.body, get_declared_charset(headers["Content-Type"]), title_fallback)
+
+async def async_check_url(client, url, user_agent=None, probe="get", max_bytes=PROBE_BYTES, title_fallback=False):
+    """Verifica una URL con el cliente HTTP asíncrono"""
+    return (await _async_check_url(client, url, user_agent, probe, max_bytes, title_fallback))[0]
+
+async def _async_check_url(client, url, user_agent, probe, max_bytes, title_fallback=False):
+    # Devuelve (resultado, cuerpo leído, URL final) para poder calcular la huella
+    headers = {}
     
-    return list(set(technologies))
+    if user_agent == "random":
+        headers["User-Agent"] = get_random_user_agent()
+    
+    try:
+        if probe == "head":
+            response = await client.request("HEAD", url, headers)
+            
+            # Solo los aciertos necesitan el cuerpo (título); 405/501: HEAD no soportado
+            if response.status not in (200, 405, 501):
+                return build_async_probe_result(url, response, title_fallback), b"", response.url
+        
+        if probe in ("head", "range"):
+            headers["Range"] = f"bytes=0-{max_bytes - 1}"
+            response = await client.request("GET", url, headers, max_body=max_bytes)
+            
+            return build_async_probe_result(url, response, title_fallback), response.body, response.url
+        
+        response = await client.request("GET", url, headers)
+        
+        return build_async_url_result(url, response, title_fallback), response.body, response.url
+    
+    except (asyncio.TimeoutError, OSError, ValueError) as e:
+        logger.debug(f"Error al verificar URL {url}: {e}")
+        return empty_url_result(url), b"", url
 
-def directory_bruteforce(base_url, wordlist, threads=10, timeout=5, user_agent=None):
-    """Realiza fuerza bruta de directorios"""
-    results = []
+async def async_get_wildcard_baseline(client, base_url, user_agent=None, probe="get", max_bytes=PROBE_BYTES):
+    """Obtiene la huella de las respuestas comodín con el cliente asíncrono (una vez por fuerza bruta)"""
+    paths = wildcard_paths()
+    checks = await asyncio.gather(*[
+        _async_check_url(client, urljoin(base_url, path), user_agent, probe, max_bytes)
+        for _, path in paths
+    ])
+    
+    return build_wildcard_baseline(base_url, [(word, check) for (word, _), check in zip(paths, checks)])
+
+def iter_words(wordlist, tracker=None):
+    """Genera (índice, palabra) de la wordlist sin vacías ni comentarios, saltando las unidades ya completadas"""
+    index = 0
     
-    with ThreadPoolExecutor(max_workers=threads) as executor:
-        futures = []
+    for word in wordlist:
+        word = word.strip()
+        
+        if not word or word.startswith("#"):
+            continue
         
-        for word in wordlist:
-            word = word.strip()
+        if tracker is None or not tracker.is_done(index):
+            if tracker:
+                tracker.submit(index)
             
-            if not word or word.startswith("#"):
-                continue
+            yield index, word
+        
+        index += 1
+
+async def async_directory_bruteforce(base_url, wordlist, concurrency=200, timeout=5, user_agent=None, on_result=None, probe="get", max_bytes=PROBE_BYTES, wildcard_filter=True, tracker=None, on_progress=None, title_fallback=False):
+    """Fuerza bruta de directorios con hasta `concurrency` peticiones simultáneas en un solo hilo"""
+    results = []
+    
+    # Sin callback se acumulan los resultados y se devuelven al final
+    if on_result is None:
+        on_result = results.append
+    
+    # Iterador compartido: cada worker toma la siguiente palabra pendiente
+    pending = iter_words(wordlist, tracker)
+    
+    client = AsyncHTTPClient(
+        limit_per_host=concurrency,
+        timeout=timeout,
+        user_agent=user_agent if user_agent and user_agent != "random" else None
+    )
+    
+    baseline = []
+    
+    async def worker():
+        for index, word in pending:
+            result, body, final_url = await _async_check_url(client, urljoin(base_url, word), user_agent, probe, max_bytes, title_fallback)
             
-            url = urljoin(base_url, word)
-            futures.append(executor.submit(check_url, url, timeout, user_agent))
+            # Solo añadir resultados con respuesta que no coincidan con la respuesta comodín
+            if result["status"] != 0 and not (baseline and matches_wildcard(response_fingerprint(result, body, final_url, word), baseline)):
+                on_result(result)
+            
+            if tracker:
+                tracker.complete(index)
+            
+            if on_progress:
+                on_progress()
+    
+    async with client:
+        if wildcard_filter:
+            baseline = await async_get_wildcard_baseline(client, base_url, user_agent, probe, max_bytes)
+        
+        await asyncio.gather(*[worker() for _ in range(max(1, concurrency))])
+    
+    if tracker:
+        tracker.close()
+    
+    return results
+
+def directory_bruteforce(base_url, wordlist, threads=10, timeout=5, user_agent=None, executor=None, on_result=None, session=None, engine="thread", concurrency=200, probe="get", max_bytes=PROBE_BYTES, wildcard_filter=True, tracker=None, on_progress=None, title_fallback=False):
+    """Realiza fuerza bruta de directorios (on_progress() se llama al terminar cada palabra)"""
+    if engine == "async":
+        return asyncio.run(async_directory_bruteforce(base_url, wordlist, concurrency, timeout, user_agent, on_result, probe, max_bytes, wildcard_filter, tracker, on_progress, title_fallback))
+    
+    results = []
+    
+    # Sesión con pool de conexiones compartida por todos los hilos
+    own_session = session is None
+    if own_session:
+        session = create_session(threads, user_agent)
+    
+    # Sin callback se acumulan los resultados y se devuelven al final
+    if on_result is None:
+        on_result = results.append
+    
+    # Huella de las respuestas a rutas inexistentes, calculada para esta fuerza bruta (vacía si el servidor devuelve 404 limpios)
+    baseline = get_wildcard_baseline(base_url, timeout, user_agent, session, probe, max_bytes) if wildcard_filter else []
+    
+    def check_word(word):
+        """Verifica una palabra y descarta en el propio worker las respuestas comodín"""
+        result, body, final_url = _check_url(urljoin(base_url, word), timeout, user_agent, session, probe, max_bytes, title_fallback)
+        
+        if result["status"] != 0 and baseline and matches_wildcard(response_fingerprint(result, body, final_url, word), baseline):
+            return None
         
-        for future in futures:
+        return result
+    
+    # Usar el pool global del framework si existe (escaneo multi-objetivo)
+    pool = nullcontext(executor) if executor else ThreadPoolExecutor(max_workers=threads)
+    
+    # Índice de la palabra de cada petición en vuelo (unidades del diario de reanudación)
+    indexes = {}
+    
+    def collect(done):
+        for future in done:
+            index = indexes.pop(future)
+            
             try:
                 result = future.result()
                 
                 # Solo añadir resultados con respuesta
-                if result["status"] != 0:
-                    results.append(result)
+                if result is not None and result["status"] != 0:
+                    on_result(result)
+                
+                if tracker:
+                    tracker.complete(index)
             except Exception as e:
                 logger.error(f"Error en fuerza bruta de directorios: {e}")
+            
+            if on_progress:
+                on_progress()
+    
+    # Ventana de envío acotada: la wordlist se consume según se liberan huecos
+    window = max(threads, 1) * SUBMIT_WINDOW_FACTOR
+    
+    with pool as executor:
+        futures = set()
+        
+        for index, word in iter_words(wordlist, tracker):
+            future = executor.submit(check_word, word)
+            indexes[future] = index
+            futures.add(future)
+            
+            if len(futures) >= window:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                collect(done)
+        
+        collect(wait(futures)[0])
+    
+    if tracker:
+        tracker.close()
+    
+    if own_session:
+        session.close()
     
     return results
 
+def wordlist_size(wordlist_path):
+    """Tamaño de una wordlist en las unidades de on_read de iter_wordlist (bytes del fichero o palabras por defecto)"""
+    if wordlist_path:
+        try:
+            return os.path.getsize(wordlist_path)
+        except OSError:
+            pass
+    
+    return len(DEFAULT_WORDLIST)
+
+def _default_words(on_read=None):
+    for word in DEFAULT_WORDLIST:
+        if on_read:
+            on_read(1)
+        
+        yield word
+
+def iter_wordlist(wordlist_path, use_mmap=False, on_read=None):
+    """Genera las palabras de una wordlist de forma perezosa (sin vacías ni comentarios); on_read(n) recibe lo leído"""
+    if not wordlist_path:
+        yield from _default_words(on_read)
+        return
+    
+    try:
+        f = open(wordlist_path, "rb")
+    except OSError as e:
+        logger.error(f"Error al cargar wordlist {wordlist_path}: {e}")
+        yield from _default_words(on_read)
+        return
+    
+    mapped = None
+    lines = f
+    
+    # Lectura mapeada en memoria: el sistema pagina el fichero bajo demanda
+    if use_mmap:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            lines = iter(mapped.readline, b"")
+        except (ValueError, OSError) as e:
+            # Fichero vacío o no mapeable
+            logger.debug(f"No se pudo mapear {wordlist_path}: {e}")
+    
+    try:
+        for line in lines:
+            if on_read:
+                on_read(len(line))
+            
+            word = line.strip()
+            
+            if not word or word.startswith(b"#"):
+                continue
+            
+            yield word.decode("utf-8", errors="replace")
+    finally:
+        if mapped is not None:
+            mapped.close()
+        
+        f.close()
+
 def load_wordlist(wordlist_path):
     """Carga una wordlist desde un archivo"""
     try:
@@ -164,14 +603,36 @@ def load_wordlist(wordlist_path):
         logger.error(f"Error al cargar wordlist {wordlist_path}: {e}")
         
         # Wordlist mínima por defecto
-        return [
-            "admin", "login", "wp-admin", "administrator", "phpmyadmin",
-            "dashboard", "wp-login.php", "admin.php", "index.php",
-            "images", "img", "css", "js", "static", "assets",
-            "api", "v1", "v2", "docs", "documentation",
-            "backup", "bak", "old", "new", "test", "dev",
-            "robots.txt", "sitemap.xml", ".git", ".env"
-        ]
+        return list(DEFAULT_WORDLIST)
+
+def is_web_port(port, service=""):
+    """Indica si un puerto abierto corresponde a un servicio web"""
+    return port in WEB_PORTS or "http" in (service or "")
+
+def iter_feed_urls(target, feed):
+    """URLs base de los puertos web publicados en el bus, una por puerto"""
+    seen = set()
+    
+    for topic, data in feed:
+        port = data.get("port")
+        service = data.get("service") or ""
+        
+        if port in seen:
+            continue
+        
+        # Puerto abierto con puerto o nombre web, o cualquier puerto que la detección de servicios (-s) identifica como http/ssl/http
+        if (topic == "port_open" and is_web_port(port, service)) or (topic == "service" and "http" in service):
+            seen.add(port)
+            yield build_base_url(target, port, service)
+
+def build_base_url(target, port, service=""):
+    """URL base de un servicio web según el puerto y el servicio"""
+    scheme = "https" if port in HTTPS_PORTS or (service or "").startswith(("https", "ssl/")) else "http"
+    
+    if (scheme, port) in (("http", 80), ("https", 443)):
+        return f"{scheme}://{target}"
+    
+    return f"{scheme}://{target}:{port}"
 
 def scan(target, options=None):
     """Función principal de escaneo web"""
@@ -185,7 +646,20 @@ def scan(target, options=None):
     threads = options.get("threads", 10)
     timeout = options.get("timeout", 5)
     wordlist_path = options.get("wordlist")
+    wordlist_mmap = options.get("wordlist_mmap", False)
     user_agent = options.get("user_agent", False)
+    executor = options.get("executor")
+    engine = options.get("engine", "thread")
+    http_concurrency = options.get("http_concurrency", 200)
+    probe = options.get("probe", "get")
+    probe_bytes = options.get("probe_bytes", PROBE_BYTES)
+    wildcard_filter = options.get("wildcard_filter", True)
+    checkpoint = options.get("checkpoint")
+    progress = options.get("progress")
+    cancel = options.get("cancel")
+    title_fallback = options.get("title_fallback", False)
+    emit = options.get("emit")
+    retain = options.get("retain", True)
     
     # Configurar User-Agent
     if user_agent:
@@ -201,56 +675,116 @@ def scan(target, options=None):
         "directories": []
     }
     
+    # Eventos port_open del escaneo de puertos según se descubren (suscripción al bus)
+    feed = options.get("feed")
+    open_ports = options.get("open_ports")
+    
     # Verificar si el objetivo ya incluye protocolo
     if target.startswith(("http://", "https://")):
         urls = [target]
+    elif feed is not None:
+        # Cada URL se genera al publicarse su puerto o al identificarse su servicio
+        urls = iter_feed_urls(target, feed)
+    elif open_ports is not None:
+        # Puertos abiertos ya conocidos: solo los que corresponden a servicios web
+        urls = [
+            build_base_url(target, p.get("port"), p.get("service"))
+            for p in open_ports if is_web_port(p.get("port"), p.get("service"))
+        ]
     else:
         # Crear URLs para cada puerto
-        urls = []
+        urls = [build_base_url(target, port) for port in ports]
+    
+    found = 0
+    
+    def add_directory(result, restored=False):
+        """Publica una URL encontrada y la conserva si procede"""
+        nonlocal found
+        found += 1
+        
+        # Los hallazgos restaurados ya están en el diario
+        if emit and not restored:
+            emit("url", result)
         
-        for port in ports:
-            if port == 80:
-                urls.append(f"http://{target}")
-            elif port == 443:
-                urls.append(f"https://{target}")
-            else:
-                urls.append(f"http://{target}:{port}")
+        if retain:
+            results["directories"].append(result)
+    
+    # Reanudación: hallazgos de la ejecución anterior (los duplicados se eliminan al final)
+    if checkpoint:
+        for result in checkpoint.restored("url"):
+            add_directory(result, restored=True)
+    
+    # Progreso: parte de la wordlist leída por URL base conocida (su tamaño, sin recorrerla antes para contarla)
+    wordlist_total = wordlist_size(wordlist_path) if progress else 0
+    bases = 0
+    checked = 0
+    
+    def word_read(amount):
+        nonlocal checked
+        checked += amount
+    
+    def word_done():
+        progress(checked, bases * wordlist_total)
+    
+    # Sesión HTTP compartida por la URL base y la fuerza bruta
+    session = create_session(threads, user_agent)
     
     # Verificar URLs base
     for url in urls:
+        if cancel and cancel.is_set():
+            logger.info("Escaneo web cancelado")
+            break
+        
         logger.info(f"Verificando URL base: {url}")
+        bases += 1
         
-        result = check_url(url, timeout, user_agent)
+        try:
+            response = fetch_url(url, timeout, user_agent, session)
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"Error al verificar URL {url}: {e}")
+            response = None
         
-        if result["status"] != 0:
+        if response is not None:
             # URL accesible
-            results["directories"].append(result)
+            result = build_url_result(url, response, title_fallback)
+            add_directory(result)
             
             # Guardar información del servidor web
             if result["server"]:
                 results["web_server"] = result["server"]
             
-            # Detectar tecnologías
+            # Detectar tecnologías reutilizando la respuesta de la URL base
             try:
-                response = requests.get(url, timeout=timeout, headers={"User-Agent": get_random_user_agent() if user_agent else "AutoEnum Scanner"}, verify=False)
-                
                 if response.status_code == 200:
                     technologies = detect_technologies(response)
                     results["technologies"].extend(technologies)
+                    
+                    if emit:
+                        for tech in technologies:
+                            emit("technology", tech)
             except:
                 pass
             
-            # Realizar fuerza bruta de directorios
-            if wordlist_path:
-                wordlist = load_wordlist(wordlist_path)
-            else:
-                # Usar wordlist mínima por defecto
-                wordlist = load_wordlist("")
+            # Realizar fuerza bruta de directorios (wordlist en streaming; mínima por defecto)
+            wordlist = iter_wordlist(wordlist_path, wordlist_mmap, word_read if progress else None)
+            
+            # Cancelación: la wordlist deja de alimentar la fuerza bruta (terminan las peticiones en vuelo)
+            if cancel:
+                wordlist = takewhile(lambda _: not cancel.is_set(), wordlist)
+            
+            logger.info(f"Iniciando fuerza bruta de directorios en {url} con {wordlist_path or 'la wordlist por defecto'}")
             
-            logger.info(f"Iniciando fuerza bruta de directorios en {url} con {len(wordlist)} palabras")
+            # Unidades de WORD_CHUNK palabras por URL base (desplazamientos en la wordlist)
+            tracker = checkpoint.tracker(f"words:{url}", WORD_CHUNK) if checkpoint else None
             
-            bruteforce_results = directory_bruteforce(url, wordlist, threads, timeout, user_agent)
-            results["directories"].extend(bruteforce_results)
+            directory_bruteforce(url, wordlist, threads, timeout, user_agent, executor, add_directory, session, engine, http_concurrency, probe, probe_bytes, wildcard_filter, tracker, word_done if progress else None, title_fallback)
+        
+        # URL terminada (o inaccesible): toda su wordlist cuenta como comprobada
+        if progress:
+            checked = bases * wordlist_total
+            progress(checked, bases * wordlist_total)
+    
+    session.close()
     
     # Eliminar duplicados y ordenar directorios
     unique_dirs = {}
@@ -263,7 +797,7 @@ def scan(target, options=None):
     # Eliminar duplicados en tecnologías
     results["technologies"] = list(set(results["technologies"]))
     
-    logger.info(f"Escaneo web completado. Encontrados {len(results['directories'])} directorios/archivos.")
+    logger.info(f"Escaneo web completado. Encontrados {found} directorios/archivos.")
     
     return results
 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP/1.1 asíncrono mínimo con pool de conexiones keep-alive por host
+"""
+
+import ssl
+import asyncio
+import logging
+from urllib.parse import urlsplit, urljoin
+
+logger = logging.getLogger("AutoEnum.AsyncHTTP")
+
+# Códigos de estado que nunca llevan cuerpo
+NO_BODY_STATUS = (204, 304)
+
+REDIRECT_STATUS = (301, 302, 303, 307, 308)
+
+class AsyncResponse:
+    """Respuesta HTTP leída por el cliente asíncrono"""
+    
+    def __init__(self, url, status, headers, body, truncated=False):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.truncated = truncated
+    
+    @property
+    def encoding(self):
+        """Charset declarado en Content-Type (utf-8 por defecto)"""
+        content_type = self.headers.get("content-type", "")
+        
+        for part in content_type.split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip("\"'")
+        
+        return "utf-8"
+    
+    @property
+    def text(self):
+        """Cuerpo decodificado"""
+        try:
+            return self.body.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+class AsyncHTTPClient:
+    """Cliente HTTP/1.1 con límite de conexiones por host y reutilización keep-alive"""
+    
+    def __init__(self, limit_per_host=100, timeout=5, user_agent=None, max_redirects=5):
+        """Inicializa el cliente"""
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent or "AutoEnum Scanner"
+        self.max_redirects = max_redirects
+        self._idle = {}
+        self._limits = {}
+        
+        # Mismo criterio que verify=False en requests
+        self._ssl_context = ssl.create_default_context()
+        self._ssl_context.check_hostname = False
+        self._ssl_context.verify_mode = ssl.CERT_NONE
+    
+    async def request(self, method, url, headers=None, allow_redirects=True, max_body=None):
+        """Realiza una petición y sigue redirecciones si se solicita"""
+        for _ in range(self.max_redirects + 1):
+            response = await asyncio.wait_for(self._request_once(method, url, headers, max_body), self.timeout)
+            
+            location = response.headers.get("location")
+            if not allow_redirects or response.status not in REDIRECT_STATUS or not location:
+                return response
+            
+            url = urljoin(url, location)
+            
+            if response.status == 303:
+                method = "GET"
+        
+        return response
+    
+    async def close(self):
+        """Cierra todas las conexiones inactivas"""
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        
+        self._idle.clear()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    async def _request_once(self, method, url, headers, max_body):
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        
+        host_header = host if parts.port is None else f"{host}:{port}"
+        
+        request_headers = {
+            "Host": host_header,
+            "User-Agent": self.user_agent,
+            "Accept": "*/*",
+            "Connection": "keep-alive"
+        }
+        request_headers.update(headers or {})
+        
+        request = f"{method} {path} HTTP/1.1\r\n"
+        request += "".join(f"{name}: {value}\r\n" for name, value in request_headers.items())
+        request = (request + "\r\n").encode("latin-1")
+        
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.limit_per_host)
+        
+        async with limit:
+            # Una conexión reutilizada puede haber sido cerrada por el servidor: reintentar una vez
+            for attempt in range(2):
+                reader, writer, reused = await self._acquire(key)
+                
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    
+                    response, reusable = await self._read_response(reader, url, method, max_body)
+                
+                except (asyncio.IncompleteReadError, ConnectionError) as e:
+                    writer.close()
+                    
+                    if reused and attempt == 0:
+                        continue
+                    
+                    raise ConnectionError(f"Conexión interrumpida: {e}")
+                
+                except asyncio.LimitOverrunError as e:
+                    # Línea de cabecera o de tamaño de bloque por encima del límite del lector
+                    writer.close()
+                    raise ConnectionError(f"Respuesta HTTP inválida: {e}")
+                
+                except BaseException:
+                    writer.close()
+                    raise
+                
+                if reusable:
+                    self._idle.setdefault(key, []).append((reader, writer))
+                else:
+                    writer.close()
+                
+                return response
+    
+    async def _acquire(self, key):
+        idle = self._idle.get(key)
+        
+        while idle:
+            reader, writer = idle.pop()
+            
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            
+            writer.close()
+        
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port,
+            ssl=self._ssl_context if scheme == "https" else None,
+            server_hostname=host if scheme == "https" else None
+        )
+        
+        return reader, writer, False
+    
+    async def _read_response(self, reader, url, method, max_body):
+        status_line = await reader.readuntil(b"\r\n")
+        
+        try:
+            version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+            status = int(status)
+        except ValueError:
+            raise ConnectionError(f"Respuesta HTTP inválida: {status_line[:50]!r}")
+        
+        headers = {}
+        
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            
+            if line == b"\r\n":
+                break
+            
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        reusable = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        
+        # Respuestas sin cuerpo
+        if method == "HEAD" or status in NO_BODY_STATUS or 100 <= status < 200:
+            return AsyncResponse(url, status, headers, b""), reusable
+        
+        truncated = False
+        
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = bytearray()
+            
+            while True:
+                size_line = await reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                
+                if size == 0:
+                    # Trailers hasta la línea vacía
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+                
+                if max_body is not None and len(body) >= max_body:
+                    truncated = True
+                    reusable = False
+                    break
+            
+            body = bytes(body)
+        
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            
+            if max_body is not None and length > max_body:
+                body = await reader.readexactly(max_body)
+                truncated = True
+                reusable = False
+            else:
+                body = await reader.readexactly(length)
+        
+        else:
+            # Cuerpo delimitado por el cierre de la conexión
+            body = await reader.read(max_body if max_body is not None else -1)
+            reusable = False
+        
+        return AsyncResponse(url, status, headers, body, truncated), reusable
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Extracción incremental del título de páginas HTML sin construir el árbol del documento
+"""
+
+import re
+import html
+import codecs
+import logging
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+logger = logging.getLogger("AutoEnum.HTMLTitle")
+
+# Bytes examinados como máximo: el título está siempre al principio del documento
+TITLE_MAX_BYTES = 65536
+
+# Longitud máxima del contenido de <title> (títulos sin cerrar o anómalos)
+TITLE_MAX_LENGTH = 1024
+
+TITLE_OPEN_RE = re.compile(rb"<title\b[^>]*>", re.IGNORECASE)
+TITLE_CLOSE_RE = re.compile(rb"</title\s*>", re.IGNORECASE)
+
+# <meta charset="..."> y <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_RE = re.compile(rb"<meta\b[^>]*?charset\s*=\s*[\"']?\s*([a-zA-Z0-9_.:-]+)", re.IGNORECASE)
+
+class TitleExtractor:
+    """Extractor de <title> que consume el documento por fragmentos y se detiene al encontrarlo"""
+    
+    def __init__(self, encoding=None, max_bytes=TITLE_MAX_BYTES):
+        """Inicializa el extractor"""
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.done = False
+        self._buffer = bytearray()
+        self._start = None
+        self._title = None
+        self._text = False
+    
+    def feed(self, chunk):
+        """Añade un fragmento del documento; devuelve True cuando ya no necesita más datos"""
+        if self.done:
+            return True
+        
+        # Texto ya decodificado: se recodifica en UTF-8 para buscar sobre bytes
+        if isinstance(chunk, str):
+            chunk = chunk[:self.max_bytes].encode("utf-8", errors="replace")
+            self._text = True
+        
+        # Retroceder lo justo para no partir una etiqueta entre dos fragmentos
+        position = max(len(self._buffer) - 16, 0)
+        self._buffer += chunk[:max(self.max_bytes - len(self._buffer), 0)]
+        
+        if self._start is None:
+            match = TITLE_OPEN_RE.search(self._buffer, position)
+            
+            if match:
+                self._start = match.end()
+                position = self._start
+        
+        if self._start is not None:
+            match = TITLE_CLOSE_RE.search(self._buffer, max(position, self._start))
+            
+            if match:
+                self._title = self._buffer[self._start:match.start()]
+                self.done = True
+            elif len(self._buffer) - self._start >= TITLE_MAX_LENGTH:
+                # Título sin cerrar: se conserva el principio
+                self._title = self._buffer[self._start:self._start + TITLE_MAX_LENGTH]
+                self.done = True
+        
+        if len(self._buffer) >= self.max_bytes:
+            self.done = True
+        
+        return self.done
+    
+    @property
+    def found(self):
+        """Indica si se ha encontrado la etiqueta <title>"""
+        return self._title is not None
+    
+    @property
+    def title(self):
+        """Título decodificado, sin entidades y con los espacios normalizados"""
+        if self._title is None:
+            return ""
+        
+        text = self._title.decode(self._get_encoding(), errors="replace")
+        
+        return " ".join(html.unescape(text).split())
+    
+    def _get_encoding(self):
+        if self._text:
+            return "utf-8"
+        
+        # Charset de la cabecera HTTP; si no, el declarado en <meta> antes del título
+        for candidate in (self.encoding, self._meta_charset()):
+            if not candidate:
+                continue
+            
+            try:
+                return codecs.lookup(candidate).name
+            except LookupError:
+                logger.debug(f"Charset desconocido: {candidate}")
+        
+        return "utf-8"
+    
+    def _meta_charset(self):
+        match = META_CHARSET_RE.search(self._buffer, 0, self._start or len(self._buffer))
+        
+        return match.group(1).decode("ascii", errors="ignore") if match else None
+
+def get_declared_charset(content_type):
+    """Charset declarado explícitamente en una cabecera Content-Type (None si no hay)"""
+    for part in (content_type or "").split(";")[1:]:
+        key, _, value = part.strip().partition("=")
+        
+        if key.lower() == "charset" and value:
+            return value.strip("\"'")
+    
+    return None
+
+def extract_title(document, encoding=None, max_bytes=TITLE_MAX_BYTES):
+    """Extrae el título de un documento (bytes, str o iterable de fragmentos)"""
+    extractor = TitleExtractor(encoding, max_bytes)
+    
+    if isinstance(document, (bytes, bytearray, memoryview, str)):
+        extractor.feed(bytes(document) if isinstance(document, memoryview) else document)
+    else:
+        for chunk in document:
+            if extractor.feed(chunk):
+                break
+    
+    return extractor.title if extractor.found else None
+
+def extract_title_bs4(document, encoding=None, max_bytes=TITLE_MAX_BYTES):
+    """Extrae el título con BeautifulSoup (más tolerante con HTML mal formado, pero mucho más lento)"""
+    if BeautifulSoup is None:
+        return None
+    
+    if isinstance(document, (bytes, bytearray)):
+        document = bytes(document[:max_bytes]).decode(encoding or "utf-8", errors="replace")
+    
+    soup = BeautifulSoup(document, "html.parser")
+    
+    if not soup.title or soup.title.string is None:
+        return None
+    
+    return " ".join(soup.title.string.split())
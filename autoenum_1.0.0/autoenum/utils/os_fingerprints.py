@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Base de huellas de sistema operativo: firmas ponderadas (TTL, rasgos TCP, opciones y puertos) con puntuación vectorizada
+"""
+
+import os
+import json
+import logging
+import threading
+from itertools import product
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("AutoEnum.OSFingerprints")
+
+# Base de huellas por defecto
+FINGERPRINTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "os_fingerprints.json")
+
+# Rasgos comparados por igualdad (el orden de opciones se codifica como identificador entero)
+FEATURES = ("ttl", "window", "mss", "wscale", "sack", "timestamps", "options")
+
+# Campos de una firma que admiten varios valores: se expanden en firmas concretas
+EXPANDED = ("ttl", "window", "mss", "wscale", "options")
+
+# TTL iniciales habituales: el TTL observado se redondea al siguiente (cada salto lo reduce en uno)
+INITIAL_TTLS = (32, 64, 128, 255)
+
+# wscale de un host que no negocia escalado de ventana (null en la base)
+NO_WSCALE = -1
+
+# Orden de opciones que no está en la base: nunca coincide
+UNKNOWN_OPTIONS = -2
+
+# Hosts puntuados por bloque con numpy (acota la memoria de la comparación hosts x firmas x rasgos)
+BLOCK = 256
+
+# Decimales de la puntuación (iguala los resultados de numpy y de Python puro)
+PRECISION = 9
+
+# Campo ausente en una firma: cualquier valor
+_ANY = object()
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+def initial_ttl(ttl):
+    """TTL inicial probable a partir del TTL observado"""
+    for initial in INITIAL_TTLS:
+        if ttl <= initial:
+            return initial
+    
+    return INITIAL_TTLS[-1]
+
+def _values(value):
+    return list(value) if isinstance(value, list) else [value]
+
+class FingerprintDB:
+    """Firmas expandidas en una matriz (firmas x rasgos) y puntuación ponderada de observaciones"""
+    
+    def __init__(self, data):
+        """Expande las firmas de la base (cada combinación de valores es una firma concreta)"""
+        self.version = data.get("version")
+        weights = data.get("weights", {})
+        self.weights = [float(weights.get(feature, 0)) for feature in FEATURES]
+        self.port_weight = float(weights.get("ports", 0))
+        self.max_weight = sum(self.weights) + self.port_weight
+        self._options = {}
+        self.names = []
+        self.families = []
+        self._rows = []
+        self._row_ports = []
+        
+        # Firmas agrupadas por familia: cada familia ocupa un tramo contiguo de filas
+        for entry in sorted(data.get("signatures", []), key=lambda e: e["family"]):
+            ports = frozenset(entry.get("ports", []))
+            
+            for ttl, window, mss, wscale, options in product(*(_values(entry.get(field, _ANY)) for field in EXPANDED)):
+                self._rows.append(self._encode_signature(ttl, window, mss, wscale, options))
+                self._row_ports.append(ports)
+                self.names.append(entry["name"])
+                self.families.append(entry["family"])
+        
+        # Tramos de filas por familia
+        self.family_names = []
+        self._family_starts = []
+        
+        for index, family in enumerate(self.families):
+            if not self.family_names or self.family_names[-1] != family:
+                self.family_names.append(family)
+                self._family_starts.append(index)
+        
+        self._family_ends = self._family_starts[1:] + [len(self._rows)]
+        
+        # Prevalencia de cada familia: solo decide entre familias empatadas (p. ej. cuando solo se conoce el TTL)
+        priors = data.get("priors", {})
+        self._priors = [priors.get(family, 0) for family in self.family_names]
+        
+        # Vocabulario de puertos presentes en alguna firma
+        self._port_index = {port: i for i, port in enumerate(sorted(set().union(*self._row_ports)))}
+        
+        # Puntuación vectorizada si numpy está instalado; bucle en Python puro si no
+        self.vectorized = np is not None and bool(self._rows)
+        
+        if self.vectorized:
+            self._build_arrays()
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def _option_id(self, options, create=False):
+        if options not in self._options:
+            if not create:
+                return UNKNOWN_OPTIONS
+            
+            self._options[options] = len(self._options)
+        
+        return self._options[options]
+    
+    def _encode_signature(self, ttl, window, mss, wscale, options):
+        # None = rasgo no especificado por la firma (admite cualquier valor)
+        row = {
+            "ttl": None if ttl is _ANY else ttl,
+            "window": None if window is _ANY else window,
+            "mss": None if mss is _ANY else mss,
+            "wscale": None if wscale is _ANY else (NO_WSCALE if wscale is None else wscale),
+            "sack": None,
+            "timestamps": None,
+            "options": None
+        }
+        
+        # SACK y marcas de tiempo se deducen del orden de opciones (notación M,N,W,S,T,E)
+        if options is not _ANY and options is not None:
+            kinds = options.split(",")
+            row["sack"] = int("S" in kinds)
+            row["timestamps"] = int("T" in kinds)
+            row["options"] = self._option_id(options, create=True)
+        
+        return tuple(row[feature] for feature in FEATURES)
+    
+    def encode(self, observation):
+        """Vector de rasgos de una observación (None = no observado)"""
+        ttl = observation.get("ttl")
+        options = observation.get("options")
+        
+        row = {
+            "ttl": initial_ttl(ttl) if ttl else None,
+            "window": observation.get("window"),
+            "mss": observation.get("mss"),
+            "wscale": None,
+            "sack": None,
+            "timestamps": None,
+            "options": self._option_id(options) if options else None
+        }
+        
+        # Una clave wscale presente con valor None significa que el host no negocia escalado
+        if "wscale" in observation:
+            row["wscale"] = NO_WSCALE if observation["wscale"] is None else observation["wscale"]
+        
+        for flag in ("sack", "timestamps"):
+            if observation.get(flag) is not None:
+                row[flag] = int(observation[flag])
+        
+        return tuple(row[feature] for feature in FEATURES)
+    
+    def _build_arrays(self):
+        matrix = np.array(self._rows, dtype=float)
+        
+        # Tabla por rasgo: aportación de cada valor posible a la puntuación de todas las firmas. Penúltima fila:
+        # valor observado que ninguna firma tiene (solo puntúan las que no lo especifican); última: rasgo no observado
+        self._tables = []
+        
+        for feature, weight in enumerate(self.weights):
+            column = matrix[:, feature]
+            specified = ~np.isnan(column)
+            values = np.unique(column[specified])
+            
+            table = np.zeros((len(values) + 2, len(self._rows)))
+            table[:-1] = 0.5 * weight * ~specified
+            table[:-2] += weight * (column[None, :] == values[:, None])
+            
+            self._tables.append(({value: row for row, value in enumerate(values.tolist())}, table))
+        
+        # Perfil de puertos como un solo producto matricial: cada puerto característico aporta su fracción del peso;
+        # la última columna (host con algún puerto observado) da media puntuación a las firmas sin puertos
+        ports = np.zeros((len(self._port_index) + 1, len(self._rows)))
+        
+        for row, row_ports in enumerate(self._row_ports):
+            for port in row_ports:
+                ports[self._port_index[port], row] = self.port_weight / len(row_ports)
+            
+            if not row_ports:
+                ports[-1, row] = 0.5 * self.port_weight
+        
+        self._ports = ports
+        self._starts = np.array(self._family_starts)
+        self._prior_array = np.array(self._priors, dtype=float)
+    
+    def classify(self, observation, top=3):
+        """Familias de OS más probables para una observación"""
+        return self.classify_many([observation], top)[0]
+    
+    def classify_many(self, observations, top=3):
+        """Familias de OS más probables para cada observación: [{name, confidence (0-100), method, signature}]"""
+        observations = list(observations)
+        
+        if not observations or not self._rows:
+            return [[] for _ in observations]
+        
+        # Las observaciones repetidas (habituales en un barrido) se puntúan una sola vez
+        keys = [
+            (self.encode(observation), frozenset(port for port in observation.get("ports") or [] if port in self._port_index))
+            for observation in observations
+        ]
+        unique = list(dict.fromkeys(keys))
+        
+        if self.vectorized:
+            ranked = []
+            
+            for start in range(0, len(unique), BLOCK):
+                block = unique[start:start + BLOCK]
+                scores = self._scores_numpy([vector for vector, _ in block], [ports for _, ports in block])
+                ranked.extend(self._rank_numpy(scores, top))
+        else:
+            ranked = [self._rank(self._scores_python(vector, ports), top) for vector, ports in unique]
+        
+        by_key = dict(zip(unique, ranked))
+        
+        return [[dict(candidate) for candidate in by_key[key]] for key in keys]
+    
+    def _scores_numpy(self, vectors, ports):
+        # Puntuación = suma ponderada de rasgos coincidentes / suma de pesos de los rasgos observados;
+        # un rasgo que la firma no especifica puntúa la mitad
+        scores = np.zeros((len(vectors), len(self._rows)))
+        total = np.zeros(len(vectors))
+        
+        for feature, (index, table) in enumerate(self._tables):
+            values = [vector[feature] for vector in vectors]
+            rows = [len(index) + 1 if value is None else index.get(value, len(index)) for value in values]
+            
+            scores += table.take(rows, axis=0)
+            total += self.weights[feature] * np.array([value is not None for value in values])
+        
+        host_ports = np.zeros((len(ports), len(self._port_index) + 1))
+        
+        for row, port_set in enumerate(ports):
+            for port in port_set:
+                host_ports[row, self._port_index[port]] = 1.0
+            
+            if port_set:
+                host_ports[row, -1] = 1.0
+                total[row] += self.port_weight
+        
+        scores += host_ports @ self._ports
+        
+        # Normalización y cobertura en un único factor por host; el redondeo evita que el ruido de coma flotante
+        # (orden de las sumas) cambie empates o el redondeo de la confianza respecto a la versión en Python
+        coverage = self._coverage(total)
+        scores *= np.divide(coverage, total, out=np.zeros_like(total), where=total > 0)[:, None]
+        
+        return np.round(scores, PRECISION, out=scores)
+    
+    def _rank_numpy(self, scores, top):
+        # Mejor firma de cada familia para todos los hosts del bloque; familias ordenadas por puntuación y prevalencia
+        best = np.maximum.reduceat(scores, self._starts, axis=1)
+        rows = np.stack([
+            np.argmax(scores[:, start:end], axis=1) + start
+            for start, end in zip(self._family_starts, self._family_ends)
+        ], axis=1)
+        order = np.lexsort((np.broadcast_to(-self._prior_array, best.shape), -best), axis=-1)[:, :top]
+        
+        return [
+            [self._candidate(family, best[host, family], rows[host, family]) for family in families if best[host, family] > 0]
+            for host, families in enumerate(order.tolist())
+        ]
+    
+    def _scores_python(self, vector, ports):
+        observed = [(i, value) for i, value in enumerate(vector) if value is not None]
+        total = sum(self.weights[i] for i, _ in observed) + (self.port_weight if ports else 0)
+        
+        if not total:
+            return [0.0] * len(self._rows)
+        
+        scores = []
+        
+        for row, row_ports in zip(self._rows, self._row_ports):
+            score = 0.0
+            
+            for i, value in observed:
+                if row[i] is None:
+                    score += 0.5 * self.weights[i]
+                elif row[i] == value:
+                    score += self.weights[i]
+            
+            if ports:
+                score += self.port_weight * (len(row_ports & ports) / len(row_ports) if row_ports else 0.5)
+            
+            scores.append(score)
+        
+        scale = self._coverage(total) / total
+        
+        return [round(score * scale, PRECISION) for score in scores]
+    
+    def _coverage(self, total):
+        # Con pocos rasgos observados (p. ej. solo el TTL) la confianza se reduce hasta la mitad
+        return 0.5 + 0.5 * total / self.max_weight
+    
+    def _rank(self, scores, top):
+        best = []
+        
+        for family, (start, end) in enumerate(zip(self._family_starts, self._family_ends)):
+            row = max(range(start, end), key=scores.__getitem__)
+            best.append((scores[row], family, row))
+        
+        best.sort(key=lambda item: (-item[0], -self._priors[item[1]]))
+        
+        return [self._candidate(family, score, row) for score, family, row in best[:top] if score > 0]
+    
+    def _candidate(self, family, score, row):
+        return {
+            "name": self.family_names[family],
+            "confidence": round(float(score) * 100),
+            "method": "Fingerprint DB",
+            "signature": self.names[int(row)]
+        }
+
+def load_fingerprints(path=None):
+    """Carga una base de huellas desde un fichero JSON"""
+    path = path or FINGERPRINTS_FILE
+    
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def get_fingerprint_db(path=None):
+    """Devuelve la base de huellas expandida, construida una sola vez por proceso"""
+    path = path or FINGERPRINTS_FILE
+    
+    with _databases_lock:
+        db = _databases.get(path)
+        
+        if db is None:
+            db = _databases[path] = FingerprintDB(load_fingerprints(path))
+            logger.debug(f"{len(db)} huellas de OS cargadas desde {path} (versión {db.version})")
+    
+    return db
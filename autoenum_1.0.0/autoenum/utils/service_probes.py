@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Base de sondas y reglas de servicios (formato nmap-service-probes): reglas precompiladas e indexadas por prefijo literal
+"""
+
+import os
+import re
+import logging
+import threading
+from autoenum.utils.signatures import MIN_ANCHOR_LENGTH, literal_anchor, trie_regex
+
+logger = logging.getLogger("AutoEnum.ServiceProbes")
+
+# Base de sondas por defecto (un nmap-service-probes completo también sirve)
+SERVICE_PROBES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "service_probes.txt")
+
+# Bytes del prefijo literal usados como clave del índice (una consulta por cada longitud de clave distinta)
+PREFIX_LENGTH = 16
+
+# Espera por defecto de la respuesta a una sonda sin totalwaitms (milisegundos, como nmap)
+DEFAULT_WAIT_MS = 5000
+
+# Rareza de una sonda sin directiva rarity
+DEFAULT_RARITY = 5
+
+# Escapes de las cadenas de sonda q|...|
+_PAYLOAD_ESCAPES = {"\\": b"\\", "0": b"\0", "a": b"\a", "b": b"\b", "f": b"\f", "n": b"\n", "r": b"\r", "t": b"\t", "v": b"\v"}
+
+# Escapes de expresión regular que representan un byte literal
+_REGEX_ESCAPES = {"a": b"\a", "f": b"\f", "n": b"\n", "r": b"\r", "t": b"\t", "v": b"\v"}
+
+# Plantillas de versión: $1, $P(1), $SUBST(1,"a","b") y $I(1,">")
+_TEMPLATE_RE = re.compile(r'\$(?:(\d)|P\((\d)\)|SUBST\((\d),"([^"]*)","([^"]*)"\)|I\((\d),"([<>])"\))')
+
+# Campos de versión de una regla (p/producto/ v/versión/ i/info/ h/host/ o/OS/ d/tipo de dispositivo/)
+_FIELDS = {"p": "product", "v": "version", "i": "info", "h": "hostname", "o": "ostype", "d": "devicetype"}
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+def unescape_payload(text):
+    """Bytes de una cadena de sonda con escapes de C (\\r, \\n, \\0, \\xHH...)"""
+    payload = bytearray()
+    i = 0
+    
+    while i < len(text):
+        ch = text[i]
+        
+        if ch == "\\" and i + 1 < len(text):
+            escaped = text[i + 1]
+            
+            if escaped == "x" and i + 3 < len(text):
+                payload.append(int(text[i + 2:i + 4], 16))
+                i += 4
+                continue
+            
+            payload += _PAYLOAD_ESCAPES.get(escaped, escaped.encode("latin-1"))
+            i += 2
+            continue
+        
+        payload += ch.encode("latin-1")
+        i += 1
+    
+    return bytes(payload)
+
+def literal_prefix(pattern):
+    """Bytes literales con los que empieza toda coincidencia de un patrón anclado con ^ (b"" si no hay)"""
+    if not pattern.startswith("^") or _top_level_alternation(pattern):
+        return b""
+    
+    prefix = bytearray()
+    i = 1
+    n = len(pattern)
+    
+    while i < n:
+        ch = pattern[i]
+        
+        if ch == "\\" and i + 1 < n:
+            escaped = pattern[i + 1]
+            
+            if escaped == "x" and i + 3 < n:
+                literal = bytes([int(pattern[i + 2:i + 4], 16)])
+                i += 4
+            elif escaped == "0":
+                # Escape octal: \0, \01, \012
+                end = i + 2
+                while end < min(n, i + 4) and pattern[end] in "01234567":
+                    end += 1
+                literal = bytes([int(pattern[i + 1:end], 8)])
+                i = end
+            elif escaped in _REGEX_ESCAPES:
+                literal = _REGEX_ESCAPES[escaped]
+                i += 2
+            elif not escaped.isalnum():
+                literal = escaped.encode("latin-1")
+                i += 2
+            else:
+                # \d \w \s, referencias...: fin del prefijo
+                break
+        elif ch in ".[()|*+?{}$^":
+            break
+        else:
+            literal = ch.encode("latin-1")
+            i += 1
+        
+        # Un literal opcional o repetido no forma parte del prefijo fijo (con + aparece al menos una vez)
+        if i < n and pattern[i] in "?*{":
+            break
+        
+        prefix += literal
+        
+        if i < n and pattern[i] == "+":
+            break
+    
+    return bytes(prefix)
+
+def _top_level_alternation(pattern):
+    depth = 0
+    i = 0
+    
+    while i < len(pattern):
+        ch = pattern[i]
+        
+        if ch == "\\":
+            i += 2
+            continue
+        
+        if ch == "[":
+            # Saltar la clase de caracteres completa
+            i += 1
+            if i < len(pattern) and pattern[i] == "^":
+                i += 1
+            if i < len(pattern) and pattern[i] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return True
+        
+        i += 1
+    
+    return False
+
+def _delimited(text, start):
+    # Valor entre el delimitador text[start] y su siguiente aparición: (valor, posición tras el cierre)
+    delimiter = text[start]
+    end = text.index(delimiter, start + 1)
+    return text[start + 1:end], end + 1
+
+def parse_match(line):
+    """Regla de una línea match/softmatch: {service, pattern, flags, soft, template} (ValueError si es inválida)"""
+    directive, service, rest = line.split(None, 2)
+    
+    if not rest.startswith("m"):
+        raise ValueError(f"patrón no reconocido: {rest[:20]}")
+    
+    pattern, position = _delimited(rest, 1)
+    
+    flags = ""
+    while position < len(rest) and rest[position] in "is":
+        flags += rest[position]
+        position += 1
+    
+    # Campos de versión y CPE
+    template = {}
+    cpe = []
+    
+    while position < len(rest):
+        if rest[position].isspace():
+            position += 1
+            continue
+        
+        if rest.startswith("cpe:", position):
+            value, position = _delimited(rest, position + 4)
+            cpe.append(value)
+            
+            # Sufijo "a": CPE de aplicación (nmap lo usa al mostrarla)
+            if position < len(rest) and rest[position] == "a":
+                position += 1
+        elif rest[position] in _FIELDS and position + 1 < len(rest):
+            field = _FIELDS[rest[position]]
+            template[field], position = _delimited(rest, position + 1)
+        else:
+            raise ValueError(f"campo de versión no reconocido: {rest[position:position + 20]}")
+    
+    if cpe:
+        template["cpe"] = cpe
+    
+    return {
+        "service": service,
+        "pattern": pattern,
+        "flags": flags,
+        "soft": directive == "softmatch",
+        "template": template
+    }
+
+def parse_service_probes(text):
+    """Sondas TCP de un texto en formato nmap-service-probes: [{name, payload, ports, sslports, rarity, ...}]"""
+    probes = []
+    probe = None
+    
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        
+        if not line or line.startswith("#"):
+            continue
+        
+        directive, _, value = line.partition(" ")
+        
+        if directive == "Probe":
+            protocol, name, rest = value.split(None, 2)
+            
+            # Solo sondas TCP (el módulo trabaja sobre puertos TCP abiertos)
+            if protocol != "TCP":
+                probe = None
+                continue
+            
+            payload, _ = _delimited(rest, 1)
+            
+            probe = {
+                "name": name,
+                "payload": unescape_payload(payload),
+                "ports": set(),
+                "sslports": set(),
+                "rarity": DEFAULT_RARITY,
+                "totalwaitms": DEFAULT_WAIT_MS,
+                "fallback": [],
+                "matches": []
+            }
+            probes.append(probe)
+            continue
+        
+        if probe is None:
+            continue
+        
+        try:
+            if directive in ("match", "softmatch"):
+                probe["matches"].append(parse_match(line))
+            elif directive in ("ports", "sslports"):
+                probe[directive] = parse_port_list(value)
+            elif directive in ("rarity", "totalwaitms"):
+                probe[directive] = int(value)
+            elif directive == "fallback":
+                probe["fallback"] = [name.strip() for name in value.split(",") if name.strip()]
+        except ValueError as e:
+            logger.debug(f"Línea {number} ignorada ({directive}): {e}")
+    
+    return probes
+
+def parse_port_list(value):
+    """Puertos de una directiva ports/sslports (ej: 21,22,8000-8010)"""
+    ports = set()
+    
+    for part in value.split(","):
+        start, _, end = part.strip().partition("-")
+        ports.update(range(int(start), int(end or start) + 1))
+    
+    return ports
+
+def expand_template(template, match):
+    """Valor de un campo de versión con los grupos de la coincidencia ($1, $P(1), $SUBST(...), $I(...))"""
+    def group(index):
+        try:
+            return match.group(int(index)) or b""
+        except IndexError:
+            return b""
+    
+    def substitute(m):
+        if m.group(1):
+            return group(m.group(1)).decode("latin-1")
+        
+        if m.group(2):
+            # Solo caracteres imprimibles
+            return "".join(ch for ch in group(m.group(2)).decode("latin-1") if ch.isprintable())
+        
+        if m.group(3):
+            return group(m.group(3)).decode("latin-1").replace(m.group(4), m.group(5))
+        
+        value = group(m.group(6))
+        return str(int.from_bytes(value, "big" if m.group(7) == ">" else "little")) if value else ""
+    
+    return _TEMPLATE_RE.sub(substitute, template).strip()
+
+class MatchIndex:
+    """Reglas de una sonda precompiladas e indexadas por su prefijo literal o por su literal obligatorio más largo"""
+    
+    def __init__(self, rules):
+        """Compila las reglas (en orden: gana la primera que coincide) y construye el índice"""
+        self.rules = []
+        self.skipped = 0
+        self._buckets = {}
+        self._buckets_nocase = {}
+        self._anchors = {}
+        self._floating = []
+        
+        for rule in rules:
+            flags = (re.IGNORECASE if "i" in rule["flags"] else 0) | (re.DOTALL if "s" in rule["flags"] else 0)
+            
+            # Los patrones de nmap son PCRE; los que re no admite se descartan
+            try:
+                regex = re.compile(rule["pattern"].encode("latin-1"), flags)
+            except (re.error, UnicodeEncodeError, OverflowError) as e:
+                logger.debug(f"Regla de {rule['service']} descartada: {e}")
+                self.skipped += 1
+                continue
+            
+            ignore_case = bool(flags & re.IGNORECASE)
+            prefix = literal_prefix(rule["pattern"])
+            
+            if ignore_case:
+                prefix = prefix.lower()
+            
+            # Literal obligatorio en cualquier posición: descarta la regla con una búsqueda de subcadena
+            anchor = literal_anchor(rule["pattern"])
+            
+            anchor = anchor.encode("latin-1") if anchor and anchor.isascii() else None
+            
+            index = len(self.rules)
+            self.rules.append((
+                rule,
+                regex.match if prefix or rule["pattern"].startswith("^") else regex.search,
+                prefix,
+                ignore_case,
+                anchor
+            ))
+            
+            # Cada regla se indexa por el literal que más la distingue: muchas comparten prefijo (^HTTP/1\.)
+            # y se diferencian por un literal posterior (Server: Apache)
+            if anchor and len(anchor) > len(prefix[:PREFIX_LENGTH]):
+                self._anchors.setdefault(anchor, []).append(index)
+            elif prefix:
+                buckets = self._buckets_nocase if ignore_case else self._buckets
+                buckets.setdefault(prefix[:PREFIX_LENGTH], []).append(index)
+            else:
+                self._floating.append(index)
+        
+        # Longitudes de clave presentes (un prefijo más corto que PREFIX_LENGTH es su propia clave)
+        self._lengths = sorted({len(key) for key in self._buckets})
+        self._lengths_nocase = sorted({len(key) for key in self._buckets_nocase})
+        
+        # Un literal encontrado implica todos los literales contenidos en él
+        self._implied = {}
+        for anchor in self._anchors:
+            substrings = {anchor[i:j] for i in range(len(anchor)) for j in range(i + MIN_ANCHOR_LENGTH, len(anchor) + 1)}
+            self._implied[anchor] = [other for other in substrings if other in self._anchors]
+        
+        # Alternancia de todos los literales factorizada en un trie (sobre la respuesta en minúsculas)
+        self._prefilter = None
+        if self._anchors:
+            self._prefilter = re.compile(trie_regex([anchor.decode("latin-1") for anchor in self._anchors]).encode("latin-1"))
+    
+    def __len__(self):
+        return len(self.rules)
+    
+    def candidates(self, response, lowered=None):
+        """Índices de las reglas que pueden coincidir con la respuesta, en el orden de la base"""
+        lowered = lowered if lowered is not None else response.lower()
+        candidates = set(self._floating)
+        
+        for length in self._lengths:
+            candidates.update(self._buckets.get(response[:length], ()))
+        
+        for length in self._lengths_nocase:
+            candidates.update(self._buckets_nocase.get(lowered[:length], ()))
+        
+        if self._prefilter is not None:
+            seen = set()
+            match = self._prefilter.search(lowered)
+            
+            while match:
+                anchor = match.group()
+                
+                if anchor not in seen:
+                    seen.add(anchor)
+                    
+                    for implied in self._implied[anchor]:
+                        candidates.update(self._anchors[implied])
+                
+                # Reanudar en la siguiente posición para no perder literales solapados
+                match = self._prefilter.search(lowered, match.start() + 1)
+        
+        return sorted(candidates)
+    
+    def match(self, response, lowered=None):
+        """Primera regla que coincide: (regla, coincidencia) o (None, None); las softmatch no detienen la búsqueda"""
+        lowered = lowered if lowered is not None else response.lower()
+        soft = (None, None)
+        
+        for index in self.candidates(response, lowered):
+            rule, match, prefix, ignore_case, anchor = self.rules[index]
+            
+            # Prefiltro barato antes de la expresión regular: prefijo completo y literal obligatorio
+            if prefix and not (lowered if ignore_case else response).startswith(prefix):
+                continue
+            
+            if anchor and anchor not in lowered:
+                continue
+            
+            found = match(response)
+            
+            if not found:
+                continue
+            
+            if not rule["soft"]:
+                return rule, found
+            
+            if soft[0] is None:
+                soft = (rule, found)
+        
+        return soft
+
+class ServiceProbeDB:
+    """Sondas de servicio y sus reglas compiladas, con el respaldo de nmap (fallback y sonda NULL)"""
+    
+    def __init__(self, probes):
+        """Compila las reglas de cada sonda una sola vez"""
+        self.probes = probes
+        self._by_name = {probe["name"]: probe for probe in probes}
+        self._indexes = {probe["name"]: MatchIndex(probe["matches"]) for probe in probes}
+        
+        # Servicios que cada sonda puede identificar (tras una softmatch solo se prueban las sondas útiles)
+        for probe in probes:
+            probe["services"] = {rule["service"] for rule in probe["matches"]}
+        
+        skipped = sum(index.skipped for index in self._indexes.values())
+        
+        if skipped:
+            logger.info(f"{skipped} reglas de servicio descartadas por usar sintaxis no compatible con re")
+    
+    def __len__(self):
+        return sum(len(index) for index in self._indexes.values())
+    
+    def get_probe(self, name):
+        """Sonda por nombre (None si no existe)"""
+        return self._by_name.get(name)
+    
+    def order_probes(self, port, tls=False, intensity=7):
+        """Sondas por probabilidad para el puerto: las que lo declaran (ports o sslports con TLS) y el resto por rareza"""
+        def declares(probe):
+            return port in (probe["sslports"] if tls else probe["ports"])
+        
+        return sorted(
+            (probe for probe in self.probes if declares(probe) or probe["rarity"] <= intensity),
+            key=lambda probe: (not declares(probe), probe["rarity"])
+        )
+    
+    def _chain(self, probe_name):
+        # Reglas consultadas para la respuesta de una sonda: las suyas, las de sus fallback y las de NULL
+        chain = [probe_name]
+        
+        for name in self._by_name[probe_name]["fallback"] + ["NULL"]:
+            if name in self._indexes and name not in chain:
+                chain.append(name)
+        
+        return chain
+    
+    def match(self, probe_name, response):
+        """Identifica la respuesta a una sonda: {service, product, version, info, ..., soft} o None"""
+        if not response or probe_name not in self._indexes:
+            return None
+        
+        lowered = response.lower()
+        soft = None
+        
+        for name in self._chain(probe_name):
+            rule, found = self._indexes[name].match(response, lowered)
+            
+            if rule is None:
+                continue
+            
+            if not rule["soft"]:
+                return self._identified(rule, found)
+            
+            soft = soft or self._identified(rule, found)
+        
+        return soft
+    
+    def _identified(self, rule, found):
+        identified = {"service": rule["service"], "soft": rule["soft"]}
+        
+        for field in _FIELDS.values():
+            identified[field] = expand_template(rule["template"][field], found) if field in rule["template"] else ""
+        
+        if rule["template"].get("cpe"):
+            identified["cpe"] = [f"cpe:/{expand_template(cpe, found)}" for cpe in rule["template"]["cpe"]]
+        
+        return identified
+
+def load_service_probes(path=None):
+    """Carga las sondas desde un fichero en formato nmap-service-probes"""
+    path = path or SERVICE_PROBES_FILE
+    
+    with open(path, "r", encoding="latin-1") as f:
+        return parse_service_probes(f.read())
+
+def get_service_db(path=None):
+    """Devuelve la base de sondas compilada, construida una sola vez por proceso"""
+    path = path or SERVICE_PROBES_FILE
+    
+    with _databases_lock:
+        db = _databases.get(path)
+        
+        if db is None:
+            db = _databases[path] = ServiceProbeDB(load_service_probes(path))
+            logger.debug(f"{len(db)} reglas de servicio cargadas desde {path} ({len(db.probes)} sondas)")
+    
+    return db
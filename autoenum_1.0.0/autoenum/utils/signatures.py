@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Motor de firmas de tecnologías web: patrones precompilados y prefiltro de literales en una sola pasada
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+
+logger = logging.getLogger("AutoEnum.Signatures")
+
+# Base de firmas por defecto
+TECHNOLOGIES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "technologies.json")
+
+# Longitud mínima de un literal para usarlo como ancla del prefiltro
+MIN_ANCHOR_LENGTH = 3
+
+# Patrones a partir de los cuales compensa el prefiltro (por debajo, re.search directo sobre cada patrón es más rápido)
+PREFILTER_MIN_PATTERNS = 50
+
+# Etiquetas <script> y <meta> del documento (una sola pasada para ambas)
+TAG_RE = re.compile(r"<(script|meta)\b([^>]*)>", re.IGNORECASE)
+ATTR_RE = re.compile(r"""([a-zA-Z_:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+def literal_anchor(pattern, min_length=MIN_ANCHOR_LENGTH):
+    """Literal más largo que toda coincidencia del patrón debe contener (None si no hay uno fiable)"""
+    runs = []
+    current = ""
+    depth = 0
+    i = 0
+    n = len(pattern)
+    
+    while i < n:
+        ch = pattern[i]
+        
+        if ch == "\\" and i + 1 < n:
+            # \. \/ ... son literales; \d \w \s, \xHH y referencias no
+            escaped = pattern[i + 1]
+            literal = escaped if depth == 0 and not escaped.isalnum() else None
+            i += 4 if escaped == "x" else 2
+        elif ch == "[":
+            # Saltar la clase de caracteres completa
+            j = i + 1
+            if j < n and pattern[j] == "^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            literal = None
+            i = j + 1
+        elif ch == "(":
+            depth += 1
+            literal = None
+            i += 1
+        elif ch == ")":
+            depth -= 1
+            literal = None
+            i += 1
+        elif ch == "|":
+            # Alternancia a nivel superior: ningún literal es obligatorio
+            if depth == 0:
+                return None
+            literal = None
+            i += 1
+        elif ch == "{":
+            # Cuantificador {m,n}: sus dígitos no son literales
+            end = pattern.find("}", i)
+            literal = None
+            i = end + 1 if end != -1 else i + 1
+        elif ch in ".^$*+?}":
+            literal = None
+            i += 1
+        else:
+            literal = ch if depth == 0 else None
+            i += 1
+        
+        if literal is None:
+            runs.append(current)
+            current = ""
+            continue
+        
+        # Un literal opcional corta la secuencia; con + es obligatorio pero no se repite en el ancla
+        if i < n and pattern[i] in "?*{":
+            runs.append(current)
+            current = ""
+        elif i < n and pattern[i] == "+":
+            runs.append(current + literal)
+            current = ""
+        else:
+            current += literal
+    
+    runs.append(current)
+    best = max(runs, key=len)
+    
+    return best.lower() if len(best) >= min_length else None
+
+def fold_pattern(pattern):
+    """Patrón en minúsculas para buscarlo sin IGNORECASE sobre el texto en minúsculas (escapes y nombres de grupo intactos)"""
+    folded = []
+    i = 0
+    n = len(pattern)
+    
+    while i < n:
+        if pattern[i] == "\\":
+            folded.append(pattern[i:i + 2])
+            i += 2
+        elif pattern.startswith(("(?P<", "(?P="), i):
+            end = pattern.find(">" if pattern[i + 3] == "<" else ")", i)
+            end = n if end == -1 else end + 1
+            folded.append(pattern[i:end])
+            i = end
+        else:
+            folded.append(pattern[i].lower())
+            i += 1
+    
+    return "".join(folded)
+
+def trie_regex(words):
+    """Expresión regular equivalente a la alternancia de las palabras, factorizada en un trie"""
+    trie = {}
+    
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        
+        if not branches:
+            return ""
+        
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        
+        group = "(?:" + "|".join(branches) + ")"
+        
+        # Fin de palabra en este nodo: el resto es opcional (el cuantificador voraz prefiere la más larga)
+        return group + "?" if "" in node else group
+    
+    return emit(trie)
+
+class PatternSet:
+    """Conjunto de patrones con nombre evaluados sobre un texto en una sola pasada"""
+    
+    def __init__(self, entries):
+        """Compila los patrones (lista de (nombre, regex)) y su prefiltro de literales"""
+        self._entries = []
+        self._anchors = {}
+        self._unanchored = []
+        
+        for name, pattern in entries:
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                logger.warning(f"Firma inválida para {name}: {pattern!r} ({e})")
+                continue
+            
+            # Búsqueda sin IGNORECASE sobre el texto en minúsculas: el motor salta directamente a los literales
+            try:
+                folded = re.compile(fold_pattern(pattern))
+            except re.error:
+                folded = None
+            
+            index = len(self._entries)
+            self._entries.append((name, compiled, folded))
+            
+            anchor = literal_anchor(pattern)
+            if anchor:
+                self._anchors.setdefault(anchor, []).append(index)
+            else:
+                self._unanchored.append(index)
+        
+        # Un literal encontrado implica todos los literales contenidos en él
+        self._implied = {}
+        for anchor in self._anchors:
+            substrings = {anchor[i:j] for i in range(len(anchor)) for j in range(i + MIN_ANCHOR_LENGTH, len(anchor) + 1)}
+            self._implied[anchor] = [other for other in substrings if other in self._anchors]
+        
+        # Alternancia de todas las anclas factorizada en un trie (sobre el texto en minúsculas)
+        self._prefilter = None
+        if self._anchors and len(self._entries) >= PREFILTER_MIN_PATTERNS:
+            self._prefilter = re.compile(trie_regex(self._anchors))
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def candidates(self, text):
+        """Índices de los patrones cuyo literal obligatorio aparece en el texto (todos si no hay prefiltro)"""
+        return self._candidates(text.lower() if text else text)
+    
+    def _candidates(self, text):
+        # text ya en minúsculas
+        if self._prefilter is None:
+            return set(range(len(self._entries)))
+        
+        candidates = set(self._unanchored)
+        
+        if not text:
+            return candidates
+        
+        seen = set()
+        match = self._prefilter.search(text)
+        
+        while match:
+            anchor = match.group()
+            
+            if anchor not in seen:
+                seen.add(anchor)
+                
+                for implied in self._implied[anchor]:
+                    candidates.update(self._anchors[implied])
+                
+                if len(seen) == len(self._anchors):
+                    break
+            
+            # Reanudar en la siguiente posición para no perder anclas solapadas
+            match = self._prefilter.search(text, match.start() + 1)
+        
+        return candidates
+    
+    def match(self, text):
+        """Genera (nombre, versión) para cada patrón que coincide con el texto"""
+        lowered = text.lower() if text else text
+        
+        # La versión se toma del texto original si bajar a minúsculas no desplazó las posiciones
+        original = text if lowered and len(lowered) == len(text) else None
+        
+        for index in sorted(self._candidates(lowered)):
+            name, compiled, folded = self._entries[index]
+            
+            if folded is None:
+                match = compiled.search(text)
+                
+                if match:
+                    yield name, match.groupdict().get("version")
+                continue
+            
+            match = folded.search(lowered)
+            
+            if match:
+                yield name, _group(match, "version", original)
+
+class TechnologyMatcher:
+    """Detector de tecnologías a partir de una base de firmas (cabeceras, cookies, HTML, scripts y meta)"""
+    
+    def __init__(self, signatures):
+        """Compila la base de firmas ({tecnología: {tipo: patrones}})"""
+        html = []
+        scripts = []
+        headers = {}
+        meta = {}
+        self._cookies = {}
+        
+        for tech, signature in signatures.items():
+            html.extend((tech, pattern) for pattern in _as_list(signature.get("html")))
+            scripts.extend((tech, pattern) for pattern in _as_list(signature.get("scripts")))
+            
+            for header, pattern in signature.get("headers", {}).items():
+                headers.setdefault(header.lower(), []).append((tech, pattern))
+            
+            for name, pattern in signature.get("meta", {}).items():
+                meta.setdefault(name.lower(), []).append((tech, pattern))
+            
+            # Patrón vacío: basta con que exista la cookie
+            for cookie, pattern in signature.get("cookies", {}).items():
+                compiled = re.compile(pattern, re.IGNORECASE) if pattern else None
+                self._cookies.setdefault(cookie.lower(), []).append((tech, compiled))
+        
+        self.count = len(signatures)
+        self._html = PatternSet(html)
+        self._scripts = PatternSet(scripts)
+        self._headers = {name: PatternSet(entries) for name, entries in headers.items()}
+        self._meta = {name: PatternSet(entries) for name, entries in meta.items()}
+    
+    def detect(self, headers=None, cookies=None, body=""):
+        """Devuelve {tecnología: versión o None} para una respuesta"""
+        found = {}
+        
+        def add(tech, version):
+            if version or tech not in found:
+                found[tech] = version or None
+        
+        for name, value in (headers or {}).items():
+            patterns = self._headers.get(name.lower())
+            
+            if patterns:
+                for tech, version in patterns.match(value):
+                    add(tech, version)
+        
+        for name, value in (cookies or {}).items():
+            for tech, compiled in self._cookies.get(name.lower(), []):
+                if compiled is None:
+                    add(tech, None)
+                    continue
+                
+                match = compiled.search(value or "")
+                if match:
+                    add(tech, match.groupdict().get("version"))
+        
+        if body:
+            for tech, version in self._html.match(body):
+                add(tech, version)
+            
+            script_sources, meta_values = extract_tags(body, self._meta)
+            
+            if script_sources and len(self._scripts):
+                for tech, version in self._scripts.match("\n".join(script_sources)):
+                    add(tech, version)
+            
+            for name, values in meta_values.items():
+                for tech, version in self._meta[name].match("\n".join(values)):
+                    add(tech, version)
+        
+        return found
+
+def extract_tags(body, meta_names=()):
+    """Extrae los src de <script> y el contenido de los <meta> indicados en una sola pasada"""
+    script_sources = []
+    meta_values = {}
+    
+    for match in TAG_RE.finditer(body):
+        attrs = {name.lower(): double or single or bare for name, double, single, bare in ATTR_RE.findall(match.group(2))}
+        
+        if match.group(1).lower() == "script":
+            if attrs.get("src"):
+                script_sources.append(attrs["src"])
+        else:
+            name = attrs.get("name", "").lower()
+            
+            if name in meta_names and "content" in attrs:
+                meta_values.setdefault(name, []).append(attrs["content"])
+    
+    return script_sources, meta_values
+
+def _group(match, name, original=None):
+    # Grupo con nombre de una coincidencia sobre el texto en minúsculas, con las mayúsculas de original si se da
+    if name not in match.re.groupindex:
+        return None
+    
+    start, end = match.span(name)
+    
+    if start < 0:
+        return None
+    
+    return original[start:end] if original is not None else match.group(name)
+
+def _as_list(value):
+    if value is None:
+        return []
+    
+    return [value] if isinstance(value, str) else list(value)
+
+def load_signatures(path=None):
+    """Carga una base de firmas desde un fichero JSON"""
+    path = path or TECHNOLOGIES_FILE
+    
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    
+    return data.get("technologies", data)
+
+def get_technology_matcher(path=None):
+    """Devuelve el detector de una base de firmas, compilado una sola vez por proceso"""
+    path = path or TECHNOLOGIES_FILE
+    
+    with _matchers_lock:
+        matcher = _matchers.get(path)
+        
+        if matcher is None:
+            matcher = _matchers[path] = TechnologyMatcher(load_signatures(path))
+            logger.debug(f"{matcher.count} firmas de tecnologías cargadas desde {path}")
+    
+    return matcher
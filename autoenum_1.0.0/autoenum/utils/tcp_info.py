@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Lectura de TCP_INFO (Linux) de una conexión establecida: rasgos del SYN/ACK del host remoto
+"""
+
+import socket
+import struct
+import logging
+
+logger = logging.getLogger("AutoEnum.TCPInfo")
+
+# Tamaño de struct tcp_info hasta tcpi_snd_wnd (Linux >= 5.4); los núcleos antiguos devuelven menos bytes
+TCP_INFO_SIZE = 232
+
+# Bits de tcpi_options: opciones negociadas en el saludo
+TCPI_OPT_TIMESTAMPS = 1
+TCPI_OPT_SACK = 2
+TCPI_OPT_WSCALE = 4
+TCPI_OPT_ECN = 8
+
+# Desplazamientos de los campos usados dentro de struct tcp_info
+OFFSET_OPTIONS = 5
+OFFSET_WSCALE = 6
+OFFSET_SND_MSS = 16
+OFFSET_RTT = 68
+OFFSET_RTTVAR = 72
+OFFSET_SND_WND = 228
+
+def read_tcp_info(sock):
+    """Rasgos de TCP_INFO de un socket conectado (None si la plataforma no lo soporta)"""
+    if not hasattr(socket, "TCP_INFO"):
+        return None
+    
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_SIZE)
+    except OSError as e:
+        logger.debug(f"No se pudo leer TCP_INFO: {e}")
+        return None
+    
+    if len(info) < OFFSET_RTTVAR + 4:
+        return None
+    
+    options = info[OFFSET_OPTIONS]
+    
+    # snd_wscale (4 bits bajos) es la escala anunciada por el host remoto
+    features = {
+        "mss": struct.unpack_from("I", info, OFFSET_SND_MSS)[0],
+        "wscale": info[OFFSET_WSCALE] & 0x0F if options & TCPI_OPT_WSCALE else None,
+        "sack": bool(options & TCPI_OPT_SACK),
+        "timestamps": bool(options & TCPI_OPT_TIMESTAMPS),
+        "ecn": bool(options & TCPI_OPT_ECN),
+        "rtt_us": struct.unpack_from("I", info, OFFSET_RTT)[0],
+        "rttvar_us": struct.unpack_from("I", info, OFFSET_RTTVAR)[0],
+        "window": None
+    }
+    
+    # Ventana del SYN/ACK (sin escalar durante el saludo): solo en núcleos que exponen tcpi_snd_wnd
+    if len(info) >= OFFSET_SND_WND + 4:
+        features["window"] = struct.unpack_from("I", info, OFFSET_SND_WND)[0]
+    
+    return features
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Sondeo de TTL en proceso: eco ICMP por lotes (socket crudo o ICMP sin privilegios) y SYN/ACK de TCP como alternativa
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import socket
+import struct
+import logging
+import threading
+from itertools import count
+
+logger = logging.getLogger("AutoEnum.TTLProbe")
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+# Opción para recibir el TTL como dato auxiliar en recvmsg (Linux; no siempre expuesta por el módulo socket)
+IP_RECVTTL = getattr(socket, "IP_RECVTTL", 12 if sys.platform.startswith("linux") else None)
+
+# Flags TCP de las respuestas que revelan el TTL del host (SYN/ACK de un puerto abierto o RST de uno cerrado)
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
+def _checksum(data):
+    if len(data) % 2:
+        data += b"\x00"
+    
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    
+    return ~total & 0xFFFF
+
+def _echo_request(ident, sequence):
+    payload = b"autoenum" + struct.pack("!d", time.time())
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, sequence)
+    checksum = _checksum(header + payload)
+    
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, sequence) + payload
+
+def _resolve(target):
+    try:
+        return socket.gethostbyname(target)
+    except (socket.gaierror, UnicodeError):
+        logger.warning(f"No se pudo resolver {target}")
+        return None
+
+class TTLProber:
+    """Sondeos ICMP de varios hilos multiplexados sobre un único socket con un hilo receptor"""
+    
+    def __init__(self):
+        """Inicializa el sondeador (el socket se abre en el primer uso)"""
+        self.method = None
+        self._sock = None
+        self._raw = False
+        self._opened = False
+        self._ident = os.getpid() & 0xFFFF
+        self._sequence = count(1)
+        self._waiters = {}
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    @property
+    def available(self):
+        """Indica si hay un socket ICMP utilizable (crudo con privilegios o sin privilegios)"""
+        with self._lock:
+            return self._open()
+    
+    def _open(self):
+        if self._opened:
+            return self._sock is not None
+        
+        self._opened = True
+        
+        # Socket crudo (root o CAP_NET_RAW): las respuestas incluyen la cabecera IP con el TTL
+        try:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self._raw = True
+            self.method = "icmp-raw"
+            return True
+        except OSError:
+            pass
+        
+        # Socket ICMP sin privilegios (net.ipv4.ping_group_range en Linux, macOS): TTL por dato auxiliar
+        try:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            
+            if IP_RECVTTL is not None:
+                self._sock.setsockopt(socket.IPPROTO_IP, IP_RECVTTL, 1)
+            
+            self.method = "icmp-dgram"
+            return True
+        except OSError:
+            self._sock = None
+        
+        logger.debug("Sin socket ICMP disponible (se requieren privilegios o ping_group_range)")
+        return False
+    
+    def probe(self, targets, timeout=2.0, retries=1):
+        """Envía ecos ICMP a todos los objetivos a la vez y devuelve {objetivo: TTL} de los que responden"""
+        addresses = {}
+        
+        for target in targets:
+            address = _resolve(target)
+            
+            if address:
+                addresses.setdefault(address, []).append(target)
+        
+        if not addresses:
+            return {}
+        
+        events = {}
+        
+        with self._lock:
+            if not self._open():
+                return {}
+            
+            for address in addresses:
+                event = self._waiters.get(address)
+                
+                if event is None:
+                    event = self._waiters[address] = threading.Event()
+                    event.ttl = None
+                
+                events[address] = event
+            
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._receive, name="AutoEnumTTL", daemon=True)
+                self._thread.start()
+        
+        # Reenvío a los que no han respondido en cada intento (el plazo total se reparte entre intentos)
+        attempts = retries + 1
+        
+        for _ in range(attempts):
+            pending = [address for address, event in events.items() if not event.is_set()]
+            
+            if not pending:
+                break
+            
+            for address in pending:
+                self._send(address)
+            
+            deadline = time.monotonic() + timeout / attempts
+            
+            for address in pending:
+                events[address].wait(max(0.0, deadline - time.monotonic()))
+        
+        ttls = {}
+        
+        with self._lock:
+            for address, event in events.items():
+                if event.ttl is not None:
+                    for target in addresses[address]:
+                        ttls[target] = event.ttl
+                
+                # La espera puede ser compartida con otro hilo que sondea la misma dirección
+                if self._waiters.get(address) is event:
+                    del self._waiters[address]
+        
+        return ttls
+    
+    def _send(self, address):
+        try:
+            self._sock.sendto(_echo_request(self._ident, next(self._sequence) & 0xFFFF), (address, 0))
+        except OSError as e:
+            logger.debug(f"Error al enviar eco ICMP a {address}: {e}")
+    
+    def _receive(self):
+        # Hilo receptor: despacha cada respuesta por dirección de origen mientras haya sondeos pendientes
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    self._thread = None
+                    return
+            
+            try:
+                readable, _, _ = select.select([self._sock], [], [], 0.2)
+                
+                if not readable:
+                    continue
+                
+                data, ancdata, _, (address, _) = self._sock.recvmsg(2048, socket.CMSG_SPACE(4))
+            except OSError as e:
+                logger.debug(f"Error al recibir respuesta ICMP: {e}")
+                continue
+            
+            ttl = self._parse(data, ancdata)
+            
+            if ttl is None:
+                continue
+            
+            with self._lock:
+                event = self._waiters.get(address)
+                
+                if event and not event.is_set():
+                    event.ttl = ttl
+                    event.set()
+    
+    def _parse(self, data, ancdata):
+        ttl = None
+        
+        # Con cabecera IP (socket crudo; ICMP sin privilegios en macOS): el TTL está en el byte 8
+        if self._raw or (data and data[0] >> 4 == 4):
+            if len(data) < 20:
+                return None
+            
+            ttl = data[8]
+            data = data[(data[0] & 0x0F) * 4:]
+        
+        for level, kind, value in ancdata:
+            if level == socket.IPPROTO_IP and kind in (socket.IP_TTL, IP_RECVTTL) and len(value) >= 4:
+                ttl = struct.unpack("i", value[:4])[0]
+        
+        if len(data) < 8 or data[0] != ICMP_ECHO_REPLY:
+            return None
+        
+        # En el socket crudo llegan todas las respuestas ICMP del equipo: solo las de este proceso
+        if self._raw and struct.unpack("!H", data[4:6])[0] != self._ident:
+            return None
+        
+        return ttl
+
+def probe_tcp_ttl(targets, timeout=2.0):
+    """TTL de la respuesta SYN/ACK (o RST) a una conexión TCP; targets: [(objetivo, puerto)]. Requiere socket crudo"""
+    try:
+        sniffer = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    except OSError:
+        logger.debug("Sin socket TCP crudo: no se puede leer el TTL de las respuestas SYN/ACK")
+        return {}
+    
+    wanted = {}
+    
+    for target, port in targets:
+        address = _resolve(target)
+        
+        if address:
+            wanted.setdefault((address, port), []).append(target)
+    
+    names = {target for names in wanted.values() for target in names}
+    connections = []
+    ttls = {}
+    
+    try:
+        # Conexiones no bloqueantes: el núcleo envía los SYN y el socket crudo recibe una copia de las respuestas
+        for address, port in wanted:
+            conn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            conn.setblocking(False)
+            
+            result = conn.connect_ex((address, port))
+            
+            if result not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                logger.debug(f"Error al conectar con {address}:{port}: {os.strerror(result)}")
+            
+            connections.append(conn)
+        
+        deadline = time.monotonic() + timeout
+        
+        while len(ttls) < len(names):
+            remaining = deadline - time.monotonic()
+            
+            if remaining <= 0:
+                break
+            
+            readable, _, _ = select.select([sniffer], [], [], remaining)
+            
+            if not readable:
+                break
+            
+            data, _, _, _ = sniffer.recvmsg(65535)
+            
+            if len(data) < 20:
+                continue
+            
+            header = (data[0] & 0x0F) * 4
+            
+            if len(data) < header + 14:
+                continue
+            
+            address = socket.inet_ntoa(data[12:16])
+            port = struct.unpack("!H", data[header:header + 2])[0]
+            flags = data[header + 13]
+            
+            if (address, port) in wanted and (flags & (TCP_SYN | TCP_ACK) == TCP_SYN | TCP_ACK or flags & TCP_RST):
+                for target in wanted[(address, port)]:
+                    ttls.setdefault(target, data[8])
+    finally:
+        for conn in connections:
+            conn.close()
+        
+        sniffer.close()
+    
+    return ttls
+
+# Sondeador compartido por todos los escaneos del proceso
+prober = TTLProber()
+
+def probe_ttl(targets, timeout=2.0, ports=None, icmp=True):
+    """TTL de varios objetivos: eco ICMP por lotes y, para los que no respondan, SYN/ACK a los puertos indicados"""
+    targets = list(targets)
+    ttls = prober.probe(targets, timeout) if icmp else {}
+    
+    missing = [target for target in targets if target not in ttls]
+    
+    if missing and ports:
+        ttls.update(probe_tcp_ttl([(target, port) for target in missing for port in ports], timeout))
+    
+    return ttls
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de check_url con y sin sesión HTTP compartida (keep-alive) contra servidores locales HTTP/HTTPS
+(en otro proceso, para que cliente y servidor no compartan el GIL)
+
+Uso: python3 benchmarks/bench_http_session.py [peticiones] [hilos]
+"""
+
+import os
+import sys
+import ssl
+import time
+import shutil
+import tempfile
+import subprocess
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from autoenum.modules.web_scanner import check_url, create_session
+
+BODY = b"<html><head><title>bench</title></head><body>" + b"x" * 1024 + b"</body></html>"
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Manejador HTTP/1.1 con keep-alive y respuesta fija"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    # Cabeceras y cuerpo salen en dos escrituras: sin TCP_NODELAY, en una conexión persistente la segunda
+    # espera al ACK retardado de la primera (~40 ms por respuesta en loopback), como ningún servidor real
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+    
+    def log_message(self, format, *args):
+        pass
+
+def serve(tls_dir, ready):
+    """Proceso servidor: publica su puerto y atiende hasta que se termina el proceso"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    
+    if tls_dir:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(tls_dir, "cert.pem"), os.path.join(tls_dir, "key.pem"))
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+def start_server(tls_dir=None):
+    """Inicia un servidor local en otro proceso (HTTPS si se proporciona un certificado): (proceso, URL base)"""
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(tls_dir, ready), daemon=True)
+    process.start()
+    
+    scheme = "https" if tls_dir else "http"
+    
+    return process, f"{scheme}://127.0.0.1:{ready.get(timeout=30)}/"
+
+def create_certificate():
+    """Genera un certificado autofirmado con openssl (None si no está disponible)"""
+    if not shutil.which("openssl"):
+        return None
+    
+    tls_dir = tempfile.mkdtemp(prefix="autoenum_bench_")
+    
+    subprocess.run([
+        "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+        "-subj", "/CN=127.0.0.1",
+        "-keyout", os.path.join(tls_dir, "key.pem"),
+        "-out", os.path.join(tls_dir, "cert.pem")
+    ], check=True, capture_output=True)
+    
+    return tls_dir
+
+def run(base_url, requests_count, threads, session=None):
+    """Lanza las peticiones y devuelve peticiones por segundo"""
+    urls = [f"{base_url}page{i}" for i in range(requests_count)]
+    
+    start = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda url: check_url(url, 5, None, session), urls))
+    
+    elapsed = time.perf_counter() - start
+    
+    errors = sum(1 for r in results if r["status"] != 200)
+    if errors:
+        print(f"  Aviso: {errors} peticiones fallidas")
+    
+    return requests_count / elapsed
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    
+    requests.packages.urllib3.disable_warnings()
+    
+    servers = [("HTTP", start_server())]
+    
+    tls_dir = create_certificate()
+    if tls_dir:
+        servers.append(("HTTPS", start_server(tls_dir)))
+    else:
+        print("openssl no disponible: se omite el benchmark HTTPS")
+    
+    print(f"{requests_count} peticiones, {threads} hilos")
+    
+    for name, (process, base_url) in servers:
+        plain = run(base_url, requests_count, threads)
+        
+        session = create_session(threads)
+        pooled = run(base_url, requests_count, threads, session)
+        session.close()
+        
+        print(f"{name}: sin sesión {plain:.0f} req/s, con sesión {pooled:.0f} req/s ({pooled / plain:.1f}x)")
+        
+        process.terminate()
+        process.join()
+    
+    if tls_dir:
+        shutil.rmtree(tls_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark de clasificación de OS: puntuación de la base de huellas con numpy frente a Python puro
+para barridos de distinto tamaño (perfiles repetidos, como en una red real, y observaciones todas distintas)
+
+Uso: python3 benchmarks/bench_os_fingerprint.py [máx_hosts_python]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import autoenum.utils.os_fingerprints as fingerprints
+
+SIZES = [1, 256, 4096, 65536]
+
+# Observaciones típicas de un barrido: TTL, rasgos del SYN/ACK y algunos puertos abiertos
+PROFILES = [
+    {"ttl": 64, "window": 64240, "mss": 1460, "wscale": 7, "sack": True, "timestamps": True, "ports": [22, 80]},
+    {"ttl": 128, "window": 64240, "mss": 1460, "wscale": 8, "sack": True, "timestamps": False, "ports": [135, 445, 3389]},
+    {"ttl": 255, "window": 4128, "mss": 536, "wscale": None, "sack": False, "timestamps": False, "ports": [23]},
+    {"ttl": 64, "window": 65535, "mss": 1460, "wscale": 6, "sack": True, "timestamps": True, "ports": [22]},
+    {"ttl": 64, "ports": [9100, 515]},
+    {"ttl": 128}
+]
+
+def synthetic_observations(count):
+    """Observaciones con saltos de red aleatorios (el TTL observado baja) sobre perfiles conocidos"""
+    rng = random.Random(1)
+    observations = []
+    
+    for _ in range(count):
+        observation = dict(rng.choice(PROFILES))
+        observation["ttl"] -= rng.randint(0, 20)
+        observations.append(observation)
+    
+    return observations
+
+def distinct_observations(count):
+    """Observaciones sin repeticiones: ventana, MSS y puertos aleatorios"""
+    rng = random.Random(2)
+    observations = []
+    
+    for index in range(count):
+        observation = dict(rng.choice(PROFILES[:4]))
+        observation["window"] = rng.randint(1024, 65535)
+        observation["mss"] = rng.choice([536, 1360, 1400, 1440, 1460])
+        observation["ports"] = sorted(rng.sample([22, 23, 80, 135, 139, 443, 445, 515, 3389, 5985, 8291, 9100], 3)) + [index + 10000]
+        observations.append(observation)
+    
+    return observations
+
+def timed(db, observations):
+    start = time.perf_counter()
+    results = db.classify_many(observations)
+    return time.perf_counter() - start, results
+
+def main():
+    max_python = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    data = fingerprints.load_fingerprints()
+    
+    numpy_module = fingerprints.np
+    fingerprints.np = None
+    python_db = fingerprints.FingerprintDB(data)
+    fingerprints.np = numpy_module
+    
+    numpy_db = fingerprints.FingerprintDB(data) if numpy_module is not None else None
+    
+    print(f"{len(python_db)} huellas (versión {python_db.version}), numpy {'disponible' if numpy_db else 'no instalado'}")
+    
+    for label, generate in (("barrido", synthetic_observations), ("distintas", distinct_observations)):
+        print(f"\nObservaciones: {label}")
+        
+        for size in SIZES:
+            run(numpy_db, python_db, generate(size), max_python)
+
+def run(numpy_db, python_db, observations, max_python):
+    """Clasifica las observaciones con ambas implementaciones y muestra los tiempos"""
+    size = len(observations)
+    line = f"{size:>6} hosts"
+    
+    if numpy_db:
+        numpy_time, numpy_results = timed(numpy_db, observations)
+        line += f"  numpy {numpy_time * 1000:9.2f} ms ({numpy_time / size * 1e6:7.1f} µs/host)"
+    
+    if size <= max_python:
+        python_time, python_results = timed(python_db, observations)
+        line += f"  python {python_time * 1000:10.2f} ms ({python_time / size * 1e6:8.1f} µs/host)"
+        
+        if numpy_db and python_results != numpy_results:
+            line += "  ¡resultados distintos!"
+    
+    print(line)
+
+if __name__ == "__main__":
+    main()
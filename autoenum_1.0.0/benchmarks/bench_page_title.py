@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extracción de títulos: extractor incremental frente a BeautifulSoup sobre un corpus de páginas HTML
+
+Uso: python3 benchmarks/bench_page_title.py <directorio_corpus> [máx_páginas] [repeticiones]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoenum.utils.html_title import extract_title, extract_title_bs4, BeautifulSoup
+
+def load_corpus(corpus_dir, max_pages):
+    """Carga hasta max_pages documentos .html/.htm del directorio (recursivo)"""
+    pages = []
+    
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if not name.lower().endswith((".html", ".htm")):
+                continue
+            
+            with open(os.path.join(root, name), "rb") as f:
+                pages.append(f.read())
+            
+            if len(pages) >= max_pages:
+                return pages
+    
+    return pages
+
+def bs4_title(page):
+    """Comportamiento anterior: árbol completo del documento"""
+    soup = BeautifulSoup(page.decode("utf-8", errors="replace"), "html.parser")
+    return soup.title.string.strip() if soup.title and soup.title.string else ""
+
+def run(extractor, pages, repeat):
+    """Extrae el título de todas las páginas y devuelve páginas por segundo"""
+    start = time.perf_counter()
+    
+    for _ in range(repeat):
+        for page in pages:
+            extractor(page)
+    
+    return len(pages) * repeat / (time.perf_counter() - start)
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+    
+    corpus_dir = sys.argv[1]
+    max_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    
+    if BeautifulSoup is None:
+        print("Se requiere beautifulsoup4 para la comparación")
+        sys.exit(1)
+    
+    pages = load_corpus(corpus_dir, max_pages)
+    
+    if not pages:
+        print(f"No se encontraron páginas HTML en {corpus_dir}")
+        sys.exit(1)
+    
+    total = sum(len(page) for page in pages)
+    print(f"{len(pages)} páginas ({total / 1024 / 1024:.1f} MiB), {repeat} repeticiones")
+    
+    # Coincidencia de resultados (espacios normalizados en ambos casos)
+    mismatches = sum(
+        1 for page in pages
+        if (extract_title(page) or "") != " ".join((extract_title_bs4(page, max_bytes=len(page)) or "").split())
+    )
+    
+    if mismatches:
+        print(f"  Aviso: {mismatches} títulos distintos entre ambos métodos")
+    
+    soup = run(bs4_title, pages, repeat)
+    fast = run(extract_title, pages, repeat)
+    
+    print(f"BeautifulSoup: {soup:.0f} páginas/s")
+    print(f"Extractor incremental: {fast:.0f} páginas/s ({fast / soup:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de identificación de banners: reglas indexadas por prefijo literal frente a recorrer todas las
+expresiones regulares en orden, con bases sintéticas del tamaño de nmap-service-probes
+
+Uso: python3 benchmarks/bench_service_match.py [nmap-service-probes]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoenum.utils.service_probes import MatchIndex, ServiceProbeDB, load_service_probes, parse_service_probes
+
+SIZES = [1000, 10000, 30000]
+
+BANNERS = 2000
+
+def synthetic_rules(count, rng):
+    """Reglas con las formas habituales de nmap-service-probes y un banner que coincide con cada una"""
+    lines = []
+    banners = []
+    
+    for index in range(count):
+        product = f"Prod{index}x{rng.randint(0, 9999)}"
+        version = f"{rng.randint(0, 9)}.{rng.randint(0, 99)}"
+        shape = rng.random()
+        
+        if shape < 0.4:
+            # Banner con prefijo propio (FTP, SMTP, protocolos binarios...)
+            pattern, code = rng.choice([("220", "220"), ("\\* OK", "* OK"), ("\\+OK", "+OK"), ("SSH-2\\.0", "SSH-2.0"), ("RFB", "RFB"), ("\\x00\\x01", "\x00\x01")])
+            lines.append(f"match svc{index % 300} m|^{pattern} {product} ([\\d.]+)| p/{product}/ v/$1/")
+            banners.append(f"{code} {product} {version}\r\n".encode("latin-1"))
+        elif shape < 0.85:
+            # Cabecera HTTP: todas comparten el prefijo HTTP/1. y se distinguen por el literal del Server
+            lines.append(f"match http m|^HTTP/1\\.[01] \\d\\d\\d .*\\r\\nServer: {product}/([\\d.]+)|s p/{product}/ v/$1/")
+            banners.append(f"HTTP/1.1 200 OK\r\nDate: x\r\nServer: {product}/{version}\r\n\r\n".encode())
+        else:
+            # Patrón sin ancla, sin distinguir mayúsculas
+            lines.append(f"match svc{index % 300} m|{product} server v([\\d.]+)|i p/{product}/ v/$1/")
+            banners.append(f"welcome to {product.upper()} SERVER v{version}\r\n".encode())
+    
+    return "Probe TCP NULL q||\n" + "\n".join(lines) + "\n", banners
+
+def linear_match(index, response):
+    """Referencia: todas las expresiones regulares en orden hasta la primera coincidencia"""
+    for rule, match, _, _, _ in index.rules:
+        found = match(response)
+        
+        if found:
+            return rule, found
+    
+    return None, None
+
+def timed(function, banners):
+    start = time.perf_counter()
+    results = [function(banner) for banner in banners]
+    return time.perf_counter() - start, results
+
+def run(index, banners, label):
+    """Identifica los banners con el índice y con el recorrido lineal y muestra los tiempos"""
+    indexed_time, indexed = timed(index.match, banners)
+    linear_time, linear = timed(lambda banner: linear_match(index, banner), banners)
+    
+    # Candidatos por banner que llegan a la expresión regular (tras el índice y el prefiltro de literales)
+    candidates = sum(len(index.candidates(banner)) for banner in banners) / len(banners)
+    
+    line = f"{label:>14}  índice {indexed_time / len(banners) * 1e6:8.1f} µs/banner  lineal {linear_time / len(banners) * 1e6:10.1f} µs/banner  ({candidates:.1f} candidatas por banner)"
+    
+    if [rule for rule, _ in indexed] != [rule for rule, _ in linear]:
+        line += "  ¡resultados distintos!"
+    
+    print(line)
+
+def main():
+    rng = random.Random(1)
+    
+    for size in SIZES:
+        text, banners = synthetic_rules(size, rng)
+        
+        start = time.perf_counter()
+        probes = parse_service_probes(text)
+        index = MatchIndex(probes[0]["matches"])
+        build_time = time.perf_counter() - start
+        
+        print(f"{size} reglas: carga y compilación en {build_time:.2f} s")
+        
+        # Banners que coinciden con alguna regla y banners desconocidos
+        sample = rng.sample(banners, min(BANNERS, len(banners)))
+        unknown = [f"HTTP/1.1 404 Not Found\r\nServer: Unknown{i}/1.0\r\n\r\n".encode() for i in range(BANNERS // 4)]
+        
+        run(index, sample, "conocidos")
+        run(index, unknown, "desconocidos")
+    
+    # Base real opcional: nmap-service-probes completo
+    if len(sys.argv) > 1:
+        start = time.perf_counter()
+        db = ServiceProbeDB(load_service_probes(sys.argv[1]))
+        print(f"\n{sys.argv[1]}: {len(db)} reglas en {len(db.probes)} sondas, cargadas en {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    main()
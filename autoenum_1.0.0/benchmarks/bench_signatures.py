@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark de detección de tecnologías: bucle re.search por patrón frente al motor de firmas con prefiltro
+al crecer el número de firmas
+
+Uso: python3 benchmarks/bench_signatures.py [directorio_corpus] [máx_páginas]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoenum.utils.signatures import PatternSet, load_signatures
+
+SIZES = [8, 25, 50, 100, 1000, 5000]
+
+def load_corpus(corpus_dir, max_pages):
+    """Carga hasta max_pages documentos .html/.htm del directorio (recursivo)"""
+    pages = []
+    
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if not name.lower().endswith((".html", ".htm")):
+                continue
+            
+            with open(os.path.join(root, name), "rb") as f:
+                pages.append(f.read().decode("utf-8", errors="replace"))
+            
+            if len(pages) >= max_pages:
+                return pages
+    
+    return pages
+
+def synthetic_pages(count):
+    """Páginas generadas cuando no se proporciona un corpus"""
+    rng = random.Random(1)
+    words = ["div", "class", "content", "script", "wrapper", "header", "footer", "nav", "item", "link"]
+    
+    return [
+        "<html><head><title>p</title></head><body>"
+        + " ".join(f"<{rng.choice(words)} class='{rng.choice(words)}-{rng.randint(0, 999)}'>" for _ in range(3000))
+        + "wp-content jquery</body></html>"
+        for _ in range(count)
+    ]
+
+def build_patterns(size):
+    """Firmas HTML reales más firmas sintéticas hasta alcanzar el tamaño pedido"""
+    patterns = []
+    
+    for tech, signature in load_signatures().items():
+        html = signature.get("html", [])
+        patterns.extend((tech, pattern) for pattern in ([html] if isinstance(html, str) else html))
+    
+    rng = random.Random(size)
+    
+    while len(patterns) < size:
+        name = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8))
+        patterns.append((name, name + r"(?:\.min)?\.js\?v=(?P<version>[\d.]+)"))
+    
+    return patterns[:size]
+
+def naive_match(patterns, body):
+    """Comportamiento anterior: texto en minúsculas y re.search por patrón"""
+    content = body.lower()
+    
+    return [tech for tech, pattern in patterns if re.search(pattern, content)]
+
+def run(func, pages):
+    start = time.perf_counter()
+    
+    for page in pages:
+        func(page)
+    
+    return len(pages) / (time.perf_counter() - start)
+
+def main():
+    corpus_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    max_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    
+    pages = load_corpus(corpus_dir, max_pages) if corpus_dir else synthetic_pages(50)
+    
+    if not pages:
+        print(f"No se encontraron páginas HTML en {corpus_dir}")
+        sys.exit(1)
+    
+    print(f"{len(pages)} páginas ({sum(len(p) for p in pages) / 1024 / 1024:.1f} MiB)")
+    
+    for size in SIZES:
+        patterns = build_patterns(size)
+        pattern_set = PatternSet(patterns)
+        
+        # Mismos resultados con ambos métodos
+        for page in pages:
+            if sorted(set(naive_match(patterns, page))) != sorted(set(tech for tech, _ in pattern_set.match(page))):
+                print(f"  Aviso: resultados distintos con {size} firmas")
+                break
+        
+        naive = run(lambda page: naive_match(patterns, page), pages)
+        fast = run(lambda page: list(pattern_set.match(page)), pages)
+        
+        print(f"{size:>5} firmas: re.search {naive:8.1f} páginas/s, motor de firmas {fast:8.1f} páginas/s ({fast / naive:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga de la interfaz web: servidor de desarrollo de Flask (app.run) frente a los modos de servicio
+(werkzeug multihilo y waitress) sobre un almacén de escaneos poblado
+
+Uso: python3 benchmarks/bench_web.py [escaneos] [segundos] [clientes]
+"""
+
+import os
+import sys
+import time
+import random
+import socket
+import logging
+import tempfile
+import threading
+import http.client
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoenum.framework.store import ScanStore
+from autoenum.framework.web_interface import WebInterface, create_waitress_server
+
+ENDPOINTS = ["/", "/api/scan-status", "/results/{scan_id}"]
+
+class BenchInterface(WebInterface):
+    """Interfaz web con el directorio de resultados del benchmark"""
+    
+    results_dir = None
+    
+    def _get_results_dir(self):
+        return self.results_dir
+
+def synthetic_results(rng, index):
+    """Resultados con puertos, directorios y detección de OS de un escaneo ficticio"""
+    target = f"10.0.{index // 256}.{index % 256}"
+    ports = sorted(rng.sample(range(1, 65536), 20))
+    
+    return {
+        "target": target,
+        "scan_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - rng.randint(0, 86400 * 30))),
+        "duration": rng.uniform(1, 600),
+        "modules": {
+            "port_scanner": {
+                "target": target,
+                "ip": target,
+                "ports": [{"port": port, "state": "open", "service": ""} for port in ports]
+            },
+            "web_scanner": {
+                "target": target,
+                "web_server": "nginx",
+                "technologies": ["nginx", "PHP"],
+                "directories": [
+                    {"url": f"http://{target}/dir{i}", "status": 200, "size": rng.randint(100, 50000), "title": f"Página {i}"}
+                    for i in range(30)
+                ]
+            },
+            "os_detection": {
+                "os": [{"name": "Linux/Unix", "confidence": "70%", "method": "TTL"}],
+                "most_likely_os": "Linux/Unix"
+            }
+        }
+    }
+
+def populate(results_dir, count):
+    """Puebla el almacén de escaneos y devuelve sus identificadores"""
+    rng = random.Random(1)
+    store = ScanStore(os.path.join(results_dir, "scans.db"))
+    scan_ids = []
+    
+    for index in range(count):
+        scan_id = f"scan_{index:06d}"
+        store.save_scan(scan_id, synthetic_results(rng, index))
+        scan_ids.append(scan_id)
+    
+    store.close()
+    
+    return scan_ids
+
+def serve(mode, port, results_dir):
+    """Proceso servidor: app.run (modo anterior) o WebInterface.start con el servidor indicado"""
+    logging.disable(logging.WARNING)
+    
+    BenchInterface.results_dir = results_dir
+    interface = BenchInterface(port=port)
+    
+    if mode == "dev":
+        interface.app.run(host="127.0.0.1", port=port, threaded=True, use_reloader=False)
+    else:
+        interface.start(server=mode, host="127.0.0.1", open_browser=False)
+        interface.wait()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_port(port, timeout=10):
+    deadline = time.time() + timeout
+    
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    
+    return False
+
+def load(port, paths, seconds, clients):
+    """Lanza `clients` clientes con conexión persistente durante `seconds`; devuelve (peticiones/s, p50, p99, errores)"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    
+    def client(worker):
+        rng = random.Random(worker)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local = []
+        failed = 0
+        end = time.perf_counter() + seconds
+        
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            
+            try:
+                conn.request("GET", rng.choice(paths))
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                ok = False
+            
+            if ok:
+                local.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        
+        conn.close()
+        
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    
+    for thread in threads:
+        thread.start()
+    
+    for thread in threads:
+        thread.join()
+    
+    latencies.sort()
+    
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors[0]
+    
+    return (
+        len(latencies) / seconds,
+        latencies[len(latencies) // 2] * 1000,
+        latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        errors[0]
+    )
+
+def main():
+    scans = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    
+    results_dir = tempfile.mkdtemp(prefix="autoenum-bench-")
+    scan_ids = populate(results_dir, scans)
+    
+    print(f"{scans} escaneos en el almacén, {clients} clientes, {seconds:.0f} s por prueba")
+    
+    modes = ["dev", "werkzeug"] + (["waitress"] if create_waitress_server else [])
+    context = multiprocessing.get_context("fork")
+    
+    for mode in modes:
+        port = free_port()
+        process = context.Process(target=serve, args=(mode, port, results_dir), daemon=True)
+        process.start()
+        
+        if not wait_port(port):
+            print(f"{mode}: el servidor no arrancó")
+            process.terminate()
+            continue
+        
+        for endpoint in ENDPOINTS:
+            paths = [endpoint.format(scan_id=scan_id) for scan_id in scan_ids[:500]] if "{" in endpoint else [endpoint]
+            rate, p50, p99, errors = load(port, paths, seconds, clients)
+            
+            print(f"{mode:>9} {endpoint:<20} {rate:8.1f} peticiones/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  errores {errors}")
+        
+        process.terminate()
+        process.join(10)
+
+if __name__ == "__main__":
+    main()